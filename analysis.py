@@ -1,31 +1,132 @@
 import re
 import os
 import json            
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
 import pandas as pd   
-from konlpy.tag import Okt
-from transformers import AutoTokenizer, AutoModelForSequenceClassification, pipeline
 from sklearn.feature_extraction.text import TfidfVectorizer
-# --- 상수 및 전역 설정 ---
-try:
-    okt = Okt()
-    KONLPY_AVAILABLE = True
-    print("KoNLPy Okt 형태소 분석기 로드 성공.")
-except Exception as e:
-    print(f"KoNLPy Okt 형태소 분석기 로드 실패: {e}")
-    print("형태소 분석 기능이 비활성화됩니다. 기본 텍스트 클리닝만 사용됩니다.")
-    KONLPY_AVAILABLE = False
+from analysis_cache import AnalysisCache
+from metrics import get_logger, span, timed, incr
+from prompt_builder import build_prompt
+import morph
+from sentiment_cascade import LexiconScorer, CASCADE_ENABLED, agreement
 
-try:
-    tokenizer = AutoTokenizer.from_pretrained("WhitePeak/bert-base-cased-Korean-sentiment")
-    model = AutoModelForSequenceClassification.from_pretrained("WhitePeak/bert-base-cased-Korean-sentiment")
-    sentiment_analyzer = pipeline("sentiment-analysis", model=model, tokenizer=tokenizer)
-    SENTIMENT_AVAILABLE = True
-    print("감성 분석 모델 로드 성공.")
-except Exception as e:
-    print(f"감성 분석 모델 로드 중 오류 발생: {e}")
-    print("모델 로드 없이 실행됩니다. 감성 분석 기능은 비활성화됩니다.")
-    sentiment_analyzer = None
-    SENTIMENT_AVAILABLE = False
+log = get_logger("analysis")
+# --- 상수 및 전역 설정 ---
+# Okt(JVM 기동)와 감성 모델은 import 시점이 아니라 처음 필요할 때 한 번만 로드합니다.
+# 모듈 전역 싱글턴이므로 같은 프로세스의 모든 Streamlit 세션이 공유합니다.
+SENTIMENT_MODEL_NAME = "WhitePeak/bert-base-cased-Korean-sentiment"
+
+_okt_lock = threading.Lock()
+_sentiment_lock = threading.Lock()
+_okt = None
+_okt_loaded = False
+_sentiment = {}          # 'tokenizer', 'model', 'analyzer'
+_morph_lock = threading.Lock()
+_morph = None            # morph.MorphTokenizer (리뷰 정제용 형태소 분석기)
+_sentiment_loaded = False
+
+# 구성 요소별 로드 시간(초): 'okt', 'sentiment_model'
+LOAD_TIMINGS = {}
+
+
+def get_okt():
+    """Okt 형태소 분석기 싱글턴. 로드에 실패하면 None (이후 다시 시도하지 않음)."""
+    global _okt, _okt_loaded
+    if not _okt_loaded:
+        with _okt_lock:
+            if not _okt_loaded:
+                start = time.perf_counter()
+                try:
+                    from konlpy.tag import Okt
+                    _okt = Okt()
+                    log.info("KoNLPy Okt 형태소 분석기 로드 성공.")
+                except Exception as e:
+                    log.warning(f"KoNLPy Okt 형태소 분석기 로드 실패: {e}")
+                    log.warning("형태소 분석 기능이 비활성화됩니다. 기본 텍스트 클리닝만 사용됩니다.")
+                    _okt = None
+                LOAD_TIMINGS['okt'] = round(time.perf_counter() - start, 2)
+                _okt_loaded = True
+    return _okt
+
+
+def get_tokenizer():
+    """
+    리뷰 정제용 형태소 분석기(morph.MorphTokenizer) 싱글턴.
+    MORPH_BACKEND(auto | okt | mecab | regex)로 백엔드를 고르며, Okt는 get_okt()의 인스턴스를 공유합니다
+    (mecab을 쓸 수 있으면 Okt·JVM은 띄우지 않습니다).
+    """
+    global _morph
+    if _morph is None:
+        with _morph_lock:
+            if _morph is None:
+                backend = morph.make_backend(morph.MORPH_BACKEND, STOPWORDS, okt_factory=get_okt)
+                _morph = morph.MorphTokenizer(backend)
+                log.info(f"형태소 분석 백엔드: {backend.name} (배치 {morph.MORPH_BATCH_SIZE}, "
+                         f"워커 {morph.MORPH_WORKERS or '없음'})")
+    return _morph
+
+
+def _load_sentiment():
+    global _sentiment_loaded
+    if not _sentiment_loaded:
+        with _sentiment_lock:
+            if not _sentiment_loaded:
+                start = time.perf_counter()
+                try:
+                    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+                    from sentiment_engine import SentimentEngine
+                    tokenizer = AutoTokenizer.from_pretrained(SENTIMENT_MODEL_NAME)
+                    model = AutoModelForSequenceClassification.from_pretrained(SENTIMENT_MODEL_NAME)
+                    # 배치 크기·길이 정렬·truncation·스레드 수를 제어하는 추론 엔진 (pipeline과 같은 출력 형식)
+                    _sentiment.update(tokenizer=tokenizer, model=model,
+                                      analyzer=SentimentEngine(model, tokenizer))
+                    log.info("감성 분석 모델 로드 성공.")
+                except Exception as e:
+                    log.warning(f"감성 분석 모델 로드 중 오류 발생: {e}")
+                    log.warning("모델 로드 없이 실행됩니다. 감성 분석 기능은 비활성화됩니다.")
+                    _sentiment.clear()
+                LOAD_TIMINGS['sentiment_model'] = round(time.perf_counter() - start, 2)
+                _sentiment_loaded = True
+    return _sentiment
+
+
+def get_sentiment_analyzer():
+    """감성 분석 엔진 싱글턴. 로드에 실패하면 None."""
+    return _load_sentiment().get('analyzer')
+
+
+def warm_up(background=True):
+    """형태소 분석기(Okt)와 감성 모델을 미리 로드합니다. background=True면 데몬 스레드에서 병렬로 로드합니다."""
+    if not background:
+        get_tokenizer()
+        get_sentiment_analyzer()
+        return None
+    threads = [
+        threading.Thread(target=get_tokenizer, name="warmup-okt", daemon=True),
+        threading.Thread(target=get_sentiment_analyzer, name="warmup-sentiment", daemon=True),
+    ]
+    for t in threads:
+        t.start()
+    return threads
+
+
+def __getattr__(name):
+    # 기존 전역 이름(KONLPY_AVAILABLE 등)은 접근하는 순간 지연 로드해 같은 의미를 유지합니다.
+    if name == 'KONLPY_AVAILABLE':
+        return get_okt() is not None
+    if name == 'SENTIMENT_AVAILABLE':
+        return get_sentiment_analyzer() is not None
+    if name == 'okt':
+        return get_okt()
+    if name == 'sentiment_analyzer':
+        return get_sentiment_analyzer()
+    if name in ('tokenizer', 'model'):
+        return _load_sentiment().get(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # --- 불용어 설정 (기존 + 보강) ---
 STOPWORDS = [
@@ -70,197 +171,531 @@ ASPECT_KEYWORDS = {
     ]
 }
 
+# --- 형태소 분석·감성 결과 디스크 캐시 ---
+try:
+    analysis_cache = AnalysisCache()
+except Exception as e:
+    log.warning(f"분석 캐시 초기화 실패: {e} → 캐시 없이 실행됩니다.")
+    analysis_cache = None
+
+# --- 분석 결과 메모 (프로세스 메모리, 모든 세션 공유) ---
+# 같은 리뷰 집합·임계값이면 분석 전체를, 같은 리뷰 집합이면 감성 점수를 재사용합니다 (최대 항목 수, LRU).
+ANALYSIS_MEMO_ENTRIES = int(os.getenv("ANALYSIS_MEMO_ENTRIES", "32"))
+
+
+class _LRUMemo:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+
+_score_memo = _LRUMemo(ANALYSIS_MEMO_ENTRIES)    # (원문·별점 해시, namespace, 캐스케이드) -> (cleaned, preds)
+_result_memo = _LRUMemo(ANALYSIS_MEMO_ENTRIES)   # (리뷰 df 해시, pos, neg, namespace) -> 8-튜플
+
+
+def review_set_key(df: pd.DataFrame, columns=None) -> str:
+    """리뷰 df 내용(열 이름·값, 순서 포함)의 해시. columns를 주면 그 열만 사용합니다."""
+    df = df if columns is None else df[columns]
+    h = hashlib.sha1("|".join(map(str, df.columns)).encode('utf-8'))
+    h.update(pd.util.hash_pandas_object(df.astype(str), index=False).values.tobytes())
+    return h.hexdigest()
+
+
+def _copy_result(result: tuple) -> tuple:
+    """메모에 보관한 결과를 호출한 쪽이 수정해도 메모가 바뀌지 않도록 df를 복사해 돌려줍니다."""
+    df, keywords, pos_ratio, neg_ratio, top_pos, top_neg, aspects, total = result
+    return df.copy(), keywords, pos_ratio, neg_ratio, top_pos.copy(), top_neg.copy(), aspects, total
+
+
+def _memoized_summary(df: pd.DataFrame, pos_thresh: float, neg_thresh: float, compute) -> tuple:
+    """(리뷰 df, 임계값, 모델 버전)이 같으면 메모한 결과를, 아니면 compute()로 계산해 메모합니다."""
+    key = (review_set_key(df), pos_thresh, neg_thresh, _cache_namespace())
+    cached = _result_memo.get(key)
+    if cached is not None:
+        incr('analysis_memo_total', result='hit')
+        return _copy_result(cached)
+    incr('analysis_memo_total', result='miss')
+    result = compute()
+    _result_memo.put(key, _copy_result(result))
+    return result
+
+
+def _cache_namespace() -> str:
+    """캐시 키에 섞을 형태소 분석기·불용어·감성 모델 버전(백엔드·최대 토큰 길이 포함) 문자열."""
+    import transformers
+    morph_name = get_tokenizer().name
+    stop = hashlib.md5("|".join(STOPWORDS).encode('utf-8')).hexdigest()[:8]
+    loaded = _load_sentiment()
+    if loaded:
+        rev = getattr(loaded['model'].config, '_commit_hash', None) or 'local'
+        senti = (f"{SENTIMENT_MODEL_NAME}@{rev}/{type(loaded['tokenizer']).__name__}"
+                 f"/tf{transformers.__version__}/{loaded['analyzer'].backend.name}"
+                 f"/len{loaded['analyzer'].max_length}")
+    else:
+        senti = "none"
+    return f"{morph_name}|{stop}|{senti}"
+
+
+class AspectMatcher:
+    """
+    ASPECT_KEYWORDS로 한 번만 만든 색인(키워드·어간 → 측면)으로 리뷰마다 모든 측면을 한 번에 태깅합니다.
+
+    - cleaned 토큰: 키워드와 같으면 매칭합니다. 용언 키워드('맛있다')는 두 글자 이상 어간('맛있')으로 시작하는
+      토큰('맛있어요')도, 명사 키워드('가격')는 조사·서술격 어미만 뒤에 붙은 토큰('가격이', '가격도요')만 매칭합니다.
+      ('대기업'·'구성원'처럼 명사 키워드로 시작하는 다른 명사는 매칭하지 않음)
+    - 한 글자 키워드('양', '맛', '향', '싸다' → '싸' 등): 정제 과정에서 한 글자 토큰은 버려지므로 원문(raw)에서
+      어절 전체이거나 조사·어미가 바로 붙은 경우만 찾습니다. '양념'·'다양하다' 안의 '양'은 매칭하지 않습니다.
+    """
+    # 한 글자 키워드 뒤에 붙을 수 있는 조사(명사) / 어미(용언 어간)
+    NOUN_SUFFIXES = ('이', '가', '은', '는', '을', '를', '도', '만', '에', '의', '과', '와', '랑', '이랑', '까지', '보다')
+    STEM_SUFFIXES = ('고', '요', '서', '네', '다', '게', '지', '지만', '네요', '아요', '어요', '았', '었', '니')
+    # 두 글자 이상 명사 키워드 토큰 뒤에 붙을 수 있는 조사·서술격 어미 (NOUN_SUFFIXES 포함, 뒤에 '요'가 붙어도 허용)
+    NOUN_ENDINGS = NOUN_SUFFIXES + ('로', '으로', '에서', '에도', '이나', '나', '이고', '고', '이라', '라',
+                                    '이다', '다', '이에요', '예요', '이었', '였', '인데', '인')
+
+    def __init__(self, aspect_keywords=None):
+        aspect_keywords = aspect_keywords or ASPECT_KEYWORDS
+        self.aspects = list(aspect_keywords)
+        self.index = {}         # 키워드 원형 → 측면 열 번호
+        self.prefixes = {}      # 두 글자 이상 용언 어간 → 측면 열 번호
+        self.nouns = {}         # 두 글자 이상 명사 키워드 → 측면 열 번호
+        single = {}             # 측면 열 번호 → 한 글자 원문 패턴 조각
+        for col, keys in enumerate(aspect_keywords.values()):
+            for k in keys:
+                self.index.setdefault(k, set()).add(col)
+                stem = k[:-1] if k.endswith('다') else k
+                if len(stem) >= 2:
+                    (self.prefixes if k.endswith('다') else self.nouns).setdefault(stem, set()).add(col)
+                elif stem:
+                    suffixes = self.STEM_SUFFIXES if k.endswith('다') else self.NOUN_SUFFIXES
+                    single.setdefault(col, set()).add(
+                        f"{re.escape(stem)}(?:{'|'.join(sorted(suffixes, key=len, reverse=True))})?")
+        self.max_prefix = max(map(len, self.prefixes), default=0)
+        self.noun_endings = sorted({e + y for e in self.NOUN_ENDINGS for y in ('', '요')}, key=len)
+        self.single = {
+            col: re.compile(r"(?:^|[^가-힣])(?:" + "|".join(sorted(parts)) + r")(?![가-힣])")
+            for col, parts in single.items()
+        }
+
+    def _token_cols(self, tok):
+        cols = set(self.index.get(tok, ()))
+        for n in range(2, min(len(tok), self.max_prefix) + 1):
+            cols.update(self.prefixes.get(tok[:n], ()))
+        for ending in self.noun_endings:
+            if len(tok) > len(ending) + 1 and tok.endswith(ending):
+                cols.update(self.nouns.get(tok[:-len(ending)], ()))
+        return cols
+
+    def match(self, docs, raw=None) -> pd.DataFrame:
+        """
+        리뷰 × 측면 bool 행렬을 반환합니다 (행 인덱스는 docs의 인덱스를 따름).
+        raw(docs와 같은 순서의 원문)를 주면 한 글자 키워드도 원문에서 찾습니다.
+        """
+        docs = pd.Series(docs)
+        mat = np.zeros((len(docs), len(self.aspects)), dtype=bool)
+        memo = {}
+        for row, doc in enumerate(docs):
+            for tok in set(str(doc).split()):
+                cols = memo.get(tok)
+                if cols is None:
+                    cols = memo[tok] = list(self._token_cols(tok))
+                if cols:
+                    mat[row, cols] = True
+        if raw is not None:
+            raw = pd.Series(list(raw), dtype=object).astype(str)
+            for col, pattern in self.single.items():
+                mat[:, col] |= raw.str.contains(pattern).to_numpy(dtype=bool)
+        return pd.DataFrame(mat, index=docs.index, columns=self.aspects)
+
+
+ASPECT_MATCHER = AspectMatcher()
+# 감성 캐스케이드 1단계: 같은 측면·불용어 어휘로 만든 극성 사전
+LEXICON = LexiconScorer(ASPECT_KEYWORDS, STOPWORDS)
+
+
 def load_reviews(json_path: str = None, reviews_list: list = None) -> pd.DataFrame:
     reviews = []
     if json_path:
         if not os.path.exists(json_path):
-            print(f"오류: 파일을 찾을 수 없습니다 - {json_path}")
+            log.warning(f"오류: 파일을 찾을 수 없습니다 - {json_path}")
             return pd.DataFrame(columns=['text'])
         try:
             with open(json_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
             reviews = data.get('reviews', data) if isinstance(data, dict) else data
         except Exception as e:
-            print(f"오류: JSON 파일 로딩 중 문제 발생 - {e}")
+            log.warning(f"오류: JSON 파일 로딩 중 문제 발생 - {e}")
             return pd.DataFrame(columns=['text'])
     elif reviews_list is not None:
         reviews = reviews_list
     else:
-        print("오류: json_path 또는 reviews_list 중 하나를 지정해야 합니다.")
+        log.warning("오류: json_path 또는 reviews_list 중 하나를 지정해야 합니다.")
         return pd.DataFrame(columns=['text'])
 
     if not reviews:
-        print("데이터 로딩 완료: 리뷰 목록이 비어 있습니다.")
+        log.info("데이터 로딩 완료: 리뷰 목록이 비어 있습니다.")
         return pd.DataFrame(columns=['text'])
 
     df = pd.DataFrame(reviews)
     df.columns = [c.lower() for c in df.columns]
     if 'text' not in df.columns:
-        print(f"오류: 'text' 컬럼이 없습니다. 실제 컬럼: {df.columns.tolist()}")
+        log.warning(f"오류: 'text' 컬럼이 없습니다. 실제 컬럼: {df.columns.tolist()}")
         return pd.DataFrame(columns=['text'])
 
-    print(f"총 {len(df)}개의 리뷰 데이터를 로드했습니다.")
+    log.info(f"총 {len(df)}개의 리뷰 데이터를 로드했습니다.")
     return df
 
 def clean_and_tokenize(text: str) -> str:
-    text = str(text).strip()
-    text = re.sub(r'\s+', ' ', text)
-    if not text:
-        return ""
-    if KONLPY_AVAILABLE:
-        try:
-            malist = okt.pos(text, norm=True, stem=True)
-            words = [w for w, t in malist if t in ['Noun','Verb','Adjective'] and w not in STOPWORDS and len(w)>1]
-            return ' '.join(words)
-        except Exception:
-            text = re.sub(r"[^가-힣a-zA-Z0-9 ]", " ", text)
-            return re.sub(r"\s+", " ", text).strip()
-    else:
-        text = re.sub(r"[^가-힣a-zA-Z0-9 ]", " ", text)
-        return re.sub(r"\s+", " ", text).strip()
+    """리뷰 하나를 정제합니다 (명사·동사·형용사 중 불용어가 아닌 두 글자 이상). 여러 개는 get_tokenizer().tokenize_many로."""
+    return get_tokenizer().tokenize(text)
+
+def _tfidf_params(n_docs: int) -> dict:
+    """
+    문서 수에 맞춘 min_df / max_df. 문서가 100개 이상이면 기존 설정(min_df=5, max_df=0.75)과 같고,
+    적을수록 완화해 작은 코퍼스에서 어휘가 모두 걸러져 빈 결과가 나오지 않게 합니다.
+    """
+    return {
+        'min_df': max(1, min(5, n_docs // 20)),
+        'max_df': 0.75 if n_docs >= 4 else 1.0,
+    }
+
+
+class KeywordEngine:
+    """
+    분석 1회당 TF-IDF 어휘와 희소 행렬을 한 번만 만들고, 임의의 행 부분집합(감성 레이블, 측면 마스크)의
+    상위 키워드는 CSR 행렬을 잘라 합산해 계산합니다.
+    """
+
+    def __init__(self, corpus: list):
+        self.n_rows = len(corpus)
+        docs = [str(d) for d in corpus]
+        n_docs = sum(1 for d in docs if d.strip())
+        self.matrix = None
+        self.features = None
+        if not n_docs:
+            return
+        for params in (_tfidf_params(n_docs), {'min_df': 1, 'max_df': 1.0}):
+            vectorizer = TfidfVectorizer(ngram_range=(1,2), max_features=1000, **params)
+            try:
+                self.matrix = vectorizer.fit_transform(docs).tocsr()
+                self.features = vectorizer.get_feature_names_out()
+                return
+            except ValueError:
+                # 가지치기 후 남는 어휘가 없으면 가장 느슨한 설정으로 한 번 더 시도
+                continue
+
+    def top_terms(self, mask=None, top_n: int = 10) -> list:
+        """mask(bool 배열, 생략 시 전체) 행들의 TF-IDF 합 기준 상위 top_n 키워드 [(단어, 점수)]."""
+        if self.matrix is None:
+            return []
+        if mask is None:
+            sub = self.matrix
+        else:
+            rows = np.flatnonzero(np.asarray(mask, dtype=bool))
+            if not len(rows):
+                return []
+            sub = self.matrix[rows]
+        sums = np.asarray(sub.sum(axis=0)).ravel()
+        idx = sums.argsort()[::-1][:top_n]
+        return [(self.features[i], round(float(sums[i]), 2)) for i in idx if sums[i] > 0]
+
 
 def get_top_tfidf_keywords(corpus: list, top_n: int = 10) -> list:
     corpus = [d for d in corpus if d.strip()]
     if not corpus:
         return []
-    #vectorizer = TfidfVectorizer(ngram_range=(1,2), max_features=1000)
-    vectorizer = TfidfVectorizer(
-        ngram_range=(1,2),
-        max_features=1000,
-        max_df=0.75,    # 문서의 75% 이상 나타나는 단어 제외
-        min_df=5        # 최소 5개 문서에만 등장하는 단어만 사용
-    )
-    try:
-        mat = vectorizer.fit_transform(corpus)
-        sums = mat.sum(axis=0).A1
-        features = vectorizer.get_feature_names_out()
-        idx = sums.argsort()[::-1][:top_n]
-        return [(features[i], round(sums[i],2)) for i in idx]
-    except Exception:
-        return []
+    return KeywordEngine(corpus).top_terms(top_n=top_n)
+
+
+def _ratings(df: pd.DataFrame):
+    return df['rating'].tolist() if 'rating' in df.columns else None
+
+
+def _clean_and_score(texts: list, ratings: list = None, cascade: bool = None) -> tuple:
+    """
+    원문 리스트의 (cleaned 리스트, 감성 결과 리스트)를 반환합니다.
+    분석 캐시에 있는 원문은 재사용하고, 미스(중복 제거)만 clean_and_tokenize에 보냅니다.
+    캐스케이드가 켜져 있으면 미스 중 어휘·별점으로 확실한 리뷰는 LEXICON이 정하고 나머지만 감성 모델로 보냅니다.
+    (캐시에는 모델 결과만 저장합니다.)
+    """
+    cascade = CASCADE_ENABLED if cascade is None else cascade
+    namespace = _cache_namespace()
+    lexicon_keys = set()
+    keys = [AnalysisCache.key(t, namespace) for t in texts]
+    cached = analysis_cache.get_many(keys) if analysis_cache else {}
+
+    misses = {}
+    miss_ratings = {}
+    for i, (k, t) in enumerate(zip(keys, texts)):
+        if k not in cached and k not in misses:
+            misses[k] = t
+            miss_ratings[k] = ratings[i] if ratings is not None else None
+    if misses:
+        miss_keys = list(misses)
+        tokenizer = get_tokenizer()
+        with span('tokenize', backend=tokenizer.name):
+            cleaned = tokenizer.tokenize_many([misses[k] for k in miss_keys])
+        sentiment_analyzer = get_sentiment_analyzer()
+        preds = [None] * len(miss_keys)
+        if sentiment_analyzer is not None and cascade:
+            with span('lexicon'):
+                preds = LEXICON.score([misses[k] for k in miss_keys], [miss_ratings[k] for k in miss_keys])
+            rep_ = LEXICON.last_report
+            log.info(f"감성 캐스케이드: {rep_['reviews']}개 중 {rep_['decided']}개를 어휘·별점으로 결정 "
+                     f"(비율 {rep_['cascade_rate']:.1%}), 나머지 {rep_['reviews'] - rep_['decided']}개만 모델 추론")
+        undecided = [i for i, p in enumerate(preds) if p is None]
+        if sentiment_analyzer is not None and undecided:
+            # 추론 시간·처리량 지표는 SentimentEngine이 직접 기록합니다.
+            for i, p in zip(undecided, sentiment_analyzer([cleaned[i] for i in undecided])):
+                preds[i] = p
+            rep_ = sentiment_analyzer.last_report
+            log.info(f"감성 분석: {rep_['reviews']}개, {rep_['seconds']}s ({rep_['reviews_per_sec']} reviews/sec, "
+                     f"배치 {rep_['batches']}개, 패딩 비율 {rep_['padding_ratio']})")
+        elif sentiment_analyzer is None:
+            preds = [{'label': None, 'score': None}] * len(miss_keys)
+        fresh = {k: (c, p['label'], p['score']) for k, c, p in zip(miss_keys, cleaned, preds)}
+        lexicon_keys = {k for k, p in zip(miss_keys, preds) if p.get('source') == 'lexicon'}
+        if analysis_cache:
+            from_model = set(undecided) if sentiment_analyzer is not None else set(range(len(miss_keys)))
+            analysis_cache.put_many({k: fresh[k] for i, k in enumerate(miss_keys) if i in from_model})
+        cached.update(fresh)
+
+    unique = len(set(keys))
+    hit_rate = (unique - len(misses)) / unique * 100 if unique else 0.0
+    log.info(f"분석 캐시 적중률: {hit_rate:.1f}% ({unique - len(misses)}/{unique})")
+
+    cleaned = [cached[k][0] for k in keys]
+    preds = [{'label': cached[k][1], 'score': cached[k][2], **({'source': 'lexicon'} if k in lexicon_keys else {})}
+             for k in keys]
+    return cleaned, preds
+
+
+def compare_cascade(texts: list, ratings: list = None, pos_thresh: float = 0.9, neg_thresh: float = 0.9) -> dict:
+    """
+    캐스케이드와 전체 모델 추론을 같은 리뷰에 돌려 비교합니다 (캐시 미사용).
+    반환: {'reviews', 'cascade_rate', 'agreement', 'model_neutral', 'lexicon_seconds', 'model_seconds'}
+    """
+    sentiment_analyzer = get_sentiment_analyzer()
+    if sentiment_analyzer is None:
+        return {'reviews': len(texts), 'error': "감성 모델을 불러올 수 없습니다."}
+    start = time.perf_counter()
+    lexicon_preds = LEXICON.score(texts, ratings)
+    lexicon_seconds = time.perf_counter() - start
+    model_preds = sentiment_analyzer(get_tokenizer().tokenize_many(texts))
+    return {
+        'reviews': len(texts),
+        'cascade_rate': LEXICON.last_report.get('cascade_rate', 0.0),
+        **agreement(lexicon_preds, model_preds, pos_thresh, neg_thresh),
+        'lexicon_seconds': round(lexicon_seconds, 4),
+        'model_seconds': sentiment_analyzer.last_report.get('seconds'),
+    }
+
+
+@timed('analyze')
 def analyze_reviews(df: pd.DataFrame, pos_thresh: float = 0.9, neg_thresh: float = 0.9) -> tuple:
+    """
+    같은 리뷰 df·임계값으로 다시 부르면 메모한 결과를 돌려줍니다. 임계값만 바뀌면 감성 점수는 재사용하고
+    레이블·비율·키워드만 다시 계산합니다.
+    """
     if df.empty:
-        print("분석할 리뷰 데이터가 없습니다.")
+        log.info("분석할 리뷰 데이터가 없습니다.")
         return df, {}, 0, 0, pd.DataFrame(), pd.DataFrame(), {}, 0
 
-    df['cleaned'] = df['text'].apply(clean_and_tokenize)
-
-    if SENTIMENT_AVAILABLE:
-        preds = sentiment_analyzer(df['cleaned'].tolist())
-        df['sentiment'] = preds
-
-        # 임계값 기반 레이블 매핑
-        def label_map(si):
-            lbl, sc = si.get('label'), si.get('score', 0.0)
-            if lbl == 'LABEL_1' and sc >= pos_thresh:
-                return '긍정'
-            if lbl == 'LABEL_0' and sc >= neg_thresh:
-                return '부정'
-            return '중립'
-
-        df['label'] = df['sentiment'].apply(label_map)
+    def compute():
+        texts = df['text'].astype(str).tolist()
+        score_cols = ['text', 'rating'] if 'rating' in df.columns else ['text']
+        score_key = (review_set_key(df, score_cols), _cache_namespace(), CASCADE_ENABLED)
+        scored = _score_memo.get(score_key)
+        if scored is None:
+            # 캐시에 없는 원문만 Okt·(캐스케이드를 거쳐) 감성 모델로 보냅니다.
+            scored = _clean_and_score(texts, _ratings(df))
+            _score_memo.put(score_key, scored)
+        # 호출자의 df에 열을 붙이지 않도록 복사본에서 계산합니다 (메모 키는 원본 df 기준).
+        out = df.copy()
+        out['cleaned'] = scored[0]
+        return _summarize(out, scored[1], pos_thresh, neg_thresh)
+
+    return _memoized_summary(df, pos_thresh, neg_thresh, compute)
+
+
+# 레이블은 category(int8 코드)로 저장합니다. 리뷰마다 문자열·dict를 두지 않습니다.
+LABEL_CATEGORIES = ['긍정', '부정', '중립', '분류불가']
+TOP_POS_N = 20
+TOP_NEG_N = 15
+
+
+def _top_k(df: pd.DataFrame, scores: np.ndarray, mask: np.ndarray, k: int) -> pd.DataFrame:
+    """mask 행 중 점수 상위 k개의 (text, score)를 점수 내림차순으로 (argpartition, O(n))."""
+    idx = np.flatnonzero(mask)
+    if len(idx) > k:
+        idx = idx[np.argpartition(-scores[idx], k - 1)[:k]]
+    idx = idx[np.argsort(-scores[idx], kind='stable')]
+    return df.iloc[idx][['text', 'score']]
+
+
+def _summarize(df: pd.DataFrame, preds: list, pos_thresh: float, neg_thresh: float) -> tuple:
+    """
+    정제·감성 결과가 붙은 df로 레이블·비율·상위 리뷰·키워드·측면을 계산합니다 (analyze_reviews의 후반부).
+    결과 df는 score(float32), label(category), aspect_<측면>(bool) 열을 가집니다.
+    """
+    n = len(df)
+    if get_sentiment_analyzer() is not None:
+        raw = np.array([p.get('label') or '' for p in preds], dtype=object)
+        scores = np.array([p.get('score') or 0.0 for p in preds], dtype=np.float32)
+        # 임계값 기반 레이블 매핑: 0=긍정, 1=부정, 2=중립
+        # 캐스케이드 어휘 단계가 정한 리뷰는 score가 모델 확신도가 아니므로 임계값과 관계없이 그 레이블을 씁니다.
+        lexicon = np.array([p.get('source') == 'lexicon' for p in preds], dtype=bool)
+        codes = np.full(n, 2, dtype=np.int8)
+        codes[(raw == 'LABEL_1') & ((scores >= pos_thresh) | lexicon)] = 0
+        codes[(raw == 'LABEL_0') & ((scores >= neg_thresh) | lexicon)] = 1
     else:
-        df['sentiment'] = [{'label':'UNAVAILABLE','score':0.0}] * len(df)
-        df['label'] = '분류불가'
-
-    # 긍정·부정만 선택
-    pos_df = df[df['label'] == '긍정'].copy()
-    neg_df = df[df['label'] == '부정'].copy()
-    total = len(pos_df) + len(neg_df)
-    pos_ratio = (len(pos_df) / total * 100) if total else 0
-    neg_ratio = (len(neg_df) / total * 100) if total else 0
-
-    # 상위 리뷰 추출
-    pos_df['score_val'] = pos_df['sentiment'].apply(lambda x: x.get('score', 0.0))
-    neg_df['score_val'] = neg_df['sentiment'].apply(lambda x: x.get('score', 0.0))
-    top_pos = pos_df.sort_values('score_val', ascending=False).head(20) ######
-    top_neg = neg_df.sort_values('score_val', ascending=False).head(15) ######
-
-    # 핵심 키워드
-    all_corp = df['cleaned'].tolist()
-    pos_corp = pos_df['cleaned'].tolist()
-    neg_corp = neg_df['cleaned'].tolist()
-    keywords = {
-        '전체': get_top_tfidf_keywords(all_corp),
-        '긍정': get_top_tfidf_keywords(pos_corp),
-        '부정': get_top_tfidf_keywords(neg_corp)
-    }
-
-    # 측면별 키워드
-    aspects = {}
-    for asp, keys in ASPECT_KEYWORDS.items():
-        corpus = df[df['cleaned'].apply(lambda x: any(k in x for k in keys))]['cleaned'].tolist()
-        aspects[asp] = get_top_tfidf_keywords(corpus, top_n=5) if corpus else []
+        scores = np.zeros(n, dtype=np.float32)
+        codes = np.full(n, 3, dtype=np.int8)
+    df['score'] = scores
+    df['label'] = pd.Categorical.from_codes(codes, categories=LABEL_CATEGORIES)
+
+    # 긍정·부정 개수와 비율 (행 복사 없이 마스크로 계산)
+    pos_mask = codes == 0
+    neg_mask = codes == 1
+    n_pos, n_neg = int(pos_mask.sum()), int(neg_mask.sum())
+    total = n_pos + n_neg
+    pos_ratio = (n_pos / total * 100) if total else 0
+    neg_ratio = (n_neg / total * 100) if total else 0
+
+    # 상위 리뷰 추출: 전체 정렬·부분 df 복사 대신 점수 상위 k개 행만 골라냅니다.
+    top_pos = _top_k(df, scores, pos_mask, TOP_POS_N)
+    top_neg = _top_k(df, scores, neg_mask, TOP_NEG_N)
+
+    # 측면 태깅: 한 번의 패스로 리뷰×측면 행렬을 만들고 df에도 aspect_<측면> 열로 남깁니다.
+    with span('aspect_tagging'):
+        aspect_mat = ASPECT_MATCHER.match(df['cleaned'], df['text'])
+        for asp in aspect_mat.columns:
+            df[f'aspect_{asp}'] = aspect_mat[asp]
+
+    # 핵심·측면별 키워드: TF-IDF는 전체 리뷰로 한 번만 학습하고 부분집합은 행렬을 잘라 계산 (span 하나로 기록)
+    with span('tfidf'):
+        kw_engine = KeywordEngine(df['cleaned'].tolist())
+        keywords = {
+            '전체': kw_engine.top_terms(),
+            '긍정': kw_engine.top_terms(pos_mask),
+            '부정': kw_engine.top_terms(neg_mask)
+        }
+        aspects = {asp: kw_engine.top_terms(aspect_mat[asp], top_n=5) for asp in aspect_mat.columns}
 
     return df, keywords, pos_ratio, neg_ratio, top_pos, top_neg, aspects, total
 
 
 
-def generate_prompt(name, keywords, pos_ratio, neg_ratio, aspects, top_pos, top_neg, classified_count) -> str:
-    def fmt(lst): return ', '.join([f"{w}({s})" for w,s in lst]) if lst else '없음'
-    lines = []
-    lines.append(f"### 리뷰 분석 요약: {name}\n")
-    lines.append(f"- 리뷰 수 (감성 분석 성공): {classified_count}개")
-    lines.append(f"- 긍정 비율: {pos_ratio:.1f}% | 부정 비율: {neg_ratio:.1f}%\n")
-
-    lines.append("### 핵심 키워드")
-    lines.append(f"- 전체: {fmt(keywords.get('전체', []))}")
-    lines.append(f"- 긍정: {fmt(keywords.get('긍정', []))}")
-    lines.append(f"- 부정: {fmt(keywords.get('부정', []))}\n")
-
-    lines.append("### 측면별 키워드 (상위 5개)")
-    for asp, kws in aspects.items():
-        lines.append(f"- {asp}: {fmt(kws)}")
-
-    lines.append("\n### 상위 긍정 리뷰")
-    for i, row in enumerate(top_pos.itertuples(),1):
-        lines.append(f"{i}. ({row.sentiment['score']:.3f}) {row.text}")
-    lines.append("\n### 상위 부정 리뷰")
-    for i, row in enumerate(top_neg.itertuples(),1):
-        lines.append(f"{i}. ({row.sentiment['score']:.3f}) {row.text}")
-
-    lines.append("\n### 요청사항")
-    lines.append("1. 긍정적으로 평가되는 부분 (강점): 분석된 핵심 포인트 요약")
-    lines.append("2. 개선이 필요한 부분 (약점): 주요 부정 키워드 및 원인 분석")
-    lines.append("3. 실행 가능한 개선 방안: 구체적 제안 (측면별)")
-
-    return "\n".join(lines)
-
-
-### generate_prompt를 복사하되, 마지막 요청사항 부분만 소비자용(고객용)으로 바꾼 버전
-def generate_consumer_prompt(name, keywords, pos_ratio, neg_ratio, aspects, top_pos, top_neg, classified_count) -> str:
-    def fmt(lst): 
-        return ', '.join(f"{w}({s})" for w, s in lst) if lst else '없음'
-
-    lines = []
-    lines.append(f"### 리뷰 분석 요약: {name}\n")
-    lines.append(f"- 리뷰 수 (감성 분석 성공): {classified_count}개")
-    lines.append(f"- 긍정 비율: {pos_ratio:.1f}% | 부정 비율: {neg_ratio:.1f}%\n")
-
-    lines.append("### 핵심 키워드")
-    lines.append(f"- 전체: {fmt(keywords.get('전체', []))}")
-    lines.append(f"- 긍정: {fmt(keywords.get('긍정', []))}")
-    lines.append(f"- 부정: {fmt(keywords.get('부정', []))}\n")
-
-    lines.append("### 측면별 키워드 (상위 5개)")
-    for asp, kws in aspects.items():
-        lines.append(f"- {asp}: {fmt(kws)}")
-
-    lines.append("\n### 상위 긍정 리뷰")
-    for i, row in enumerate(top_pos.itertuples(), 1):
-        lines.append(f"{i}. ({row.sentiment['score']:.3f}) {row.text}")
-    lines.append("\n### 상위 부정 리뷰")
-    for i, row in enumerate(top_neg.itertuples(), 1):
-        lines.append(f"{i}. ({row.sentiment['score']:.3f}) {row.text}")
-
-    # ─── 여기부터 요청사항만 바꿨습니다 ───
-    lines += [
-        "\n위 리뷰를 참고하여, 소비자 관점에서 아래 내용을 응답해 주세요:",
-        "1. **추천 메뉴**",
-        "2. **낮은 평점에서 자주 언급된 식당의 문제점**",
-        "3. **해시태그**",
-    ]
-    return "\n".join(lines)
+@timed('analyze', mode='batch')
+def analyze_many(dfs: list, pos_thresh: float = 0.9, neg_thresh: float = 0.9) -> list:
+    """
+    여러 식당의 리뷰 df를 한 번에 분석합니다. 모든 원문을 합쳐 정제·감성 추론을 한 번만 돌리고
+    (같은 모델·토크나이저로 더 큰 배치), 식당별로 잘라 analyze_reviews와 같은 8-튜플 리스트를 반환합니다.
+    """
+    texts = [df['text'].astype(str).tolist() if not df.empty else [] for df in dfs]
+    ratings = [(_ratings(df) or [None] * len(ts)) if not df.empty else [] for df, ts in zip(dfs, texts)]
+    cleaned, preds = _clean_and_score([t for ts in texts for t in ts], [r for rs in ratings for r in rs])
+    results = []
+    offset = 0
+    for df, ts in zip(dfs, texts):
+        if df.empty:
+            results.append(analyze_reviews(df, pos_thresh, neg_thresh))
+            continue
+        end = offset + len(ts)
+        out = df.copy()
+        out['cleaned'] = cleaned[offset:end]
+        results.append(_summarize(out, preds[offset:end], pos_thresh, neg_thresh))
+        offset = end
+    return results
+
+
+class StreamingAnalyzer:
+    """
+    리뷰가 조금씩 도착하는 동안 분석 결과를 점진적으로 갱신합니다.
+
+    add()로 들어온 리뷰는 처음 보는 원문만 정제·감성 분석하고(결과는 원문별로 보관),
+    analyze()는 지금까지의 리뷰 전체에 대해 analyze_reviews와 같은 8-튜플을 돌려줍니다.
+    감성 추론은 리뷰당 한 번만 일어나고, 매 스냅샷마다 다시 계산하는 것은 비율·TF-IDF·측면뿐입니다.
+    """
+
+    def __init__(self, pos_thresh: float = 0.9, neg_thresh: float = 0.9):
+        self.pos_thresh = pos_thresh
+        self.neg_thresh = neg_thresh
+        self.reviews = []
+        self._scored = {}   # 원문 -> (cleaned, pred)
+
+    def add(self, reviews: list) -> int:
+        """리뷰 묶음(micro-batch)을 추가하고 새로 분석한 원문 수를 반환합니다."""
+        self.reviews.extend(reviews)
+        return self._score([str(r.get('text', '')) for r in reviews], [r.get('rating') for r in reviews])
+
+    def _score(self, texts, ratings=None) -> int:
+        rating_of = dict(zip(texts, ratings)) if ratings is not None else {}
+        fresh = list(dict.fromkeys(t for t in texts if t not in self._scored))
+        if fresh:
+            cleaned, preds = _clean_and_score(fresh, [rating_of.get(t) for t in fresh])
+            self._scored.update(zip(fresh, zip(cleaned, preds)))
+        return len(fresh)
+
+    @timed('analyze', mode='stream')
+    def analyze(self, df: pd.DataFrame = None, pos_thresh: float = None, neg_thresh: float = None) -> tuple:
+        """
+        df(생략 시 add()로 모은 리뷰 전체)를 분석합니다. 이미 점수를 낸 원문은 다시 추론하지 않습니다.
+        pos_thresh/neg_thresh를 주면 생성할 때의 임계값 대신 사용합니다. 최종 df 분석은 analyze_reviews와
+        같은 메모를 거치므로, 같은 리뷰·임계값으로 다시 부르면 TF-IDF·측면 계산도 생략됩니다.
+        """
+        pos_thresh = self.pos_thresh if pos_thresh is None else pos_thresh
+        neg_thresh = self.neg_thresh if neg_thresh is None else neg_thresh
+        snapshot = df is None
+        df = pd.DataFrame(self.reviews) if snapshot else df
+        if df.empty or 'text' not in df.columns:
+            return analyze_reviews(pd.DataFrame(), pos_thresh, neg_thresh)
+
+        def compute():
+            texts = df['text'].astype(str).tolist()
+            self._score(texts, _ratings(df))
+            out = df.copy() if not snapshot else df
+            out['cleaned'] = [self._scored[t][0] for t in texts]
+            preds = [self._scored[t][1] for t in texts]
+            return _summarize(out, preds, pos_thresh, neg_thresh)
+
+        # 크롤링 중 스냅샷은 매번 달라지므로 메모하지 않습니다.
+        return compute() if snapshot else _memoized_summary(df, pos_thresh, neg_thresh, compute)
+
+
+def generate_prompt(name, keywords, pos_ratio, neg_ratio, aspects, top_pos, top_neg, classified_count,
+                    budget_chars=None) -> str:
+    """식당주인용 프롬프트 (prompt_builder.build_prompt의 'owner' 템플릿)."""
+    return build_prompt('owner', name, keywords, pos_ratio, neg_ratio, aspects, top_pos, top_neg,
+                        classified_count, budget_chars=budget_chars)[0]
+
+
+def generate_consumer_prompt(name, keywords, pos_ratio, neg_ratio, aspects, top_pos, top_neg, classified_count,
+                             budget_chars=None) -> str:
+    """고객용 프롬프트 (요약·리뷰 부분은 주인용과 같고 요청사항만 소비자 관점)."""
+    return build_prompt('consumer', name, keywords, pos_ratio, neg_ratio, aspects, top_pos, top_neg,
+                        classified_count, budget_chars=budget_chars)[0]
 
 
 # --- 분석 함수들 정의 끝 ---
\ No newline at end of file
@@ -0,0 +1,101 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+
+# 리뷰 원문별 형태소 분석 결과와 감성 점수를 저장하는 로컬 SQLite 캐시
+ANALYSIS_CACHE_PATH = os.getenv("ANALYSIS_CACHE_PATH", os.path.join(".cache", "analysis.db"))
+# 최대 보관 항목 수 (초과 시 가장 오래 사용되지 않은 항목부터 삭제)
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "200000"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analysis (
+    key       TEXT PRIMARY KEY,
+    cleaned   TEXT NOT NULL,
+    label     TEXT,
+    score     REAL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS analysis_last_used ON analysis (last_used);
+"""
+
+
+class AnalysisCache:
+    """
+    (원문 해시 + 모델/토크나이저 버전) → (cleaned, label, score) 캐시입니다.
+
+    namespace에 형태소 분석기·감성 모델 버전을 담아 두므로, 모델이 바뀌면 예전 항목은
+    자연스럽게 조회되지 않고 LRU 정리 대상이 됩니다.
+    """
+
+    def __init__(self, path=ANALYSIS_CACHE_PATH, max_entries=ANALYSIS_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def key(text, namespace):
+        return hashlib.sha256(f"{namespace}\x00{text}".encode('utf-8')).hexdigest()
+
+    def get_many(self, keys):
+        """keys 중 캐시에 있는 항목을 {key: (cleaned, label, score)}로 반환하고 사용 시각을 갱신합니다."""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        now = time.time()
+        with self._connect() as conn:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT key, cleaned, label, score FROM analysis WHERE key IN ({marks})", chunk
+                ).fetchall()
+                found.update({k: (c, l, s) for k, c, l, s in rows})
+            conn.executemany(
+                "UPDATE analysis SET last_used = ? WHERE key = ?", [(now, k) for k in found]
+            )
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items):
+        """items: {key: (cleaned, label, score)}. 저장 후 max_entries를 넘으면 LRU 정리합니다."""
+        if not items:
+            return
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO analysis (key, cleaned, label, score, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(k, c, l, s, now) for k, (c, l, s) in items.items()],
+            )
+            (count,) = conn.execute("SELECT COUNT(*) FROM analysis").fetchone()
+            if count > self.max_entries:
+                # 매번 정리하지 않도록 한도의 90%까지 한 번에 줄입니다.
+                excess = count - int(self.max_entries * 0.9)
+                conn.execute(
+                    "DELETE FROM analysis WHERE key IN "
+                    "(SELECT key FROM analysis ORDER BY last_used LIMIT ?)",
+                    (excess,),
+                )
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
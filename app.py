@@ -1,27 +1,51 @@
 # app.py
-import os, sys, subprocess
+import time
+_script_start = time.perf_counter()  # 첫 화면 렌더링(time-to-first-paint) 측정 기준
+import os
+import uuid
 
 import streamlit as st
 import pandas as pd
 
-from crawler import (
-    crawl_kakao_reviews,
-    crawl_google_reviews,
-    crawl_naver_reviews,
-)
+from crawler import DRIVER_POOL
+from crawl_scheduler import SCHEDULER
+from review_store import ReviewStore
+import metrics
+import send_prompt
+from prompt_builder import build_prompt, PROMPT_LIMITS
 from analysis import (
-    analyze_reviews,
-    generate_prompt,
-    generate_consumer_prompt,
+    StreamingAnalyzer,
+    review_set_key,
+    warm_up as warm_up_models,
+    LOAD_TIMINGS,
 )
 
 # 페이지 설정
 st.set_page_config(page_title="리뷰 분석 앱", layout="wide")
 st.title("🍽️ 식당 리뷰 크롤링 & 분석")
 
+# 0) 브라우저 풀 예열 (프로세스당 한 번, 백그라운드)
+@st.cache_resource(show_spinner=False)
+def warm_driver_pool():
+    return DRIVER_POOL.warm_up_async()
+
+warm_driver_pool()
+
+# 0-1) 단계별 계측: 이번 실행(rerun)의 span을 모으고, METRICS_PORT가 설정되어 있으면 /metrics 엔드포인트를 띄웁니다.
+run_trace = metrics.start_trace()
+
+@st.cache_resource(show_spinner=False)
+def start_metrics_endpoint():
+    return metrics.start_http_server()
+
+start_metrics_endpoint()
+
 # 1) 세션 스테이트 초기화
 if 'submitted' not in st.session_state:
     st.session_state.submitted = False
+# 크롤링 스케줄러의 사용자별 공정 큐에 쓰는 세션 식별자
+if 'user_id' not in st.session_state:
+    st.session_state.user_id = uuid.uuid4().hex[:8]
 
 def on_submit():
     st.session_state.submitted = True
@@ -32,6 +56,26 @@ with st.sidebar:
         restaurant_name = st.text_input("식당 이름을 입력하세요")
         user_type       = st.radio("모드 선택", ("식당주인용", "고객용"))
         st.form_submit_button("🔍 분석 시작", on_click=on_submit)
+    # 임계값은 폼 밖에 두어 바꾸는 즉시 반영합니다 (감성 점수는 재사용하고 레이블·키워드만 다시 계산).
+    pos_thresh = st.slider("긍정 판정 임계값", 0.5, 0.99, 0.9, 0.01)
+    neg_thresh = st.slider("부정 판정 임계값", 0.5, 0.99, 0.9, 0.01)
+    show_timing = st.checkbox("⏱️ 단계별 시간 보기", value=False)
+    timing_slot = st.empty()
+
+# 2-1) 첫 화면이 그려진 직후, 형태소 분석기·감성 모델을 백그라운드에서 미리 로드
+#      (cache_resource: 프로세스당 한 번, 모든 세션이 같은 모델 싱글턴을 공유)
+first_paint = time.perf_counter() - _script_start
+
+@st.cache_resource(show_spinner=False)
+def start_model_warmup():
+    return warm_up_models(background=True)
+
+start_model_warmup()
+
+with st.sidebar.expander("⏱️ 로딩 시간"):
+    st.write(f"첫 화면 렌더링: {first_paint:.2f}s")
+    for component, secs in LOAD_TIMINGS.items():
+        st.write(f"{component} 로드: {secs:.1f}s")
 
 # 3) 분석 전 대기
 if not st.session_state.submitted:
@@ -43,76 +87,163 @@ if not restaurant_name:
     st.warning("식당 이름을 입력해야 합니다.")
     st.stop()
 
-# 5) 크롤링 (한 번만 실행, 캐시)
-@st.cache_data(show_spinner=False)
-def get_all_reviews(name: str):
-    kakao  = crawl_kakao_reviews(name)
-    google = crawl_google_reviews(name)
-    naver  = crawl_naver_reviews(name)
-    return kakao + google + naver
+# 5) 크롤링 (식당 이름당 한 번, 세션에 보관) — Kakao/Google/Naver 병렬 실행
+#    크롤링은 프로세스 공용 스케줄러(crawl_scheduler)의 작업으로 실행되고, 이 스크립트는 작업 상태를 조회합니다.
+#    브라우저 예산을 넘는 요청은 사용자별로 공정하게 대기하고, 같은 식당 요청은 진행 중인 작업을 함께 씁니다.
+#    로컬 리뷰 저장소에 이미 있는 식당은 신규 리뷰까지만 증분 수집합니다.
+#    다른 세션·워커가 최근에 크롤링한 플랫폼은 크롤링 캐시(crawl_cache)에서 바로 가져옵니다.
+#    리뷰는 추출되는 대로 표에 추가되고, micro-batch마다 중간 분석 결과(비율·키워드)가 갱신됩니다.
+STREAM_ANALYSIS_BATCH = int(os.getenv("STREAM_ANALYSIS_BATCH", "20"))
+CRAWL_POLL_INTERVAL = float(os.getenv("CRAWL_POLL_INTERVAL", "0.3"))
+REVIEW_COLUMNS = ["platform", "reviewer", "text", "rating", "date"]
+
+@st.cache_resource(show_spinner=False)
+def get_review_store():
+    return ReviewStore()
+
+def show_live_summary(slot, streamer):
+    _, keywords, pos_ratio, neg_ratio, _, _, _, total = streamer.analyze()
+    with slot.container():
+        st.caption(f"⏳ 중간 분석 결과 (지금까지 {len(streamer.reviews)}개 리뷰 기준, 계속 갱신됩니다)")
+        st.write(f"긍정 비율: {pos_ratio:.1f}%  |  부정 비율: {neg_ratio:.1f}%  (분류 {total}개)")
+        st.write("핵심 키워드: " + (", ".join(w for w, _ in keywords.get('전체', [])[:5]) or "없음"))
 
-with st.spinner("1/3 크롤링 중…"):
-    all_reviews = get_all_reviews(restaurant_name)
+st.subheader("✅ 수집된 원본 리뷰")
+table_slot = st.empty()
+
+crawl = st.session_state.get('crawl')
+if crawl is None or crawl['name'] != restaurant_name:
+    streamer = StreamingAnalyzer()
+    live_slot = st.empty()
+    pending = 0
+    # 같은 식당이 이미 진행 중이면 (이 세션의 이전 실행이든 다른 세션이든) 그 작업 id를 받습니다.
+    job_id = SCHEDULER.submit(restaurant_name, user=st.session_state.user_id,
+                              store=get_review_store(), incremental=True)
+    cursor = 0
+    with st.spinner("1/3 크롤링 중… (수집된 리뷰부터 바로 보여 드립니다)"):
+        while True:
+            snap = SCHEDULER.poll(job_id, cursor)
+            cursor = snap['cursor']
+            if snap['status'] == 'queued':
+                live_slot.info(f"⏳ 크롤링 대기 중… 앞에 {snap['position'] or 0}개 작업이 있습니다.")
+            for platform, batch in snap['batches']:
+                if not batch:
+                    continue
+                streamer.add(batch)
+                pending += len(batch)
+            if snap['batches'] and streamer.reviews:
+                table_slot.dataframe(pd.DataFrame(streamer.reviews)[REVIEW_COLUMNS], height=300)
+                if pending >= STREAM_ANALYSIS_BATCH:
+                    show_live_summary(live_slot, streamer)
+                    pending = 0
+            if snap['status'] in ('done', 'error'):
+                # 스케줄러 스레드에서 기록된 크롤링 단계 시간을 이번 실행의 trace에 더합니다.
+                run_trace.extend(snap['spans'])
+            if snap['status'] == 'error':
+                live_slot.empty()
+                st.error(f"크롤링 실패: {snap['error']}")
+                st.stop()
+            if snap['status'] == 'done':
+                all_reviews, crawl_report = snap['reviews'], snap['report']
+                break
+            time.sleep(CRAWL_POLL_INTERVAL)
+    live_slot.empty()
+    crawl = {'name': restaurant_name, 'reviews': all_reviews, 'report': crawl_report, 'analyzer': streamer}
+    st.session_state['crawl'] = crawl
+
+all_reviews, crawl_report = crawl['reviews'], crawl['report']
+
+with st.sidebar.expander("⏱️ 플랫폼별 크롤링 결과"):
+    for platform, info in crawl_report.items():
+        status = f"⚠️ {info['error']}" if info['error'] else f"{info['count']}개"
+        if info.get('new') is not None:
+            status += f" (신규 {info['new']})"
+        if info.get('cached'):
+            status += f" (캐시: {info['cached']})"
+        st.write(f"{platform}: {status} ({info['elapsed']:.1f}s, 대기 {info['waited']:.1f}s)")
 
 if not all_reviews:
     st.error("리뷰를 찾지 못했습니다.")
     st.stop()
 
-# 6) 원본 리뷰 테이블
+# 6) 원본 리뷰 테이블 (최종: Kakao → Google → Naver 순)
 df = pd.DataFrame(all_reviews)
-st.subheader("✅ 수집된 원본 리뷰")
-st.dataframe(df[["platform","reviewer","text","rating","date"]], height=300)
+reviews_key = review_set_key(df)
+table_slot.dataframe(df[REVIEW_COLUMNS], height=300)
 
-# 7) 감성·키워드 분석
+# 7) 감성·키워드 분석 — 크롤링 중 이미 점수를 낸 리뷰는 다시 추론하지 않고,
+#    같은 리뷰·임계값이면 (다른 세션이 계산한 것까지) 메모한 결과를 그대로 씁니다.
 with st.spinner("2/3 감성 분석 및 키워드 추출…"):
-    df_proc, keywords, pos_ratio, neg_ratio, top_pos, top_neg, aspects, total = analyze_reviews(df)
-
-# 8) 프롬프트 생성 (한 번만)
-if 'prompt' not in st.session_state:
-    if user_type == "식당주인용":
-        df_kw = pd.DataFrame({
-            aspect: [", ".join(f"{w}({s:.2f})" for w, s in kws)]
-            for aspect, kws in keywords.items()
-        }, index=["키워드"]).T
-        st.subheader("🔑 핵심 키워드 (테이블)")
-        st.table(df_kw)
-        st.write(f"긍정 비율: {pos_ratio:.1f}%  |  부정 비율: {neg_ratio:.1f}%")
-
-        with st.spinner("3/3 주인용 LLM 프롬프트 생성…"):
-            prompt = generate_prompt(
-                name=restaurant_name,
-                keywords=keywords,
-                pos_ratio=pos_ratio,
-                neg_ratio=neg_ratio,
-                aspects=aspects,
-                top_pos=top_pos,
-                top_neg=top_neg,
-                classified_count=total
-            )
-    else:
-        with st.spinner("3/3 고객용 LLM 프롬프트 생성…"):
-            prompt = generate_consumer_prompt(
-                name=restaurant_name,
-                keywords=keywords,
-                pos_ratio=pos_ratio,
-                neg_ratio=neg_ratio,
-                aspects=aspects,
-                top_pos=top_pos,
-                top_neg=top_neg,
-                classified_count=total
-            )
+    df_proc, keywords, pos_ratio, neg_ratio, top_pos, top_neg, aspects, total = crawl['analyzer'].analyze(
+        df, pos_thresh=pos_thresh, neg_thresh=neg_thresh
+    )
+
+if user_type == "식당주인용":
+    df_kw = pd.DataFrame({
+        aspect: [", ".join(f"{w}({s:.2f})" for w, s in kws)]
+        for aspect, kws in keywords.items()
+    }, index=["키워드"]).T
+    st.subheader("🔑 핵심 키워드 (테이블)")
+    st.table(df_kw)
+    st.write(f"긍정 비율: {pos_ratio:.1f}%  |  부정 비율: {neg_ratio:.1f}%")
+
+# 8) 프롬프트 생성 — 식당·모드·리뷰·임계값이 바뀔 때만 다시 만듭니다.
+prompt_mode = 'owner' if user_type == "식당주인용" else 'consumer'
+prompt_key = (restaurant_name, prompt_mode, reviews_key, pos_thresh, neg_thresh)
+if st.session_state.get('prompt_key') != prompt_key:
+    label = "주인용" if prompt_mode == 'owner' else "고객용"
+    with st.spinner(f"3/3 {label} LLM 프롬프트 생성…"):
+        prompt, prompt_report = build_prompt(
+            prompt_mode,
+            name=restaurant_name,
+            keywords=keywords,
+            pos_ratio=pos_ratio,
+            neg_ratio=neg_ratio,
+            aspects=aspects,
+            top_pos=top_pos,
+            top_neg=top_neg,
+            classified_count=total,
+            **PROMPT_LIMITS
+        )
     st.session_state['prompt'] = prompt
+    st.session_state['prompt_report'] = prompt_report
+    st.session_state['prompt_key'] = prompt_key
 
 prompt = st.session_state['prompt']
+prompt_report = st.session_state.get('prompt_report')
 
 # 9) 프롬프트 출력
 st.subheader("📝 LLM 요청 프롬프트")
+if prompt_report:
+    st.caption(
+        f"프롬프트 크기: {prompt_report['chars']:,}자 (약 {prompt_report['est_tokens']:,} 토큰"
+        + (f", 예산 {prompt_report['budget_chars']:,}자" if prompt_report['budget_chars'] else "")
+        + f") · 리뷰 긍정 {prompt_report['reviews']['pos']}/{prompt_report['candidates']['pos']}, "
+        f"부정 {prompt_report['reviews']['neg']}/{prompt_report['candidates']['neg']}개 포함"
+    )
 st.code(prompt, language="plain")
 
-# 10) Gemini 전송 버튼
-if st.button("🔗 Gemini에 전송"):
-    script_dir  = os.path.dirname(os.path.abspath(__file__))
-    send_script = os.path.join(script_dir, "send_prompt.py")
-    # 백그라운드로 실행
-    subprocess.Popen([sys.executable, send_script, prompt])
-    st.success("Gemini 전송 스크립트를 실행했습니다. 브라우저 창을 확인해주세요.")
+# 9-1) 이번 실행의 단계별 소요 시간 (사이드바, 선택) + Prometheus 텍스트 파일 갱신 (METRICS_FILE을 설정한 경우만)
+metrics.write_prometheus()
+if show_timing:
+    with timing_slot.container():
+        rows = metrics.breakdown(run_trace)
+        if rows:
+            st.dataframe(pd.DataFrame(rows, columns=["단계", "횟수", "합계(s)"]), hide_index=True)
+        else:
+            st.caption("이번 실행에서 새로 측정된 단계가 없습니다 (캐시 사용).")
+
+# 10) Gemini 전송 버튼 — 브라우저를 유지하는 전송 데몬(send_prompt.py --serve)에 소켓으로 전달
+#     fragment로 감싸 버튼을 눌러도 이 부분만 다시 실행합니다 (크롤링·분석·프롬프트 단계는 건너뜀).
+#     (st.fragment는 Streamlit 1.37 이상 — requirements.txt에 고정)
+@st.fragment
+def gemini_sender(prompt):
+    if st.button("🔗 Gemini에 전송"):
+        with st.spinner("Gemini로 전송 중…"):
+            result = send_prompt.submit(prompt)
+        if result['ok']:
+            st.success(f"Gemini 입력창에 프롬프트를 넣었습니다 ({result['latency']:.1f}s). 브라우저 창을 확인해주세요.")
+        else:
+            st.error(f"Gemini 전송 실패: {result['error']}")
+
+gemini_sender(prompt)
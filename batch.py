@@ -0,0 +1,239 @@
+"""
+여러 식당을 UI 없이 한 번에 크롤링·분석하는 배치 실행기입니다.
+
+    python batch.py requests.jsonl --output results.jsonl --workers 2
+
+입력 JSONL 한 줄: {"name": "식당 이름", "mode": "owner" | "consumer"}  (mode 생략 시 owner,
+"식당주인용" / "고객용"도 허용). 결과는 식당 하나가 끝날 때마다 출력 JSONL에 한 줄씩 추가되며,
+다시 실행하면 이미 성공한(status가 ok / no_reviews) 항목은 건너뛰고 나머지만 처리합니다.
+플랫폼 하나라도 크롤링 오류가 있었거나, 리뷰 없음을 확인하지 못한 채 0개를 돌려준 플랫폼이 있는 식당은
+error로 기록해 다음 실행에서 다시 시도합니다.
+
+- 크롤링: 최대 --workers 개 식당을 동시에 크롤링 (브라우저 수는 DRIVER_POOL_SIZE로 제한)
+- 분석: 크롤링이 끝난 식당을 --analysis-batch 개씩 모아 analyze_many로 한 번에 추론
+  (프로세스 전체가 같은 Okt·감성 모델 싱글턴을 공유)
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+import metrics
+from crawler import crawl_all_reviews, DRIVER_POOL
+from review_store import ReviewStore, normalize_place
+from analysis import analyze_many, warm_up
+from prompt_builder import build_prompt, PROMPT_LIMITS
+
+log = metrics.get_logger("batch")
+
+MODES = {
+    'owner': 'owner', '식당주인용': 'owner',
+    'consumer': 'consumer', '고객용': 'consumer',
+}
+# 다시 실행할 때 건너뛸 상태 (error는 재시도)
+DONE_STATUSES = {'ok', 'no_reviews'}
+
+
+def job_key(name, mode):
+    return f"{normalize_place(name)}|{mode}"
+
+
+def load_jobs(path):
+    """입력 JSONL을 읽어 [(name, mode)]를 반환합니다. 잘못된 줄과 중복은 건너뜁니다."""
+    jobs, seen = [], set()
+    with open(path, 'r', encoding='utf-8') as f:
+        for lineno, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+                name = str(item['name']).strip()
+                mode = MODES[item.get('mode') or 'owner']
+            except (ValueError, KeyError, TypeError) as e:
+                log.warning(f"{path}:{lineno} 건너뜀: {type(e).__name__} {e}")
+                continue
+            if name and job_key(name, mode) not in seen:
+                seen.add(job_key(name, mode))
+                jobs.append((name, mode))
+    return jobs
+
+
+def load_done(path):
+    """출력 JSONL에서 이미 끝난 작업 키 집합을 읽습니다 (중간에 잘린 마지막 줄은 무시)."""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            if rec.get('status') in DONE_STATUSES:
+                done.add(job_key(rec['name'], rec['mode']))
+    return done
+
+
+class ResultWriter:
+    """결과를 한 줄씩 추가하고 즉시 디스크에 반영해, 중단되더라도 끝난 항목은 남게 합니다."""
+
+    def __init__(self, path):
+        self.path = path
+        self._ensure_newline()
+        self._f = open(path, 'a', encoding='utf-8')
+
+    def _ensure_newline(self):
+        # 이전 실행이 줄 중간에서 끊겼으면 다음 레코드가 그 줄에 붙지 않도록 줄바꿈을 넣습니다.
+        if os.path.exists(self.path) and os.path.getsize(self.path):
+            with open(self.path, 'rb+') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+
+    def write(self, record):
+        self._f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._f.flush()
+        os.fsync(self._f.fileno())
+
+    def close(self):
+        self._f.close()
+
+
+def _crawl(name, store):
+    start = time.perf_counter()
+    reviews, report = crawl_all_reviews(name, store=store, incremental=True)
+    return reviews, report, time.perf_counter() - start
+
+
+def _analyze_batch(batch, writer):
+    """크롤링이 끝난 식당 묶음을 한 번에 분석하고 결과를 기록합니다."""
+    dfs = [pd.DataFrame(reviews) for _, _, reviews, _, _ in batch]
+    try:
+        results = analyze_many(dfs)
+    except Exception as e:
+        log.warning(f"분석 실패 ({len(batch)}개 식당): {type(e).__name__} {e}")
+        for name, mode, reviews, report, crawl_secs in batch:
+            writer.write(_record(name, mode, 'error', report, crawl_secs, error=f"{type(e).__name__}: {e}"))
+        return
+
+    for (name, mode, reviews, report, crawl_secs), res in zip(batch, results):
+        _, keywords, pos_ratio, neg_ratio, top_pos, top_neg, aspects, total = res
+        try:
+            prompt, prompt_report = build_prompt(
+                mode, name=name, keywords=keywords, pos_ratio=pos_ratio, neg_ratio=neg_ratio,
+                aspects=aspects, top_pos=top_pos, top_neg=top_neg, classified_count=total, **PROMPT_LIMITS,
+            )
+        except Exception as e:
+            log.warning(f"[Batch] '{name}' ({mode}) 프롬프트 생성 실패: {type(e).__name__} {e}")
+            writer.write(_record(name, mode, 'error', report, crawl_secs, reviews=len(reviews),
+                                 error=f"{type(e).__name__}: {e}"))
+            continue
+        writer.write(_record(
+            name, mode, 'ok', report, crawl_secs,
+            reviews=len(reviews), classified=total,
+            pos_ratio=round(pos_ratio, 2), neg_ratio=round(neg_ratio, 2),
+            keywords=keywords, aspects=aspects, prompt=prompt, prompt_report=prompt_report,
+        ))
+        log.info(f"[Batch] '{name}' ({mode}) 완료: 리뷰 {len(reviews)}개")
+
+
+def _crawl_errors(report):
+    """
+    크롤링 보고서에서 오류가 난 플랫폼의 '플랫폼: 오류' 문자열을 모읍니다.
+    오류 없이 0개였더라도 페이지에서 리뷰 없음을 확인하지 못했으면(report의 empty가 False) 오류로 봅니다.
+    """
+    errors = []
+    for p, r in (report or {}).items():
+        if r.get('error'):
+            errors.append(f"{p}: {r['error']}")
+        elif not r.get('count') and not r.get('empty'):
+            errors.append(f"{p}: 리뷰 0개 (리뷰 없음 확인 안 됨)")
+    return "; ".join(errors)
+
+
+def _record(name, mode, status, report, crawl_secs, **fields):
+    return {
+        'name': name,
+        'mode': mode,
+        'status': status,
+        **fields,
+        'crawl_seconds': round(crawl_secs, 2),
+        'crawl_report': report,
+        'finished_at': time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def run(jobs, output, workers=2, analysis_batch=8, store=None):
+    """jobs를 처리해 output에 기록하고 {'total', 'skipped', 'processed'}를 반환합니다."""
+    done = load_done(output)
+    pending = [(n, m) for n, m in jobs if job_key(n, m) not in done]
+    log.info(f"[Batch] 전체 {len(jobs)}개 중 {len(jobs) - len(pending)}개 완료됨 → {len(pending)}개 처리")
+    if not pending:
+        return {'total': len(jobs), 'skipped': len(jobs), 'processed': 0}
+
+    warm_up(background=True)
+    writer = ResultWriter(output)
+    batch = []
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="batch") as pool:
+            # 같은 식당을 두 모드로 요청해도 크롤링은 한 번만 합니다.
+            names = list(dict.fromkeys(n for n, _ in pending))
+            futures = {pool.submit(_crawl, n, store): n for n in names}
+            modes = {}
+            for n, m in pending:
+                modes.setdefault(n, []).append(m)
+            for fut in as_completed(futures):
+                name = futures[fut]
+                try:
+                    reviews, report, crawl_secs = fut.result()
+                except Exception as e:
+                    for mode in modes[name]:
+                        writer.write(_record(name, mode, 'error', None, 0.0, error=f"{type(e).__name__}: {e}"))
+                    continue
+                errors = _crawl_errors(report)
+                for mode in modes[name]:
+                    if errors:
+                        # 일부 플랫폼만 실패해도 결과가 불완전하므로 다시 실행할 때 재시도합니다.
+                        writer.write(_record(name, mode, 'error', report, crawl_secs,
+                                             reviews=len(reviews), error=errors))
+                        continue
+                    if not reviews:
+                        writer.write(_record(name, mode, 'no_reviews', report, crawl_secs, reviews=0))
+                        continue
+                    batch.append((name, mode, reviews, report, crawl_secs))
+                if len(batch) >= analysis_batch:
+                    _analyze_batch(batch, writer)
+                    batch = []
+        if batch:
+            _analyze_batch(batch, writer)
+    finally:
+        writer.close()
+        metrics.write_prometheus()
+    return {'total': len(jobs), 'skipped': len(jobs) - len(pending), 'processed': len(pending)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="식당 리뷰 배치 크롤링·분석")
+    parser.add_argument("input", nargs="?", default="requests.jsonl", help="입력 JSONL ({name, mode} 한 줄씩)")
+    parser.add_argument("--output", default="results.jsonl", help="결과 JSONL (재실행 시 이어서 처리)")
+    parser.add_argument("--workers", type=int, default=2, help="동시에 크롤링할 식당 수")
+    parser.add_argument("--analysis-batch", type=int, default=8, help="한 번에 분석할 식당 수")
+    parser.add_argument("--no-store", action="store_true", help="로컬 리뷰 저장소(증분 수집)를 쓰지 않음")
+    args = parser.parse_args(argv)
+
+    jobs = load_jobs(args.input)
+    store = None if args.no_store else ReviewStore()
+    try:
+        summary = run(jobs, args.output, args.workers, args.analysis_batch, store)
+    finally:
+        DRIVER_POOL.close_all()
+    log.info(f"[Batch] 종료: {summary}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
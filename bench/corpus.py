@@ -0,0 +1,51 @@
+import random
+
+# 합성 리뷰 문장 재료: ASPECT_KEYWORDS 어휘와 흔한 리뷰 표현을 섞어 실제 리뷰와 비슷한 길이·분포를 만듭니다.
+_SUBJECTS = {
+    '가격': ['가격', '가성비', '가격대', '금액'],
+    '서비스': ['서비스', '직원분들', '사장님', '응대', '주문'],
+    '맛': ['맛', '국물', '고기', '식감', '풍미', '양념'],
+    '분위기': ['분위기', '인테리어', '조명', '음악', '테이블'],
+    '메뉴': ['메뉴', '시그니처 메뉴', '세트 구성', '신메뉴', '음식 종류'],
+    '위치': ['위치', '주차', '접근성', '골목'],
+    '양': ['양', '포만감', '리필'],
+}
+_POSITIVE = [
+    '정말 좋아요', '최고였어요', '만족스러워요', '훌륭해요', '괜찮았어요', '친절했어요',
+    '맛있었어요', '깔끔했어요', '푸짐했어요', '합리적이에요', '아늑했어요', '재방문 의사 있어요',
+]
+_NEGATIVE = [
+    '별로였어요', '실망했어요', '아쉬웠어요', '불편했어요', '비싸요', '너무 짜요',
+    '느렸어요', '시끄러웠어요', '적었어요', '다시는 안 갈 것 같아요', '불친절했어요', '싱거웠어요',
+]
+_FILLERS = [
+    '친구랑 왔는데', '점심으로 먹었는데', '웨이팅이 있었지만', '주말 저녁에 방문했는데',
+    '오랜만에 왔는데', '회식으로 왔어요', '가족 외식으로', '', '', '',
+]
+_ENDINGS = ['ㅎㅎ', 'ㅠㅠ', '!!', '.', '~', '', '']
+_NAMES = ['김', '이', '박', '최', '정', '강', '조', '윤', '장', '임']
+
+
+def make_review(rng, positive=None):
+    """합성 리뷰 한 건: {'reviewer', 'text', 'rating', 'date', 'positive'}."""
+    positive = rng.random() < 0.7 if positive is None else positive
+    pool = _POSITIVE if positive else _NEGATIVE
+    clauses = []
+    for asp in rng.sample(list(_SUBJECTS), k=rng.randint(1, 3)):
+        subject = rng.choice(_SUBJECTS[asp])
+        clauses.append(f"{subject}{rng.choice(['이', '가', '은', '는', '도'])} {rng.choice(pool)}")
+    text = " ".join(filter(None, [rng.choice(_FILLERS)] + clauses)) + rng.choice(_ENDINGS)
+    rating = rng.randint(4, 5) if positive else rng.randint(1, 3)
+    return {
+        'reviewer': rng.choice(_NAMES) + "**",
+        'text': text,
+        'rating': str(rating),
+        'date': f"2024.{rng.randint(1, 12):02d}.{rng.randint(1, 28):02d}.",
+        'positive': positive,
+    }
+
+
+def make_corpus(n, seed=0):
+    """n개의 합성 리뷰 리스트 (seed가 같으면 항상 같은 코퍼스)."""
+    rng = random.Random(seed)
+    return [make_review(rng) for _ in range(n)]
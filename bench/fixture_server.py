@@ -0,0 +1,166 @@
+"""
+저장해 둔 플랫폼 리뷰 페이지 스냅샷(bench/fixtures)을 로컬 HTTP로 서빙하는 픽스처 서버입니다.
+
+    python -m bench.fixture_server --port 8765 --reviews 100
+
+리뷰 목록은 실제 사이트처럼 /api/<platform>/reviews?offset=&limit= 의 JSON(XHR)으로 내려가며,
+지도 타일·웹폰트·분석 스크립트 요청도 흉내 내 리소스 차단 효과를 측정할 수 있게 합니다.
+"""
+import json
+import time
+import zlib
+import struct
+import argparse
+import threading
+from collections import Counter
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+from bench.corpus import make_corpus
+
+FIXTURE_DIR = Path(__file__).resolve().parent / "fixtures"
+PLATFORM_SEEDS = {'kakao': 1, 'google': 2, 'naver': 3}
+
+
+def _png(width=256, height=256):
+    """단색 PNG 바이트 (지도 타일 대용)."""
+    raw = b"".join(b"\x00" + bytes([200, 220, 240]) * width for _ in range(height))
+
+    def chunk(tag, data):
+        body = tag + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw)) + chunk(b"IEND", b"")
+
+
+def _platform_reviews(platform, n):
+    reviews = []
+    for i, r in enumerate(make_corpus(n, seed=PLATFORM_SEEDS[platform])):
+        r = {k: v for k, v in r.items() if k != 'positive'}
+        r['id'] = f"{platform[0]}{i:06d}"
+        if platform == 'naver':
+            y, m, d = r['date'].rstrip('.').split('.')
+            r['date'] = f"{y}-{m}-{d}"
+        reviews.append(r)
+    return reviews
+
+
+class FixtureServer:
+    """
+    백그라운드 스레드에서 도는 픽스처 서버.
+    api_latency / asset_latency(초)로 XHR·정적 리소스 응답 지연을 흉내 내고,
+    self.hits에 경로 종류별 요청 수를 셉니다 ('api', 'asset', 'page').
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, reviews=100, api_latency=0.1, asset_latency=0.2):
+        self.reviews = {p: _platform_reviews(p, reviews) for p in PLATFORM_SEEDS}
+        self.api_latency = api_latency
+        self.asset_latency = asset_latency
+        self.hits = Counter()
+        self._tile = _png()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def platform_urls(self):
+        """crawler.PLATFORM_URLS에 그대로 넣을 수 있는 시작 URL."""
+        return {
+            'Kakao': f"{self.url}/kakao/index.html",
+            'Google': f"{self.url}/google/index.html",
+            'Naver': f"{self.url}/naver/index.html",
+        }
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fixture-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(SimpleHTTPRequestHandler):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, directory=str(FIXTURE_DIR), **kwargs)
+
+            def log_message(self, fmt, *args):
+                pass
+
+            def _send(self, status, body=b"", content_type="application/octet-stream"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if body:
+                    self.wfile.write(body)
+
+            def do_POST(self):
+                server.hits['asset'] += 1
+                self._send(204)
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                parts = parsed.path.strip("/").split("/")
+                if len(parts) == 3 and parts[0] == "api" and parts[2] == "reviews":
+                    return self._api(parts[1], parse_qs(parsed.query))
+                if parsed.path in ("/static/tile.png", "/static/font.woff2", "/static/collect"):
+                    server.hits['asset'] += 1
+                    time.sleep(server.asset_latency)
+                    if parsed.path.endswith(".png"):
+                        return self._send(200, server._tile, "image/png")
+                    if parsed.path.endswith(".woff2"):
+                        return self._send(200, bytes(64 * 1024), "font/woff2")
+                    return self._send(204)
+                server.hits['page'] += 1
+                return super().do_GET()
+
+            def _api(self, platform, query):
+                if platform not in server.reviews:
+                    return self._send(404)
+                server.hits['api'] += 1
+                time.sleep(server.api_latency)
+                offset = int(query.get("offset", ["0"])[0])
+                limit = int(query.get("limit", ["10"])[0])
+                items = server.reviews[platform]
+                body = json.dumps(
+                    {'total': len(items), 'offset': offset, 'reviews': items[offset:offset + limit]},
+                    ensure_ascii=False,
+                ).encode("utf-8")
+                return self._send(200, body, "application/json; charset=utf-8")
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="리뷰 페이지 픽스처 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--reviews", type=int, default=100, help="플랫폼별 리뷰 수")
+    args = parser.parse_args()
+    server = FixtureServer(args.host, args.port, reviews=args.reviews).start()
+    for platform, url in server.platform_urls().items():
+        print(f"{platform}: {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
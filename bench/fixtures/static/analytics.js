@@ -0,0 +1,2 @@
+// fixture: 실제 페이지의 분석 스크립트 요청을 흉내냅니다
+navigator.sendBeacon && navigator.sendBeacon("/static/collect", "{}");
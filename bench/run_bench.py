@@ -0,0 +1,402 @@
+"""
+오프라인 성능 벤치마크. 실제 Kakao/Google/Naver에 접속하지 않고 측정합니다.
+
+    python -m bench.run_bench analysis --sizes 100,1000,10000
+    python -m bench.run_bench analysis --sizes 1000 --backends torch,int8,onnx   # 감성 추론 백엔드 비교
+    python -m bench.run_bench crawl --reviews 100 --repeat 2
+    python -m bench.run_bench crawl --blocking off,on     # 리소스 차단 전후 비교
+    python -m bench.run_bench crawl --capture             # 응답 캡처 모드 (파서 재생 검사 포함)
+
+- analysis: 합성 리뷰 코퍼스로 형태소 분석(배치) / 감성 분석 / TF-IDF 키워드 / 측면 태깅 단계를 측정
+  (--backends: 대신 감성 추론 백엔드별 처리량과 fp32 torch 대비 레이블 일치율을 비교하고 추천 백엔드를 표시)
+- crawl: 픽스처 서버(bench/fixture_server.py)를 띄우고 플랫폼별 크롤러를 처음부터 끝까지 측정
+  (--capture: 먼저 픽스처 API 응답을 xhr_capture 파서·ResponseCapture에 재생해 검사한 뒤 캡처 모드로 크롤링)
+
+결과는 bench/history.json에 누적되며, 직전 같은 측정값보다 지정 비율 이상 나빠지면 회귀로 표시합니다.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import urllib.request
+import subprocess
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from bench.corpus import make_corpus
+
+HISTORY_PATH = Path(__file__).resolve().parent / "history.json"
+# 지표 이름 접미사별 "나빠지는 방향": +1이면 값이 커질수록 나쁨, -1이면 작아질수록 나쁨
+METRIC_DIRECTIONS = {'seconds': 1, 'peak_mb': 1, 'per_sec': -1, 'asset_requests': 1}
+
+
+def _peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(fn, n_items, trace_memory=False):
+    """fn()을 실행해 {'seconds', 'per_sec'[, 'peak_mb']}와 fn의 반환값을 돌려줍니다."""
+    start = time.perf_counter()
+    out = fn()
+    elapsed = time.perf_counter() - start
+    result = {'seconds': round(elapsed, 4), 'per_sec': round(n_items / elapsed, 1) if elapsed else None}
+    if trace_memory:
+        # 시간 측정과 분리해 tracemalloc 오버헤드가 지연 시간에 섞이지 않게 한 번 더 실행
+        tracemalloc.start()
+        fn()
+        result['peak_mb'] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+        tracemalloc.stop()
+    return result, out
+
+
+# --- 분석 파이프라인 벤치마크 ---
+def bench_analysis(sizes, trace_memory=False):
+    import analysis
+
+    results = {}
+    for n in sizes:
+        corpus = make_corpus(n, seed=n)
+        texts = [r['text'] for r in corpus]
+        print(f"[bench] analysis n={n}")
+
+        # 형태소 분석 (배치 호출, 메모 미사용 — 반복 측정이 메모 적중으로 빨라지지 않게)
+        tokenizer = analysis.get_tokenizer()
+        res, cleaned = measure(lambda: tokenizer.tokenize_many(texts, memo=False), n, trace_memory)
+        res['backend'] = tokenizer.name
+        results[f"analysis/n={n}/tokenize"] = res
+
+        analyzer = analysis.get_sentiment_analyzer()
+        if analyzer is not None:
+            res, preds = measure(lambda: analyzer(cleaned), n, trace_memory)
+            res['backend'] = analyzer.backend.name
+            results[f"analysis/n={n}/sentiment"] = res
+            labels = ['긍정' if p['label'] == 'LABEL_1' else '부정' for p in preds]
+
+            # 캐스케이드: 어휘·별점 1단계가 결정하는 비율과 전체 모델 결과와의 일치율
+            ratings = [r['rating'] for r in corpus]
+            res, report = measure(lambda: analysis.LEXICON.score(texts, ratings), n, trace_memory)
+            cmp = analysis.agreement(report, preds)
+            res.update(cascade_rate=analysis.LEXICON.last_report['cascade_rate'],
+                       agreement=cmp['agreement'], model_neutral=cmp['model_neutral'])
+            results[f"analysis/n={n}/cascade"] = res
+        else:
+            print("[bench] 감성 모델을 불러올 수 없어 sentiment 단계는 건너뜁니다.")
+            labels = ['긍정' if r['positive'] else '부정' for r in corpus]
+
+        res, aspect_mat = measure(lambda: analysis.ASPECT_MATCHER.match(cleaned, texts), n, trace_memory)
+        results[f"analysis/n={n}/aspects"] = res
+
+        def keywords():
+            engine = analysis.KeywordEngine(cleaned)
+            out = {lbl: engine.top_terms([l == lbl for l in labels]) for lbl in ('긍정', '부정')}
+            out['전체'] = engine.top_terms()
+            out.update({asp: engine.top_terms(aspect_mat[asp], top_n=5) for asp in aspect_mat.columns})
+            return out
+
+        res, _ = measure(keywords, n, trace_memory)
+        results[f"analysis/n={n}/tfidf"] = res
+
+        res, _ = measure(lambda: analysis.get_top_tfidf_keywords(cleaned), n, trace_memory)
+        results[f"analysis/n={n}/get_top_tfidf_keywords"] = res
+
+    results['analysis/process'] = {'peak_mb': round(_peak_rss_mb(), 1)}
+    return results
+
+
+# --- 응답 캡처 재생 검사 (브라우저 없이) ---
+class _ReplayDriver:
+    """성능 로그 항목과 응답 본문을 미리 채워 두고 ResponseCapture에 돌려주는 가짜 드라이버."""
+
+    def __init__(self):
+        self.entries, self.bodies = [], {}
+
+    def add_response(self, url, body):
+        rid = str(len(self.bodies) + 1)
+        self.bodies[rid] = body
+        for method, params in (('Network.responseReceived', {'requestId': rid, 'response': {'url': url}}),
+                               ('Network.loadingFinished', {'requestId': rid})):
+            self.entries.append({'message': json.dumps({'message': {'method': method, 'params': params}})})
+
+    def get_log(self, kind):
+        entries, self.entries = self.entries, []
+        return entries
+
+    def execute_cdp_cmd(self, cmd, params):
+        if cmd == "Network.getResponseBody":
+            return {'body': self.bodies[params['requestId']]}
+        return {}
+
+
+def _native_payloads(platform, items):
+    """픽스처 리뷰를 실제 사이트 응답 형식으로 바꾼 (url, body) 목록. 일반 형식은 픽스처 서버가 그대로 내려줍니다."""
+    if platform == 'Kakao':
+        payload = {'comment': {'list': [{'username': r['reviewer'], 'contents': r['text'], 'point': r['rating'],
+                                         'date': r['date'], 'commentid': r['id']} for r in items]}}
+        return [("https://place.map.kakao.com/commentlist/v/1/1", json.dumps(payload, ensure_ascii=False))]
+    if platform == 'Naver':
+        payload = [{'data': {'visitorReviews': {'items': [
+            {'author': {'nickname': r['reviewer']}, 'body': r['text'], 'rating': r['rating'],
+             'created': r['date'], 'id': r['id']} for r in items]}}}]
+        return [("https://pcmap-api.place.naver.com/graphql", json.dumps(payload, ensure_ascii=False))]
+    payload = {'reviews': items}
+    return [("https://www.google.com/maps/rpc/listugcposts?review=1",
+             ")]}'\n" + json.dumps(payload, ensure_ascii=False))]
+
+
+def check_capture(server, platforms=None, page=10):
+    """
+    픽스처 서버의 /api/<platform>/reviews 응답(페이지 단위)과 같은 리뷰의 실제 사이트 형식 응답을
+    xhr_capture.parse_payload와 ResponseCapture에 재생해 추출 결과가 픽스처와 같은지 검사합니다.
+    리뷰 API가 아닌 응답은 무시되고, 같은 리뷰가 다시 내려와도 한 번만 모여야 합니다.
+    반환: {'crawl/capture_replay/<platform>': {'responses', 'rows', 'expected', 'ok'[, 'error']}}
+    """
+    import xhr_capture
+
+    results = {}
+    for platform in platforms or list(xhr_capture.API_PATTERNS):
+        items = server.reviews[platform.lower()]
+        expected = [xhr_capture._row(r['reviewer'], r['text'], r['rating'], r['date'], r['id']) for r in items]
+        driver = _ReplayDriver()
+        capture = xhr_capture.ResponseCapture(driver, platform)
+        errors = []
+        for offset in range(0, len(items), page):
+            url = f"{server.url}/api/{platform.lower()}/reviews?offset={offset}&limit={page}"
+            with urllib.request.urlopen(url, timeout=10) as resp:
+                body = resp.read().decode("utf-8")
+            if xhr_capture.parse_payload(platform, body) != expected[offset:offset + page]:
+                errors.append(f"parse_payload 불일치 (offset={offset})")
+            driver.add_response(url, body)
+            driver.add_response(f"{server.url}/static/collect", body)  # 리뷰 API가 아닌 응답
+        if capture.rows() != expected:
+            errors.append("ResponseCapture 누적 결과 불일치")
+        for url, body in _native_payloads(platform, items[:page]):
+            if xhr_capture.parse_payload(platform, body) != expected[:page]:
+                errors.append(f"실제 형식 parse_payload 불일치 ({url})")
+            driver.add_response(url, body)  # 이미 모은 리뷰 → 중복으로 늘지 않아야 함
+        rows = capture.rows()
+        if rows != expected:
+            errors.append(f"중복 제거 실패 ({len(rows)}건)")
+        key = f"crawl/capture_replay/{platform}"
+        results[key] = {'responses': capture.responses, 'rows': len(rows), 'expected': len(expected),
+                        'ok': not errors}
+        if errors:
+            results[key]['error'] = "; ".join(errors)
+        print(f"[bench] {key}: {'OK' if not errors else results[key]['error']}")
+    return results
+
+
+# --- 감성 추론 백엔드 비교 ---
+def bench_backends(sizes, names, tolerance=0.01):
+    """
+    sentiment_engine.compare_backends로 백엔드별 지연·처리량과 fp32 torch 대비 일치율을 측정해 표로 출력합니다.
+    허용 오차(tolerance) 안에서 가장 빠른 백엔드가 'recommended'입니다 (SENTIMENT_BACKEND에 지정).
+    """
+    import analysis
+    from sentiment_engine import compare_backends
+
+    results = {}
+    model, tokenizer = analysis.model, analysis.tokenizer
+    if model is None:
+        print("[bench] 감성 모델을 불러올 수 없어 백엔드 비교를 건너뜁니다.")
+        return results
+    for n in sizes:
+        corpus = make_corpus(n, seed=n)
+        cleaned = analysis.get_tokenizer().tokenize_many([r['text'] for r in corpus])
+        print(f"[bench] backends n={n}")
+        cmp = compare_backends(model, tokenizer, cleaned, names=names, tolerance=tolerance)
+        print(f"{'backend':<8} {'seconds':>8} {'per_sec':>9} {'agreement':>10} {'max_diff':>9}  ok")
+        for name, rep in cmp['backends'].items():
+            key = f"analysis/n={n}/backend={name}"
+            if 'error' in rep:
+                results[key] = {'error': rep['error']}
+                print(f"{name:<8} 오류: {rep['error']}")
+                continue
+            results[key] = {'seconds': rep['seconds'], 'per_sec': rep['reviews_per_sec'],
+                            'agreement': rep['agreement'], 'max_score_diff': rep['max_score_diff'],
+                            'within_tolerance': rep['within_tolerance']}
+            print(f"{name:<8} {rep['seconds']:>8.3f} {rep['reviews_per_sec']:>9.1f} "
+                  f"{rep['agreement']:>10.4f} {rep['max_score_diff']:>9.4f}  {'✓' if rep['within_tolerance'] else '✗'}")
+        results[f"analysis/n={n}/backends"] = {'recommended': cmp['recommended'], 'tolerance': tolerance}
+        print(f"[bench] 추천 백엔드 (일치율 ≥ {1 - tolerance:.2%} 중 최고 처리량): {cmp['recommended']}")
+    return results
+
+
+# --- 크롤러 벤치마크 (픽스처 서버 사용) ---
+def bench_crawl(reviews=100, repeat=1, platforms=None, blocking=("on",), capture=False):
+    """
+    blocking: 리소스 차단 설정별로 측정 ("on", "off"). 차단 prefs는 브라우저 시작 시 고정되므로
+    설정마다 새 WebDriver 풀을 만듭니다. 페이지 로드 시간, 정적 리소스 요청 수, 브라우저 RSS를 함께 기록합니다.
+    capture: 응답 캡처 모드(CRAWL_CAPTURE)로 크롤링합니다. 먼저 check_capture로 파서를 검사합니다.
+    """
+    import crawler
+    import metrics
+    import xhr_capture
+    import resource_blocking
+    from driver_pool import DriverPool, browser_rss_mb
+    from bench.fixture_server import FixtureServer
+
+    results = {}
+    original_pool, original_enabled = crawler.DRIVER_POOL, resource_blocking.BLOCKING_ENABLED
+    original_capture = xhr_capture.CAPTURE_ENABLED
+    with FixtureServer(reviews=reviews) as server:
+        crawler.PLATFORM_URLS.update(server.platform_urls())
+        if capture:
+            results.update(check_capture(server, platforms))
+            xhr_capture.CAPTURE_ENABLED = True
+        try:
+            for mode in blocking:
+                resource_blocking.BLOCKING_ENABLED = (mode == "on")
+                crawler.DRIVER_POOL = DriverPool(crawler.init_driver, max_size=1)
+                prefix = "crawl" if tuple(blocking) == ("on",) else f"crawl/blocking={mode}"
+                prefix += "/capture" if capture else ""
+                for platform in platforms or list(crawler.PLATFORM_CRAWLERS):
+                    results.update(_bench_platform(crawler, server, platform, repeat, prefix,
+                                                   metrics, browser_rss_mb))
+                crawler.DRIVER_POOL.close_all()
+        finally:
+            crawler.DRIVER_POOL, resource_blocking.BLOCKING_ENABLED = original_pool, original_enabled
+            xhr_capture.CAPTURE_ENABLED = original_capture
+        results['crawl/fixture_requests'] = dict(server.hits)
+    results['crawl/process'] = {'peak_mb': round(_peak_rss_mb(), 1)}
+    return results
+
+
+def _bench_platform(crawler, server, platform, repeat, prefix, metrics, browser_rss_mb):
+    results = {}
+    crawl_fn = crawler.PLATFORM_CRAWLERS[platform]
+    for run in range(1, repeat + 1):
+        stats = {}
+        assets_before = server.hits['asset']
+        loads_before = metrics.stage_total('page_load', platform=platform)
+        start = time.perf_counter()
+        try:
+            got = crawl_fn("테스트 식당", stats=stats)
+            error = None
+        except Exception as e:
+            got, error = [], f"{type(e).__name__}: {e}"
+        elapsed = time.perf_counter() - start
+        loads_after = metrics.stage_total('page_load', platform=platform)
+        try:
+            with crawler.DRIVER_POOL.session(timeout=5) as driver:
+                rss = browser_rss_mb(driver)
+        except Exception:
+            rss = None
+        key = f"{prefix}/{platform}/run={run}"
+        results[key] = {
+            'seconds': round(elapsed, 3),
+            'per_sec': round(len(got) / elapsed, 1) if elapsed else None,
+            'reviews': len(got),
+            'waited_seconds': stats.get('waited'),
+            'page_load_seconds': round(loads_after[1] - loads_before[1], 3),
+            'asset_requests': server.hits['asset'] - assets_before,
+            'browser_peak_mb': round(rss, 1) if rss is not None else None,
+        }
+        if error:
+            results[key]['error'] = error
+        print(f"[bench] {key}: {len(got)}개, {elapsed:.1f}s, 리소스 요청 {results[key]['asset_requests']}건"
+              + (f" ({error})" if error else ""))
+    return results
+
+
+# --- 기록 / 회귀 비교 ---
+def _git_rev():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except Exception:
+        return None
+
+
+def load_history(path=HISTORY_PATH):
+    if not Path(path).exists():
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def find_regressions(results, history, suite, threshold):
+    """같은 suite의 직전 기록과 비교해 threshold 비율 이상 나빠진 지표 목록을 반환합니다."""
+    previous = next((run for run in reversed(history) if run['suite'] == suite), None)
+    if not previous:
+        return []
+    regressions = []
+    for key, metrics in results.items():
+        old = previous['results'].get(key, {})
+        for metric, value in metrics.items():
+            direction = next((d for suffix, d in METRIC_DIRECTIONS.items() if metric.endswith(suffix)), None)
+            before = old.get(metric)
+            if not direction or not isinstance(value, (int, float)) or not isinstance(before, (int, float)) or not before:
+                continue
+            change = (value - before) / before * direction
+            if change > threshold:
+                regressions.append({'key': key, 'metric': metric, 'before': before, 'after': value,
+                                    'change_pct': round(change * 100, 1)})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="오프라인 성능 벤치마크")
+    parser.add_argument("suite", choices=["analysis", "crawl"])
+    parser.add_argument("--sizes", default="100,1000,10000", help="analysis: 합성 리뷰 수 (쉼표 구분, 최대 100000)")
+    parser.add_argument("--memory", action="store_true", help="analysis: 단계별 tracemalloc 최대 메모리도 측정")
+    parser.add_argument("--backends", default=None,
+                        help="analysis: 감성 추론 백엔드 비교 (torch,int8,onnx 중 쉼표 구분)")
+    parser.add_argument("--tolerance", type=float, default=0.01,
+                        help="analysis --backends: torch 대비 허용 레이블 불일치 비율 (기본 1%%)")
+    parser.add_argument("--reviews", type=int, default=100, help="crawl: 픽스처 서버의 플랫폼별 리뷰 수")
+    parser.add_argument("--repeat", type=int, default=2, help="crawl: 플랫폼별 반복 횟수 (1회차는 브라우저 콜드 스타트)")
+    parser.add_argument("--platforms", default=None, help="crawl: Kakao,Google,Naver 중 일부")
+    parser.add_argument("--blocking", default="on", help="crawl: 리소스 차단 설정 on / off / on,off (전후 비교)")
+    parser.add_argument("--capture", action="store_true", help="crawl: 응답 캡처 모드로 측정 (파서 재생 검사 포함)")
+    parser.add_argument("--history", default=str(HISTORY_PATH))
+    parser.add_argument("--threshold", type=float, default=0.2, help="회귀로 볼 악화 비율 (기본 20%%)")
+    parser.add_argument("--no-record", action="store_true", help="history에 기록하지 않음")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.suite == "analysis":
+        sizes = [min(int(s), 100000) for s in args.sizes.split(",") if s.strip()]
+        if args.backends:
+            names = tuple(b.strip() for b in args.backends.split(",") if b.strip())
+            results = bench_backends(sizes, names, args.tolerance)
+        else:
+            results = bench_analysis(sizes, trace_memory=args.memory)
+    else:
+        platforms = args.platforms.split(",") if args.platforms else None
+        blocking = tuple(m.strip() for m in args.blocking.split(",") if m.strip() in ("on", "off")) or ("on",)
+        results = bench_crawl(args.reviews, args.repeat, platforms, blocking, capture=args.capture)
+
+    history = load_history(args.history)
+    regressions = find_regressions(results, history, args.suite, args.threshold)
+    run = {
+        'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'git_rev': _git_rev(),
+        'suite': args.suite,
+        'env': {k: v for k, v in os.environ.items() if k.startswith(("SENTIMENT_", "CRAWL_", "DRIVER_", "RESOURCE_"))},
+        'results': results,
+        'regressions': regressions,
+    }
+    print(json.dumps(run, ensure_ascii=False, indent=2))
+    if not args.no_record:
+        history.append(run)
+        with open(args.history, 'w', encoding='utf-8') as f:
+            json.dump(history, f, ensure_ascii=False, indent=1)
+
+    for r in regressions:
+        print(f"[bench] 회귀: {r['key']} {r['metric']} {r['before']} → {r['after']} (+{r['change_pct']}%)")
+    if regressions and args.fail_on_regression:
+        return 1
+    if any(r.get('ok') is False for r in results.values()):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
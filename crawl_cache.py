@@ -0,0 +1,227 @@
+"""
+플랫폼별 크롤링 결과 캐시 (메모리 LRU → 디스크 SQLite 2단계, TTL 적용).
+
+- 키: (플랫폼, 정규화한 식당 이름). 플랫폼마다 따로 저장하므로 한 플랫폼만 실패해도 나머지는 재사용됩니다.
+- 성공(리뷰가 1개 이상)만 일반 캐시에 넣고 CRAWL_CACHE_TTL 동안 재사용합니다.
+- 실패와 "리뷰 없음"이 확인된 빈 결과는 별도의 실패 캐시에 짧게(CRAWL_CACHE_NEGATIVE_TTL) 기록해, 같은 식당을
+  연달아 요청해도 막힌 사이트를 바로 다시 두드리지 않게 합니다. 실패 기록은 성공 캐시를 덮어쓰지 않습니다.
+  오류도 없고 리뷰 없음 확인도 없는 빈 결과는 어느 쪽에도 기록하지 않습니다.
+- 메모리 계층은 CRAWL_CACHE_MEMORY_ENTRIES 개까지(LRU), 디스크 계층은 여러 Streamlit 워커 프로세스가
+  같은 파일을 공유하며 CRAWL_CACHE_MAX_ENTRIES 개를 넘으면 가장 오래 쓰지 않은 항목부터 지웁니다.
+- invalidate는 디스크의 세대 번호(crawl_cache_meta.generation)를 올립니다. 메모리 항목은 넣을 때의 세대를
+  함께 기억하고, 적중 시 디스크 세대와 다르면 버리므로 다른 프로세스의 invalidate도 반영됩니다.
+
+CRAWL_CACHE_TTL=0 이면 캐시를 쓰지 않습니다.
+"""
+import os
+import json
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from metrics import get_logger, incr, set_gauge
+from review_store import normalize_place
+
+log = get_logger("crawl_cache")
+
+CRAWL_CACHE_PATH = os.getenv("CRAWL_CACHE_PATH", os.path.join(".cache", "crawl_cache.db"))
+# 성공 결과 보관 시간(초) / 실패 결과 보관 시간(초)
+CRAWL_CACHE_TTL = int(os.getenv("CRAWL_CACHE_TTL", "21600"))
+CRAWL_CACHE_NEGATIVE_TTL = int(os.getenv("CRAWL_CACHE_NEGATIVE_TTL", "120"))
+# 메모리 계층 최대 항목 수 / 디스크 계층 최대 항목 수
+CRAWL_CACHE_MEMORY_ENTRIES = int(os.getenv("CRAWL_CACHE_MEMORY_ENTRIES", "64"))
+CRAWL_CACHE_MAX_ENTRIES = int(os.getenv("CRAWL_CACHE_MAX_ENTRIES", "5000"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS crawl_cache (
+    platform   TEXT NOT NULL,
+    place      TEXT NOT NULL,
+    reviews    TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    last_used  REAL NOT NULL,
+    PRIMARY KEY (platform, place)
+);
+CREATE INDEX IF NOT EXISTS crawl_cache_last_used ON crawl_cache (last_used);
+CREATE TABLE IF NOT EXISTS crawl_failures (
+    platform   TEXT NOT NULL,
+    place      TEXT NOT NULL,
+    error      TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (platform, place)
+);
+CREATE TABLE IF NOT EXISTS crawl_cache_meta (
+    key   TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO crawl_cache_meta (key, value) VALUES ('generation', 0);
+"""
+
+
+class CrawlCache:
+    """
+    get(platform, name) → ('memory' | 'disk', reviews) / ('negative', error) / (None, None)
+    (빈 결과로 기록된 실패 캐시는 error가 빈 문자열입니다.)
+    put(platform, name, reviews, error=None, empty=False)로 크롤링 결과를 기록합니다.
+    """
+
+    def __init__(self, path=CRAWL_CACHE_PATH, ttl=CRAWL_CACHE_TTL, negative_ttl=CRAWL_CACHE_NEGATIVE_TTL,
+                 memory_entries=CRAWL_CACHE_MEMORY_ENTRIES, max_entries=CRAWL_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.memory_entries = memory_entries
+        self.max_entries = max_entries
+        self._memory = OrderedDict()    # (platform, place) -> (expires_at, reviews, generation)
+        self._lock = threading.Lock()
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'negative_hits': 0, 'misses': 0,
+                      'expired': 0, 'evictions': 0, 'stores': 0, 'failures': 0}
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _generation(conn):
+        return conn.execute("SELECT value FROM crawl_cache_meta WHERE key = 'generation'").fetchone()[0]
+
+    def _count(self, stat, platform):
+        self.stats[stat] += 1
+        incr('crawl_cache_events_total', event=stat, platform=platform)
+
+    def _remember(self, key, expires_at, reviews, generation):
+        """메모리 계층에 넣고 한도를 넘으면 가장 오래 쓰지 않은 항목을 내보냅니다 (락 안에서 호출)."""
+        self._memory[key] = (expires_at, reviews, generation)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            evicted, _ = self._memory.popitem(last=False)
+            self._count('evictions', evicted[0])
+        set_gauge('crawl_cache_memory_entries', len(self._memory))
+
+    def get(self, platform, name):
+        key = (platform, normalize_place(name))
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+        if entry is not None:
+            # 다른 프로세스가 invalidate했는지 디스크 세대 번호만 확인합니다 (리뷰 JSON은 읽지 않음).
+            with self._connect() as conn:
+                current = self._generation(conn)
+            with self._lock:
+                if self._memory.get(key) is entry:
+                    if entry[0] > now and entry[2] == current:
+                        self._memory.move_to_end(key)
+                        self._count('memory_hits', platform)
+                        return 'memory', list(entry[1])
+                    del self._memory[key]
+                    if entry[0] <= now:
+                        self._count('expired', platform)
+
+        with self._connect() as conn:
+            generation = self._generation(conn)
+            row = conn.execute(
+                "SELECT reviews, expires_at FROM crawl_cache WHERE platform = ? AND place = ?", key
+            ).fetchone()
+            if row and row[1] > now:
+                conn.execute("UPDATE crawl_cache SET last_used = ? WHERE platform = ? AND place = ?",
+                             (now, *key))
+            failure = None if row and row[1] > now else conn.execute(
+                "SELECT error FROM crawl_failures WHERE platform = ? AND place = ? AND expires_at > ?",
+                (*key, now),
+            ).fetchone()
+
+        with self._lock:
+            if row and row[1] > now:
+                reviews = json.loads(row[0])
+                self._remember(key, row[1], reviews, generation)
+                self._count('disk_hits', platform)
+                return 'disk', list(reviews)
+            if row:
+                self._count('expired', platform)
+            if failure:
+                self._count('negative_hits', platform)
+                return 'negative', failure[0]
+            self._count('misses', platform)
+        return None, None
+
+    def put(self, platform, name, reviews, error=None, empty=False):
+        """
+        성공(오류 없고 리뷰가 있음)은 일반 캐시에, 오류 또는 확인된 빈 결과(empty=True)는 실패 캐시에 기록합니다.
+        오류 없이 비었지만 리뷰 없음이 확인되지 않은 결과는 기록하지 않습니다 (다음 요청에서 다시 크롤링).
+        """
+        if self.ttl <= 0:
+            return
+        key = (platform, normalize_place(name))
+        now = time.time()
+        if not error and not reviews and not empty:
+            return
+        if error or not reviews:
+            if self.negative_ttl > 0:
+                with self._connect() as conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO crawl_failures (platform, place, error, expires_at) "
+                        "VALUES (?, ?, ?, ?)",
+                        (*key, error or "", now + self.negative_ttl),
+                    )
+                    conn.execute("DELETE FROM crawl_failures WHERE expires_at <= ?", (now,))
+                with self._lock:
+                    self._count('failures', platform)
+            return
+
+        expires_at = now + self.ttl
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO crawl_cache (platform, place, reviews, expires_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (*key, json.dumps(reviews, ensure_ascii=False), expires_at, now),
+            )
+            conn.execute("DELETE FROM crawl_failures WHERE platform = ? AND place = ?", key)
+            conn.execute("DELETE FROM crawl_cache WHERE expires_at <= ?", (now,))
+            generation = self._generation(conn)
+            (count,) = conn.execute("SELECT COUNT(*) FROM crawl_cache").fetchone()
+            evicted = 0
+            if count > self.max_entries:
+                # 매번 정리하지 않도록 한도의 90%까지 한 번에 줄입니다.
+                evicted = conn.execute(
+                    "DELETE FROM crawl_cache WHERE rowid IN "
+                    "(SELECT rowid FROM crawl_cache ORDER BY last_used LIMIT ?)",
+                    (count - int(self.max_entries * 0.9),),
+                ).rowcount
+        with self._lock:
+            self._remember(key, expires_at, list(reviews), generation)
+            self._count('stores', platform)
+            self.stats['evictions'] += evicted
+
+    def invalidate(self, name, platforms=None):
+        """
+        식당 하나의 캐시(성공·실패 모두)를 지웁니다. platforms를 주면 해당 플랫폼만.
+        세대 번호를 올려 다른 프로세스의 메모리 계층 항목도 다음 조회 때 버려지게 합니다.
+        """
+        place = normalize_place(name)
+        with self._lock:
+            for key in [k for k in self._memory if k[1] == place and (not platforms or k[0] in platforms)]:
+                del self._memory[key]
+        with self._connect() as conn:
+            for table in ("crawl_cache", "crawl_failures"):
+                if platforms:
+                    conn.executemany(f"DELETE FROM {table} WHERE platform = ? AND place = ?",
+                                     [(p, place) for p in platforms])
+                else:
+                    conn.execute(f"DELETE FROM {table} WHERE place = ?", (place,))
+            conn.execute("UPDATE crawl_cache_meta SET value = value + 1 WHERE key = 'generation'")
+
+    def hit_rate(self):
+        hits = self.stats['memory_hits'] + self.stats['disk_hits']
+        total = hits + self.stats['negative_hits'] + self.stats['misses']
+        return hits / total if total else 0.0
@@ -0,0 +1,240 @@
+"""
+프로세스 전체가 공유하는 크롤링 작업 스케줄러입니다.
+
+여러 세션이 동시에 분석을 요청해도 스크립트 스레드에서 곧바로 브라우저를 띄우지 않고 작업을 큐에 넣습니다.
+- 브라우저 예산: 동시에 실행하는 작업은 CRAWL_MAX_JOBS 개까지입니다. 기본값은 DRIVER_POOL_SIZE를
+  작업 하나가 쓰는 브라우저 수(CRAWL_CONCURRENCY)로 나눈 값입니다. 실제 브라우저 수의 상한은 DRIVER_POOL이 지킵니다.
+- 공정성: 사용자별 FIFO 큐를 두고, 우선순위(작을수록 먼저)가 같으면 가장 오래 차례를 받지 못한 사용자부터 꺼냅니다.
+- 중복 제거: 같은 식당(정규화한 이름)·같은 crawl_all_reviews 인자(store, incremental, use_cache …)로 대기 중이거나
+  실행 중인 작업이 있으면 새로 만들지 않고 그 작업 id를 돌려줍니다.
+- 조회: submit()이 돌려준 job id로 poll()을 불러 상태·대기 순번·지금까지 수집된 리뷰 묶음을 받습니다.
+- 단계별 시간: 작업은 자기 trace(metrics.start_trace) 안에서 실행되고, 끝나면 poll()의 'spans'로 그 기록
+  (대기 시간 crawl_queue_wait 포함)을 돌려줍니다. 요청한 세션은 이를 자기 trace에 더해 단계별 시간에 보여 줍니다.
+- 지표: crawl_queue_depth, crawl_jobs_running (gauge), crawl_queue_wait (stage), crawl_jobs_total{result},
+  crawl_jobs_deduped_total (counter).
+"""
+import os
+import time
+import uuid
+import itertools
+import threading
+import contextvars
+from collections import deque
+
+from metrics import get_logger, incr, set_gauge, observe, start_trace
+from review_store import normalize_place
+from crawler import crawl_all_reviews, CRAWL_CONCURRENCY, DRIVER_POOL_SIZE
+
+log = get_logger("scheduler")
+
+CRAWL_MAX_JOBS = int(os.getenv("CRAWL_MAX_JOBS", str(max(1, DRIVER_POOL_SIZE // max(1, CRAWL_CONCURRENCY)))))
+# 끝난 작업을 poll()로 조회할 수 있게 남겨 두는 시간(초)
+CRAWL_JOB_RETENTION = int(os.getenv("CRAWL_JOB_RETENTION", "600"))
+
+FINISHED = ('done', 'error')
+
+
+def dedup_key(name, kwargs):
+    """중복 제거 키: 정규화한 식당 이름 + crawl_all_reviews 인자 (값이 아닌 객체(store 등)는 id로 구분)."""
+    args = tuple(sorted(
+        (k, v if isinstance(v, (str, int, float, bool, type(None))) else f"{type(v).__name__}@{id(v)}")
+        for k, v in kwargs.items()
+    ))
+    return normalize_place(name), args
+
+
+class CrawlJob:
+    """크롤링 작업 하나. 리뷰 묶음은 추출되는 대로 events에 쌓이고 poll()이 커서 이후분을 돌려줍니다."""
+
+    def __init__(self, name, user, priority, kwargs):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.key = dedup_key(name, kwargs)
+        self.users = [user]
+        self.priority = priority
+        self.kwargs = kwargs
+        self.status = 'queued'
+        self.events = []            # [(platform, [review, ...]), ...]
+        self.reviews = None         # 완료 시 crawl_all_reviews의 merged
+        self.report = None
+        self.error = None
+        self.spans = []             # 작업 trace의 (stage, labels, seconds) 기록
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    def _on_reviews(self, platform, batch):
+        with self._lock:
+            self.events.append((platform, list(batch)))
+
+
+class CrawlScheduler:
+    def __init__(self, max_jobs=CRAWL_MAX_JOBS, crawl_fn=crawl_all_reviews, retention=CRAWL_JOB_RETENTION):
+        self.max_jobs = max(1, max_jobs)
+        self.crawl_fn = crawl_fn
+        self.retention = retention
+        self._cond = threading.Condition()
+        self._queues = {}           # user -> deque[CrawlJob]
+        self._last_served = {}      # user -> 마지막으로 작업을 꺼낸 순번 (작을수록 오래 기다림)
+        self._turn = itertools.count(1)
+        self._jobs = {}             # job id -> CrawlJob
+        self._active = {}           # 식당 키 -> 대기 중·실행 중인 CrawlJob
+        self._running = 0
+        self._workers = []
+
+    # --- 제출 / 조회 ---
+    def submit(self, name, user='default', priority=0, **kwargs):
+        """
+        작업을 큐에 넣고 job id를 반환합니다. kwargs는 crawl_all_reviews에 그대로 넘깁니다 (store 등).
+        같은 식당·같은 kwargs의 작업이 이미 대기 중이거나 실행 중이면 그 id를 반환합니다 (요청한 사용자만 추가).
+        """
+        key = dedup_key(name, kwargs)
+        with self._cond:
+            self._purge()
+            job = self._active.get(key)
+            if job is not None:
+                if user not in job.users:
+                    job.users.append(user)
+                incr('crawl_jobs_deduped_total')
+                log.info(f"[Scheduler] '{name}' 진행 중인 작업 {job.id} 공유 (사용자 {user})")
+                return job.id
+            job = CrawlJob(name, user, priority, kwargs)
+            self._jobs[job.id] = job
+            self._active[key] = job
+            self._queues.setdefault(user, deque()).append(job)
+            self._last_served.setdefault(user, 0)
+            self._update_gauges()
+            self._ensure_workers()
+            self._cond.notify()
+        log.info(f"[Scheduler] 작업 {job.id} 등록: '{name}' (사용자 {user}, 대기 {self.queue_depth()}개)")
+        return job.id
+
+    def poll(self, job_id, cursor=0):
+        """
+        {'status', 'position', 'batches', 'cursor', 'reviews', 'report', 'error', 'spans'}를 반환합니다.
+        batches는 cursor 이후 새로 도착한 (platform, reviews) 목록이고, 다음 호출에는 돌려받은 cursor를 넘깁니다.
+        position은 대기 중일 때 앞에 있는 작업 수(0부터), 그 외에는 None입니다.
+        spans는 작업이 끝났을 때 그 작업의 span 기록(metrics.trace 형식), 그 전에는 빈 리스트입니다.
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise KeyError(f"알 수 없는 작업 id: {job_id}")
+        with job._lock:
+            batches = job.events[cursor:]
+            status = job.status
+        return {
+            'status': status,
+            'position': self._position(job) if status == 'queued' else None,
+            'batches': batches,
+            'cursor': cursor + len(batches),
+            'reviews': job.reviews,
+            'report': job.report,
+            'error': job.error,
+            'spans': list(job.spans) if status in FINISHED else [],
+        }
+
+    def wait(self, job_id, timeout=None):
+        """작업이 끝날 때까지 기다린 뒤 poll() 결과를 반환합니다."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._jobs[job_id].status not in FINISHED:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+        return self.poll(job_id)
+
+    def queue_depth(self):
+        return sum(len(q) for q in self._queues.values())
+
+    def stats(self):
+        with self._cond:
+            return {'queued': self.queue_depth(), 'running': self._running, 'max_jobs': self.max_jobs,
+                    'jobs': len(self._jobs)}
+
+    # --- 내부 ---
+    def _position(self, job):
+        """job보다 먼저 꺼내질 대기 작업 수. 지금 큐 그대로 _next_job의 순서를 흉내 내어 셉니다."""
+        with self._cond:
+            queues = {user: list(q) for user, q in self._queues.items()}
+            served = dict(self._last_served)
+        turn = itertools.count(max(served.values(), default=0) + 1)
+        ahead = 0
+        while any(queues.values()):
+            user = min((q[0].priority, served[u], q[0].submitted_at, u) for u, q in queues.items() if q)[3]
+            if queues[user].pop(0) is job:
+                return ahead
+            served[user] = next(turn)
+            ahead += 1
+        return None
+
+    def _next_job(self):
+        """우선순위 → 가장 오래 차례를 받지 못한 사용자 → 제출 순으로 다음 작업을 꺼냅니다 (락 안에서 호출)."""
+        candidates = [(q[0].priority, self._last_served[user], q[0].submitted_at, user)
+                      for user, q in self._queues.items() if q]
+        if not candidates:
+            return None
+        user = min(candidates)[3]
+        job = self._queues[user].popleft()
+        if not self._queues[user]:
+            del self._queues[user]
+        self._last_served[user] = next(self._turn)
+        return job
+
+    def _ensure_workers(self):
+        while len(self._workers) < self.max_jobs:
+            worker = threading.Thread(target=self._work, name=f"crawl-job-{len(self._workers)}", daemon=True)
+            self._workers.append(worker)
+            worker.start()
+
+    def _work(self):
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while job is None:
+                    self._cond.wait()
+                    job = self._next_job()
+                self._running += 1
+                job.status = 'running'
+                job.started_at = time.time()
+                self._update_gauges()
+            self._run(job)
+            with self._cond:
+                self._running -= 1
+                self._active.pop(job.key, None)
+                self._update_gauges()
+                self._cond.notify_all()
+
+    def _run(self, job):
+        # 작업마다 새 컨텍스트와 trace에서 실행합니다 (다른 세션의 trace에 섞이지 않고, 끝나면 poll()로 돌려줌).
+        ctx = contextvars.Context()
+        job.spans = ctx.run(start_trace)
+        ctx.run(observe, 'crawl_queue_wait', job.started_at - job.submitted_at)
+        try:
+            merged, report = ctx.run(
+                self.crawl_fn, job.name, on_reviews=job._on_reviews, **job.kwargs
+            )
+            job.reviews, job.report, job.status = merged, report, 'done'
+            incr('crawl_jobs_total', result='done')
+        except Exception as e:
+            job.error, job.status = f"{type(e).__name__}: {e}", 'error'
+            incr('crawl_jobs_total', result='error')
+            log.warning(f"[Scheduler] 작업 {job.id} 실패: {job.error}")
+        job.finished_at = time.time()
+        log.info(f"[Scheduler] 작업 {job.id} '{job.name}' {job.status} "
+                 f"(대기 {job.started_at - job.submitted_at:.1f}s, 실행 {job.finished_at - job.started_at:.1f}s)")
+
+    def _purge(self):
+        """보관 시간이 지난 완료 작업을 지웁니다 (락 안에서 호출)."""
+        cutoff = time.time() - self.retention
+        for job_id in [j.id for j in self._jobs.values() if j.finished_at and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def _update_gauges(self):
+        set_gauge('crawl_queue_depth', self.queue_depth())
+        set_gauge('crawl_jobs_running', self._running)
+
+
+# 프로세스 전체에서 하나만 사용합니다 (모든 Streamlit 세션이 공유).
+SCHEDULER = CrawlScheduler()
@@ -1,5 +1,6 @@
 import time
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
@@ -10,16 +11,39 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import NoSuchElementException, TimeoutException
 
-import shutil, os
+import shutil, os, atexit
+import contextvars
+import sqlite3
 from pathlib import Path
 
+from driver_pool import DriverPool
+from waits import Waiter
+from review_store import review_key
+from crawl_cache import CrawlCache, CRAWL_CACHE_TTL
+from metrics import get_logger, span, incr, set_gauge
+import resource_blocking
+import xhr_capture
+
 import logging
 logging.getLogger("streamlit.watcher.local_sources_watcher").setLevel(logging.WARNING)
+log = get_logger("crawler")
 
 
 # --- 크롤링 함수들 정의 시작 ---
 MAX_REVIEWS = 100
 CLICK_BATCH = 10
+# 동시에 실행할 플랫폼 크롤러(=헤드리스 브라우저) 수
+CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", "3"))
+# WebDriver 풀: 프로세스 전체에서 동시에 띄울 수 있는 최대 브라우저 수 / 세션 재활용 기준
+DRIVER_POOL_SIZE = int(os.getenv("DRIVER_POOL_SIZE", "3"))
+DRIVER_MAX_USES = int(os.getenv("DRIVER_MAX_USES", "20"))
+DRIVER_MAX_RSS_MB = int(os.getenv("DRIVER_MAX_RSS_MB", "1024"))
+# 플랫폼 시작 URL (벤치마크에서는 로컬 픽스처 서버 주소로 바꿔 끼웁니다)
+PLATFORM_URLS = {
+    'Kakao': os.getenv("KAKAO_MAP_URL", "https://map.kakao.com/"),
+    'Google': os.getenv("GOOGLE_MAPS_URL", "https://www.google.com/maps"),
+    'Naver': os.getenv("NAVER_MAP_URL", "https://map.naver.com/v5"),
+}
 
 def init_driver():
     # ① 최소 옵션(Headless, No-Sandbox, Dev-Shm-Usage)
@@ -28,6 +52,13 @@ def init_driver():
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-dev-shm-usage")
     options.add_argument("--disable-gpu")
+    # 리뷰 텍스트에 필요 없는 이미지 로딩 차단 (플랫폼별 URL 차단은 세션을 빌릴 때 적용)
+    prefs = resource_blocking.chrome_prefs()
+    if prefs:
+        options.add_experimental_option("prefs", prefs)
+    # 캡처 모드(CRAWL_CAPTURE=1): 리뷰 API 응답을 읽기 위한 성능 로그(네트워크 이벤트) 활성화
+    for name, value in xhr_capture.capabilities().items():
+        options.set_capability(name, value)
 
     # ② chromedriver 경로 결정: ENV → which() → (없으면 에러)
     env_drv = os.getenv("CHROMEDRIVER_BIN")
@@ -61,371 +92,698 @@ def init_driver():
     return webdriver.Chrome(service=service, options=options)
 
 
-# --- Kakao Map Functions ---
-def crawl_kakao_reviews(restaurant_name):
-    import re
-    driver = init_driver()
-    print(f"[Kakao] '{restaurant_name}' 검색 시작")
-    try:
-        driver.get("https://map.kakao.com/")
-        wait = WebDriverWait(driver, 10)
+# 플랫폼별 크롤링 결과 캐시 (세션·워커 프로세스 사이에서 같은 식당의 중복 크롤링 방지)
+try:
+    CRAWL_CACHE = CrawlCache() if CRAWL_CACHE_TTL > 0 else None
+except Exception as e:
+    log.warning(f"크롤링 캐시 초기화 실패: {e} → 캐시 없이 실행됩니다.")
+    CRAWL_CACHE = None
+
+# 크롤러들은 init_driver()를 직접 호출하지 않고 이 풀에서 세션을 빌려 쓰고 반납합니다.
+DRIVER_POOL = DriverPool(
+    init_driver,
+    max_size=DRIVER_POOL_SIZE,
+    max_uses=DRIVER_MAX_USES,
+    max_rss_mb=DRIVER_MAX_RSS_MB,
+)
+atexit.register(DRIVER_POOL.close_all)
+
+
+# --- 플랫폼별 리뷰 셀렉터 설정 ---
+# fields: {필드: {'sel': 항목 기준 CSS (없으면 항목 자체), 'attr': 읽을 속성 (없으면 innerText),
+#                'text_fallback': 속성이 비어 있으면 innerText 사용}}
+# required: 하나라도 비어 있으면 해당 항목은 건너뜁니다 (기존 find_element 실패 처리와 동일).
+SELECTORS = {
+    'Kakao': {
+        'list': "ul.list_review",
+        'item': "ul.list_review > li",
+        'expand': "span.btn_more",   # 항목 기준 본문 더보기 버튼
+        'fields': {
+            'reviewer': {'sel': "span.name_user"},
+            'rating': {'sel': "span.starred_grade > span.screen_out:nth-of-type(2)"},
+            'text': {'sel': ".area_review .desc_review"},
+            'date': {'sel': ".area_review .txt_date"},
+            'id': {'attr': "data-id"},
+        },
+        'required': ['reviewer', 'rating', 'text', 'date'],
+    },
+    'Google': {
+        'panel': "div.m6QErb.DxyBCb.kA9KIf.dS8AEf",
+        'item': "div.jftiEf",
+        'fields': {
+            'reviewer': {'sel': "div.d4r55"},
+            'text': {'sel': "span.wiI7pd"},
+            'rating': {'sel': "span.kvMYJc", 'attr': "aria-label"},
+            'date': {'sel': "span.rsqaWe"},
+            'id': {'attr': "data-review-id"},
+        },
+        'required': ['id', 'text', 'reviewer', 'rating', 'date'],
+    },
+    'Naver': {
+        'section': "div.place_section.k1QQ5",
+        'item': "ul > li",
+        'more': ".//a[.//span[text()='더보기']]",
+        'fields': {
+            'reviewer': {'sel': "div.pui__JiVbY3 span span"},
+            'date': {'sel': "time", 'attr': "datetime", 'text_fallback': True},
+            'text': {'sel': "div.pui__vn15t2 > a"},
+            'id': {'attr': "data-review-id"},
+        },
+        'required': ['reviewer', 'date', 'text'],
+    },
+}
+
+# 로드된 모든 항목의 필드를 브라우저 안에서 한 번에 읽어 리스트로 돌려줍니다 (WebDriver 왕복 1회).
+_EXTRACT_JS = """
+const root = arguments[0] || document, itemSel = arguments[1], fields = arguments[2],
+      required = arguments[3], limit = arguments[4];
+let items = Array.from(root.querySelectorAll(itemSel));
+if (limit > 0) items = items.slice(0, limit);
+return items.map((el) => {
+    const row = {};
+    for (const [name, spec] of Object.entries(fields)) {
+        const node = spec.sel ? el.querySelector(spec.sel) : el;
+        let value = null;
+        if (node) {
+            value = spec.attr ? node.getAttribute(spec.attr) : node.innerText;
+            if (!value && spec.attr && spec.text_fallback) value = node.innerText;
+        }
+        row[name] = value == null ? null : String(value).trim();
+    }
+    return required.every((k) => row[k]) ? row : null;
+});
+"""
+
+
+def extract_reviews(driver, platform, root=None, limit=None):
+    """
+    SELECTORS[platform] 설정으로 현재 로드된 리뷰 항목 전체를 execute_script 한 번에 추출합니다.
+    반환: [{'reviewer', 'text', 'rating', 'date', 'id'}, ...] — 필수 필드가 없는 항목은 None
+    """
+    cfg = SELECTORS[platform]
+    with span('extract', platform=platform):
+        return driver.execute_script(
+            _EXTRACT_JS, root, cfg['item'], cfg['fields'], cfg['required'], limit or 0
+        ) or []
+
+
+def _to_review(platform, row):
+    """extract_reviews 결과 한 행을 기존 리뷰 dict 스키마로 변환합니다."""
+    reviewer, text, rating = row['reviewer'], row['text'], row.get('rating')
+    if platform == 'Kakao':
+        reviewer = reviewer.split(",")[-1].strip()  # e.g. "리뷰어 이름, Grai"
+    elif platform == 'Google':
+        text = text.replace("\n", " ").strip()
+    elif platform == 'Naver':
+        rating = None
+    return {'platform': platform, 'reviewer': reviewer, 'text': text,
+            'rating': rating, 'date': row['date'], 'id': row.get('id')}
+
+
+def _load_batch(driver, platform, start, end, root=None, waiter=None, capture=None):
+    """
+    스크롤·더보기 한 번으로 새로 로드된 [start, end) 구간 항목을 리뷰 dict 리스트로 읽습니다.
+    캡처 모드면 리뷰 API 응답에서 읽고, 아니면 (본문 더보기가 있는 플랫폼은 이 구간만 펼친 뒤) DOM에서 읽습니다.
+    """
+    if end <= start:
+        return []
+    cfg = SELECTORS[platform]
+    rows = _captured_rows(capture, end, limit=end)
+    if rows:
+        rows = rows[start:end]
+    else:
+        if cfg.get('expand') and waiter is not None:
+            # 이미 펼친 앞 구간의 버튼을 다시 누르면 접히므로 새로 로드된 항목의 버튼만 누릅니다.
+            with span('click_loop', platform=platform):
+                expanded = waiter.click_and_settle(
+                    f"{cfg['item']}:nth-child(n+{start + 1}) {cfg['expand']}", root=root, timeout=2
+                )
+            if expanded:
+                log.info(f"[{platform}] 본문 더보기 {expanded}건 일괄 펼침")
+        rows = extract_reviews(driver, platform, root=root, limit=end)[start:]
+    reviews = []
+    for idx, row in enumerate(rows, start=start + 1):
+        if row is None:
+            log.warning(f"[{platform}] 리뷰 {idx} 수집 실패: 요소 누락")
+            continue
+        reviews.append(_to_review(platform, row))
+        log.info(f"[{platform}] 리뷰 {idx} 수집 완료: 작성자={row['reviewer']}, 날짜={row['date']}")
+    return reviews
 
-        # 검색어 입력
-        box = wait.until(EC.presence_of_element_located((By.ID, "search.keyword.query")))
-        box.send_keys(restaurant_name, Keys.RETURN)
-        print("[Kakao] 검색어 전송 완료")
-        time.sleep(2)
 
-        # dimmedLayer 제거 후 '더보기' 클릭 시도
-        try:
-            dimmed = driver.find_element(By.ID, "dimmedLayer")
-            if dimmed.is_displayed():
-                driver.execute_script("arguments[0].style.display = 'none';", dimmed)
-                print("[Kakao] dimmedLayer 제거 완료")
-        except NoSuchElementException:
-            pass
-
-        # 첫 번째 장소 상세 페이지 이동
-        place = wait.until(EC.presence_of_element_located((By.XPATH, '//*[@id="info.search.place.list"]/li[1]')))
-        btn = place.find_element(By.CLASS_NAME, "moreview")
-        driver.execute_script("arguments[0].click();", btn)
-        print("[Kakao] 상세 페이지로 이동")
-
-        # 새 창 전환
-        main = driver.window_handles[0]
-        WebDriverWait(driver, 10).until(lambda d: len(d.window_handles) == 2)
-        detail = [h for h in driver.window_handles if h != main][0]
-        driver.switch_to.window(detail)
-        print("[Kakao] 상세 창 포커스 전환")
-
-        # 리뷰 탭 클릭 시도
-        try:
-            review_tab = wait.until(EC.element_to_be_clickable(
-                (By.XPATH, "//a[@class='link_tab' and contains(text(), '후기')]")
-            ))
-            driver.execute_script("arguments[0].click();", review_tab)
-            print("[Kakao] 리뷰 탭 클릭 완료")
-            time.sleep(1)
-        except TimeoutException:
-            print("[Kakao] 리뷰 탭('후기')이 존재하지 않음 → 리뷰 없음으로 처리")
-            return []
+def _reached_known(reviews, known):
+    """증분 모드: 이번에 새로 로드된 리뷰가 모두 저장소에 있으면 더 넘길 필요가 없습니다."""
+    return bool(known) and bool(reviews) and all(review_key(r) in known for r in reviews)
+
+
+def _captured_rows(capture, dom_count, limit=None):
+    """
+    캡처 모드에서 가로챈 리뷰 API 응답의 행을 반환합니다. 화면에 로드된 항목(dom_count)보다 적게
+    잡혔으면(첫 페이지가 HTML에 포함된 경우 등) None을 반환해 DOM 추출로 돌아가게 합니다.
+    """
+    if capture is None:
+        return None
+    rows = capture.rows(limit)
+    if rows and len(rows) >= min(dom_count, limit or dom_count):
+        incr('capture_hits_total', platform=capture.platform)
+        return rows
+    if capture.available:
+        incr('capture_fallbacks_total', platform=capture.platform)
+        log.info(f"[{capture.platform}] 응답 캡처 {len(rows)}건 < 화면 항목 {dom_count}건 → DOM 추출 사용")
+    return None
+
+
+def _emit(on_reviews, reviews):
+    """스트리밍 콜백이 있으면 방금 추출한 리뷰 묶음을 바로 넘깁니다."""
+    if on_reviews is not None and reviews:
+        on_reviews(list(reviews))
+
+
+def _confirm_empty(stats, platform, reason):
+    """
+    페이지 상태로 리뷰가 없음을 확인했을 때만 stats['empty']를 남깁니다.
+    오류 없이 0개를 돌려줬더라도 이 표시가 없으면 호출자는 "리뷰 없음"으로 확정하지 않습니다.
+    """
+    if stats is not None:
+        stats['empty'] = True
+    log.info(f"[{platform}] 리뷰 없음 확인: {reason}")
 
-        # 리뷰 리스트 로딩 확인
+
+def _record_wait(stats, waiter):
+    """크롤러가 조건 대기에 쓴 시간을 호출자가 넘긴 stats dict에 기록합니다."""
+    if stats is not None:
+        stats['waited'] = round(waiter.waited, 2)
+    log.info(f"[{waiter.platform}] 대기 시간 합계: {waiter.waited:.1f}s")
+
+
+# --- Kakao Map Functions ---
+def crawl_kakao_reviews(restaurant_name, stats=None, known=None, on_reviews=None):
+    import re
+    # 세션 준비(차단 규칙·캡처 설정)에서 예외가 나도 풀 자리를 돌려주도록 session()으로 빌립니다.
+    with DRIVER_POOL.session() as driver:
+        waiter = Waiter(driver, 'Kakao')
         try:
-            print("[Kakao] 리뷰 요소 탐색 시도 중...")
-            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "ul.list_review")))
-            print("[Kakao] 리뷰 리스트 로딩 성공")
-
-            # 스크롤로 추가 로딩
-            for _ in range(3):
-                driver.execute_script("window.scrollBy(0, document.body.scrollHeight);")
-                time.sleep(1)
-
-            items = driver.find_elements(By.CSS_SELECTOR, "ul.list_review > li")
-            print(f"[Kakao] 리뷰 항목 개수 탐색됨: {len(items)}")
-            items = items[:MAX_REVIEWS]
-
-            reviews = []
-            for idx, item in enumerate(items):
-                try:
-                    # 본문 더보기 클릭
-                    try:
-                        btn_more = item.find_element(By.CSS_SELECTOR, "span.btn_more")
-                        driver.execute_script("arguments[0].click();", btn_more)
-                        time.sleep(0.5)
-                    except NoSuchElementException:
-                        pass
-
-                    # reviewer 추출
-                    name_elem = item.find_element(By.CSS_SELECTOR, "span.name_user")
-                    raw_name = name_elem.text  # e.g. "리뷰어 이름, Grai"
-                    reviewer = raw_name.split(",")[-1].strip()
-
-                    # rating 추출 (span.starred_grade 내 두 번째 screen_out)
-                    rating_elem = item.find_element(
-                        By.CSS_SELECTOR,
-                        "span.starred_grade > span.screen_out:nth-of-type(2)"
-                    )
-                    rating = rating_elem.text.strip()
-
-                    area = item.find_element(By.CLASS_NAME, "area_review")
-                    text = area.find_element(By.CLASS_NAME, "desc_review").text.strip()
-                    date = area.find_element(By.CLASS_NAME, "txt_date").text.strip()
-
-                    reviews.append({
-                        'platform': 'Kakao',
-                        'reviewer': reviewer,
-                        'text': text,
-                        'rating': rating,
-                        'date': date
-                    })
-                    print(f"[Kakao] 리뷰 {idx + 1} 수집 완료")
-                except Exception as review_error:
-                    print(f"[Kakao] 리뷰 {idx + 1} 수집 실패: {review_error}")
-                    continue
-
-            print(f"[Kakao] 리뷰 수집 완료: {len(reviews)}개")
-            return reviews
+            resource_blocking.apply_blocking(driver, 'Kakao')
+            log.info(f"[Kakao] '{restaurant_name}' 검색 시작")
+            with span('page_load', platform='Kakao'):
+                driver.get(PLATFORM_URLS['Kakao'])
+            wait = waiter.webdriver_wait(10)
+
+            # 검색어 입력
+            box = wait.until(EC.presence_of_element_located((By.ID, "search.keyword.query")))
+            box.send_keys(restaurant_name, Keys.RETURN)
+            log.info("[Kakao] 검색어 전송 완료")
+
+            # 검색 결과 첫 항목이 뜰 때까지 대기
+            place = wait.until(EC.presence_of_element_located((By.XPATH, '//*[@id="info.search.place.list"]/li[1]')))
+
+            # dimmedLayer 제거 후 '더보기' 클릭 시도
+            if driver.execute_script(
+                "const d = document.getElementById('dimmedLayer');"
+                "if (d && d.offsetParent !== null) { d.style.display = 'none'; return true; }"
+                "return false;"
+            ):
+                log.info("[Kakao] dimmedLayer 제거 완료")
+
+            # 첫 번째 장소 상세 페이지 이동
+            btn = place.find_element(By.CLASS_NAME, "moreview")
+            driver.execute_script("arguments[0].click();", btn)
+            log.info("[Kakao] 상세 페이지로 이동")
+
+            # 새 창 전환
+            main = driver.window_handles[0]
+            waiter.webdriver_wait(10).until(lambda d: len(d.window_handles) == 2)
+            detail = [h for h in driver.window_handles if h != main][0]
+            driver.switch_to.window(detail)
+            # DevTools 차단·응답 캡처는 창(target)별이므로 새 창에서 다시 적용 (리뷰 API는 상세 창에서 호출됨)
+            resource_blocking.apply_blocking(driver, 'Kakao')
+            capture = xhr_capture.start_capture(driver, 'Kakao')
+            log.info("[Kakao] 상세 창 포커스 전환")
+
+            # 리뷰 탭 클릭 시도
+            try:
+                review_tab = wait.until(EC.element_to_be_clickable(
+                    (By.XPATH, "//a[@class='link_tab' and contains(text(), '후기')]")
+                ))
+                driver.execute_script("arguments[0].click();", review_tab)
+                log.info("[Kakao] 리뷰 탭 클릭 완료")
+            except TimeoutException:
+                _confirm_empty(stats, 'Kakao', "리뷰 탭('후기')이 존재하지 않음")
+                return []
+
+            # 리뷰 리스트 로딩 확인
+            try:
+                log.info("[Kakao] 리뷰 요소 탐색 시도 중...")
+                wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, SELECTORS['Kakao']['list'])))
+                log.info("[Kakao] 리뷰 리스트 로딩 성공")
+
+                # 스크롤로 추가 로딩: 항목 수가 늘어나지 않으면 즉시 중단.
+                # 스크롤마다 새로 로드된 구간만 펼치고 추출해 바로 넘깁니다 (스트리밍 표시).
+                item_sel = SELECTORS['Kakao']['item']
+                count = waiter.count(item_sel)
+                batch = _load_batch(driver, 'Kakao', 0, min(count, MAX_REVIEWS), waiter=waiter, capture=capture)
+                reviews = list(batch)
+                _emit(on_reviews, batch)
+                with span('scroll_loop', platform='Kakao'):
+                    for _ in range(3):
+                        if count >= MAX_REVIEWS or waiter.expired():
+                            break
+                        if known and _reached_known(batch, known):
+                            log.info("[Kakao] 이미 저장된 리뷰에 도달 → 추가 스크롤 중단")
+                            break
+                        driver.execute_script("window.scrollBy(0, document.body.scrollHeight);")
+                        incr('scroll_steps_total', platform='Kakao')
+                        new_count = waiter.count_growth(item_sel, count, timeout=3)
+                        if new_count <= count:
+                            break
+                        batch = _load_batch(driver, 'Kakao', count, min(new_count, MAX_REVIEWS),
+                                            waiter=waiter, capture=capture)
+                        reviews.extend(batch)
+                        _emit(on_reviews, batch)
+                        count = new_count
+                log.info(f"[Kakao] 리뷰 항목 개수 탐색됨: {count}")
+
+                log.info(f"[Kakao] 리뷰 수집 완료: {len(reviews)}개")
+                if not reviews and count == 0:
+                    _confirm_empty(stats, 'Kakao', "리뷰 목록에 항목이 없음")
+                return reviews
 
-        except Exception as e:
-            print(f"[Kakao] 리뷰 리스트 로딩 실패: {type(e).__name__} - {e}")
-            return []
+            except Exception as e:
+                log.warning(f"[Kakao] 리뷰 리스트 로딩 실패: {type(e).__name__} - {e}")
+                raise
 
-    except Exception as e:
-        print(f"[Kakao] 오류 발생: {e}")
-        return []
+        except Exception as e:
+            # 실패는 빈 결과와 구분되도록 _timed_crawl까지 올려 보내 report[platform]['error']에 남깁니다.
+            log.warning(f"[Kakao] 오류 발생: {e}")
+            raise
 
-    finally:
-        driver.quit()
+        finally:
+            _record_wait(stats, waiter)
 
 
 # --- Google Maps Helper Functions ---
-def click_review_tab(driver):
-    """리뷰 탭을 찾아 클릭합니다."""
-    try:
-        tabs = driver.find_elements(By.CSS_SELECTOR, 'button[role="tab"]')
-        for t in tabs:
-            if "리뷰" in t.text:
-                try:
-                    t.click()
-                except:
-                    driver.execute_script("arguments[0].click();", t)
-                WebDriverWait(driver, 5).until(
-                    lambda d: t.get_attribute("aria-selected") == "true"
-                )
-                print("[Google] 리뷰 탭 클릭 완료")
-                time.sleep(0.5)
-                return True
-        print("[Google] 리뷰 탭을 찾지 못함")
-        return False
-    except Exception as e:
-        print(f"[Google] 리뷰 탭 클릭 중 오류: {e}")
-        return False
+def click_review_tab(driver, waiter=None):
+    """리뷰 탭을 찾아 클릭합니다. 탭이 없으면 False, 클릭 중 오류(시간 초과 등)는 그대로 올려 보냅니다."""
+    tabs = driver.find_elements(By.CSS_SELECTOR, 'button[role="tab"]')
+    for t in tabs:
+        if "리뷰" in t.text:
+            try:
+                t.click()
+            except:
+                driver.execute_script("arguments[0].click();", t)
+            (waiter.webdriver_wait(5) if waiter else WebDriverWait(driver, 5)).until(
+                lambda d: t.get_attribute("aria-selected") == "true"
+            )
+            log.info("[Google] 리뷰 탭 클릭 완료")
+            return True
+    log.info("[Google] 리뷰 탭을 찾지 못함")
+    return False
 
-def get_top_reviews(driver, topn=MAX_REVIEWS, max_scrolls=12):
-    """리뷰 패널에서 최대 topn개의 리뷰를 수집합니다."""
+def get_top_reviews(driver, topn=MAX_REVIEWS, max_scrolls=12, waiter=None, known=None, on_reviews=None,
+                    capture=None):
+    """
+    리뷰 패널에서 최대 topn개의 리뷰를 수집합니다.
+    known(저장된 리뷰 키 집합)이 주어지면 한 번의 스크롤로 새로 뜬 리뷰가 모두 저장된 것일 때 멈춥니다.
+    on_reviews가 주어지면 스크롤마다 새로 추출한 리뷰 묶음을 바로 넘깁니다.
+    capture(xhr_capture.ResponseCapture)가 주어지면 리뷰 API 응답에서 읽고, 부족하면 DOM에서 추출합니다.
+    """
+    waiter = waiter or Waiter(driver, 'Google')
     try:
-        panel = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "div.m6QErb.DxyBCb.kA9KIf.dS8AEf"))
+        panel = waiter.webdriver_wait(10).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, SELECTORS['Google']['panel']))
         )
-        print("[Google] 리뷰 패널 로딩 완료")
+        log.info("[Google] 리뷰 패널 로딩 완료")
     except TimeoutException:
-        print("[Google] 리뷰 패널 로딩 실패: 패널을 찾을 수 없음")
-        return []
+        log.warning("[Google] 리뷰 패널 로딩 실패: 패널을 찾을 수 없음")
+        raise
 
     seen_ids = set()
     reviews = []
     prev_block_count = 0
 
+    item_sel = SELECTORS['Google']['item']
     for i in range(max_scrolls):
         driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight;", panel)
-        time.sleep(2.5)  # 충분한 대기 (JS 로딩 고려)
+        incr('scroll_steps_total', platform='Google')
+        # 블록 수가 늘어나는 즉시 진행 (늘지 않으면 최대 5초 후 종료 판정)
+        dom_count = waiter.count_growth(item_sel, prev_block_count, root=panel, timeout=5)
 
-        blocks = panel.find_elements(By.CSS_SELECTOR, 'div.jftiEf')
-        print(f"[Google] 스크롤 {i+1}: {len(blocks)}개의 리뷰 블록 발견")
+        # 로드된 블록 전체를 한 번에 추출 (블록 수와 무관하게 WebDriver 왕복 1회)
+        blocks = _captured_rows(capture, dom_count) or extract_reviews(driver, 'Google', root=panel)
+        log.info(f"[Google] 스크롤 {i+1}: {len(blocks)}개의 리뷰 블록 발견")
 
         # 리뷰 수집
+        batch = []
         for blk in blocks:
-            rid = blk.get_attribute("data-review-id")
-            if not rid or rid in seen_ids:
-                continue
-            text_elements = blk.find_elements(By.CSS_SELECTOR, "span.wiI7pd")
-            if not text_elements:
-                continue
-
-            try:
-                seen_ids.add(rid)
-                writer = blk.find_element(By.CSS_SELECTOR, "div.d4r55").text.strip()
-                text = text_elements[0].text.replace("\n", " ").strip()
-                star = blk.find_element(By.CSS_SELECTOR, "span.kvMYJc").get_attribute("aria-label").strip()
-                date = blk.find_element(By.CSS_SELECTOR, "span.rsqaWe").text.strip()
-                reviews.append({
-                    'reviewer': writer,
-                    'text': text,
-                    'rating': star,
-                    'date': date
-                })
-                print(f"[Google] 리뷰 수집: 작성자={writer}, 평점={star}")
-            except Exception as e:
-                print(f"[Google] 리뷰 블록 처리 중 오류: {e}")
+            if blk is None or blk['id'] in seen_ids:
                 continue
+            seen_ids.add(blk['id'])
+            review = _to_review('Google', blk)
+            reviews.append(review)
+            batch.append(review)
+            log.info(f"[Google] 리뷰 수집: 작성자={blk['reviewer']}, 평점={blk['rating']}")
 
             if len(reviews) >= topn:
-                print(f"[Google] 목표 리뷰 수({topn}) 도달")
+                log.info(f"[Google] 목표 리뷰 수({topn}) 도달")
+                _emit(on_reviews, batch)
                 return reviews
+        _emit(on_reviews, batch)
+
+        if known and _reached_known(batch, known):
+            log.info("[Google] 이미 저장된 리뷰에 도달 → 스크롤 중단")
+            break
 
         # 종료 조건 변경: 새로 로딩된 리뷰 블록이 없을 경우
         if len(blocks) == prev_block_count:
-            print("[Google] 더 이상 새로운 리뷰 블록 없음 (종료)")
+            log.info("[Google] 더 이상 새로운 리뷰 블록 없음 (종료)")
+            break
+        if waiter.expired():
+            log.info("[Google] 크롤링 시간 한도 도달 (종료)")
             break
         prev_block_count = len(blocks)
 
-    print(f"[Google] 총 {len(reviews)}개 리뷰 수집 완료")
+    log.info(f"[Google] 총 {len(reviews)}개 리뷰 수집 완료")
     return reviews
 
 # --- Google Maps Crawling Function ---
-def crawl_google_reviews(restaurant_name):
-    driver = init_driver()
-    print(f"[Google] '{restaurant_name}' 검색 시작")
-    try:
-        driver.get("https://www.google.com/maps")
-        wait = WebDriverWait(driver, 10)
-        inp = wait.until(EC.presence_of_element_located((By.ID, "searchboxinput")))
-        inp.clear()
-        inp.send_keys(restaurant_name)
-        inp.send_keys(Keys.ENTER)
-
-        # 검색 결과 로딩 대기
-        try:
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "div.Nv2PK.THOPZb.CpccDe"))
-            )
-            print("[Google] 검색 결과 로딩 완료")
-        except TimeoutException:
-            print("[Google] 검색 결과 로딩 실패: 결과 카드 없음")
-
-        # 첫 번째 검색 결과 카드 찾기
-        href = None
+def crawl_google_reviews(restaurant_name, stats=None, known=None, on_reviews=None):
+    with DRIVER_POOL.session() as driver:
+        waiter = Waiter(driver, 'Google')
         try:
-            card = driver.find_element(By.CSS_SELECTOR, "div.Nv2PK.THOPZb.CpccDe")
-            a = card.find_element(By.CSS_SELECTOR, "a.hfpxzc")
-            href = a.get_attribute("href")
-            print("[Google] 첫 번째 결과 카드 찾음 → 상세 페이지 이동")
-        except NoSuchElementException:
-            print("[Google] 첫 번째 결과 카드 찾기 실패 → 현재 URL로 상세 페이지 이동 시도")
-            href = driver.current_url
-
-        # 상세 페이지로 이동
-        driver.get(href)
-        try:
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.TAG_NAME, "h1"))
-            )
-            print("[Google] 상세 페이지 로딩 완료")
-        except TimeoutException:
-            print("[Google] 상세 페이지 로딩 실패")
-            return []
-
-        # 리뷰 탭 클릭
-        if not click_review_tab(driver):
-            print("[Google] 리뷰 탭을 찾지 못함")
-            return []
+            resource_blocking.apply_blocking(driver, 'Google')
+            capture = xhr_capture.start_capture(driver, 'Google')
+            log.info(f"[Google] '{restaurant_name}' 검색 시작")
+            with span('page_load', platform='Google'):
+                driver.get(PLATFORM_URLS['Google'])
+            wait = waiter.webdriver_wait(10)
+            inp = wait.until(EC.presence_of_element_located((By.ID, "searchboxinput")))
+            inp.clear()
+            inp.send_keys(restaurant_name)
+            inp.send_keys(Keys.ENTER)
+
+            # 검색 결과 로딩 대기
+            try:
+                waiter.webdriver_wait(10).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, "div.Nv2PK.THOPZb.CpccDe"))
+                )
+                log.info("[Google] 검색 결과 로딩 완료")
+            except TimeoutException:
+                log.warning("[Google] 검색 결과 로딩 실패: 결과 카드 없음")
 
-        # 리뷰 수집
-        reviews = get_top_reviews(driver, topn=MAX_REVIEWS)
-        for review in reviews:
-            review['platform'] = 'Google'
-        print(f"[Google] 리뷰 수집 완료: {len(reviews)}개")
-        return reviews
+            # 첫 번째 검색 결과 카드 찾기
+            href = None
+            try:
+                card = driver.find_element(By.CSS_SELECTOR, "div.Nv2PK.THOPZb.CpccDe")
+                a = card.find_element(By.CSS_SELECTOR, "a.hfpxzc")
+                href = a.get_attribute("href")
+                log.info("[Google] 첫 번째 결과 카드 찾음 → 상세 페이지 이동")
+            except NoSuchElementException:
+                log.warning("[Google] 첫 번째 결과 카드 찾기 실패 → 현재 URL로 상세 페이지 이동 시도")
+                href = driver.current_url
+
+            # 상세 페이지로 이동
+            with span('page_load', platform='Google'):
+                driver.get(href)
+            try:
+                waiter.webdriver_wait(10).until(
+                    EC.presence_of_element_located((By.TAG_NAME, "h1"))
+                )
+                log.info("[Google] 상세 페이지 로딩 완료")
+            except TimeoutException:
+                log.warning("[Google] 상세 페이지 로딩 실패")
+                raise
+
+            # 리뷰 탭 클릭
+            if not click_review_tab(driver, waiter):
+                _confirm_empty(stats, 'Google', "리뷰 탭이 존재하지 않음")
+                return []
+
+            # 리뷰 수집
+            with span('scroll_loop', platform='Google'):
+                reviews = get_top_reviews(driver, topn=MAX_REVIEWS, waiter=waiter, known=known,
+                                          on_reviews=on_reviews, capture=capture)
+            for review in reviews:
+                review['platform'] = 'Google'
+            log.info(f"[Google] 리뷰 수집 완료: {len(reviews)}개")
+            if not reviews and not waiter.count(SELECTORS['Google']['item']):
+                _confirm_empty(stats, 'Google', "리뷰 패널에 항목이 없음")
+            return reviews
 
-    except Exception as e:
-        print(f"[Google] 오류 발생: {e}")
-        return []
+        except Exception as e:
+            log.warning(f"[Google] 오류 발생: {e}")
+            raise
 
-    finally:
-        driver.quit()
+        finally:
+            _record_wait(stats, waiter)
 
 
 # --- Naver Map Functions ---
-def crawl_reviews(driver, section, max_reviews=MAX_REVIEWS):
+def crawl_reviews(driver, section, max_reviews=MAX_REVIEWS, waiter=None, known=None, on_reviews=None,
+                  capture=None):
     """
     "더보기" 버튼을 반복 클릭해 지정된 개수만큼 리뷰를 로드하고, 리뷰 텍스트와 날짜를 반환합니다.
+    known(저장된 리뷰 키 집합)이 주어지면 새로 로드된 리뷰가 모두 저장된 것일 때 클릭을 멈춥니다.
+    on_reviews가 주어지면 더보기 클릭마다 새로 추출한 리뷰 묶음을 바로 넘깁니다.
     """
+    waiter = waiter or Waiter(driver, 'Naver')
+    cfg = SELECTORS['Naver']
     clicks = 0
-    # 반복 클릭하여 더 많은 리뷰 로드
-    while True:
-        items = section.find_elements(By.CSS_SELECTOR, "ul > li")
-        if len(items) >= max_reviews:
-            break
-        try:
-            more_btn = section.find_element(By.XPATH, ".//a[.//span[text()='더보기']]")
-            driver.execute_script("arguments[0].scrollIntoView({block:'center'});", more_btn)
-            # JS 클릭으로 오버레이 문제 방지
-            driver.execute_script("arguments[0].click();", more_btn)
-            clicks += 1
-            time.sleep(1)
-        except (NoSuchElementException, TimeoutException):
-            break
-
-    # 로드된 리뷰 요소 재획득
-    items = section.find_elements(By.CSS_SELECTOR, "ul > li")
-    reviews = []
-    for idx, item in enumerate(items[:max_reviews], start=1):
-        try:
-            author = item.find_element(By.CSS_SELECTOR, "div.pui__JiVbY3 span span").text
-            date_elem = item.find_element(By.TAG_NAME, "time")
-            # datetime 속성 우선, 없으면 text
-            date = date_elem.get_attribute("datetime") or date_elem.text.strip()
-            text = item.find_element(By.CSS_SELECTOR, "div.pui__vn15t2 > a").text
-            reviews.append({'platform':'Naver','reviewer':author,'text':text,'rating':None,'date':date})
-            print(f"[Naver] 리뷰 {idx} 수집 완료: 작성자={author}, 날짜={date}")
-        except NoSuchElementException:
-            print(f"[Naver] 리뷰 {idx} 수집 실패: 요소 누락")
-            continue
-    print(f"[Naver] 리뷰 수집 완료: {len(reviews)}개")
+    count = waiter.count(cfg['item'], root=section)
+    # 더보기 클릭마다 새로 로드된 구간만 추출해 바로 넘깁니다 (캡처 모드면 리뷰 API 응답에서).
+    batch = _load_batch(driver, 'Naver', 0, min(count, max_reviews), root=section, capture=capture)
+    reviews = list(batch)
+    _emit(on_reviews, batch)
+    # 반복 클릭하여 더 많은 리뷰 로드: 클릭 후 항목 수가 늘어나는 즉시 다음 클릭
+    with span('click_loop', platform='Naver'):
+        while count < max_reviews and not waiter.expired():
+            if known and _reached_known(batch, known):
+                log.info("[Naver] 이미 저장된 리뷰에 도달 → 더보기 중단")
+                break
+            try:
+                more_btn = section.find_element(By.XPATH, cfg['more'])
+                driver.execute_script("arguments[0].scrollIntoView({block:'center'});", more_btn)
+                # JS 클릭으로 오버레이 문제 방지
+                driver.execute_script("arguments[0].click();", more_btn)
+                clicks += 1
+                incr('more_clicks_total', platform='Naver')
+            except (NoSuchElementException, TimeoutException):
+                break
+            new_count = waiter.count_growth(cfg['item'], count, root=section, timeout=5)
+            if new_count <= count:
+                break
+            batch = _load_batch(driver, 'Naver', count, min(new_count, max_reviews), root=section,
+                                capture=capture)
+            reviews.extend(batch)
+            _emit(on_reviews, batch)
+            count = new_count
+
+    log.info(f"[Naver] 리뷰 수집 완료: {len(reviews)}개 (더보기 {clicks}회)")
     return reviews
 
 
-def crawl_naver_reviews(restaurant_name):
+def crawl_naver_reviews(restaurant_name, stats=None, known=None, on_reviews=None):
     """
     주어진 식당 이름으로 Naver Map v5에서 리뷰를 최대 MAX_REVIEWS개까지 수집합니다.
     """
-    driver = init_driver()
-    wait = WebDriverWait(driver, 15)
-    print(f"[Naver] '{restaurant_name}' 검색 시작")
-    try:
-        driver.get("https://map.naver.com/v5")
-        time.sleep(2)
-        # 가끔 떠 있는 모달/오버레이 제거
-        driver.execute_script(
-            "document.querySelectorAll('div.modal_layer, div.dimmedLayer').forEach(el => el.style.display='none');"
-        )
-        # 검색 입력
+    with DRIVER_POOL.session() as driver:
+        waiter = Waiter(driver, 'Naver')
         try:
-            sb = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "input.input_search")))
-        except TimeoutException:
-            sb = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "input[placeholder*='장소']")))
-        sb.clear()
-        sb.send_keys(restaurant_name, Keys.ENTER)
-        print("[Naver] 검색어 전송 완료")
-        time.sleep(2)
-
-        # 검색 결과 iframe 전환
-        wait.until(EC.frame_to_be_available_and_switch_to_it((By.CSS_SELECTOR, "iframe#searchIframe")))
-        time.sleep(1)
-        # 첫 번째 결과 클릭
-        first_li = wait.until(
-            EC.presence_of_element_located((
-                By.CSS_SELECTOR,
-                "#_pcmap_list_scroll_container > ul > li:nth-child(1)"
-            ))
-        )
-        driver.execute_script("arguments[0].scrollIntoView({block:'center'});", first_li)
-        time.sleep(0.5)
-        # JS 클릭으로 가려짐 이슈 해결
-        driver.execute_script("arguments[0].click();", first_li.find_element(By.TAG_NAME, "a"))
-        print("[Naver] 첫 번째 결과 클릭 완료")
-        time.sleep(2)
-
-        # 상세 페이지 iframe 진입
-        driver.switch_to.default_content()
-        wait.until(EC.frame_to_be_available_and_switch_to_it((By.CSS_SELECTOR, "iframe#entryIframe")))
-        time.sleep(1)
-        # 리뷰 탭 클릭 (JS 클릭)
-        review_tab = wait.until(
-            EC.element_to_be_clickable((By.XPATH, "//a[.//span[text()='리뷰']]") )
-        )
-        driver.execute_script("arguments[0].click();", review_tab)
-        print("[Naver] 리뷰 탭 클릭 완료")
-        time.sleep(1)
+            wait = waiter.webdriver_wait(15)
+            resource_blocking.apply_blocking(driver, 'Naver')
+            capture = xhr_capture.start_capture(driver, 'Naver')
+            log.info(f"[Naver] '{restaurant_name}' 검색 시작")
+            with span('page_load', platform='Naver'):
+                driver.get(PLATFORM_URLS['Naver'])
+            # 검색 입력 (입력창이 준비되는 즉시 진행)
+            try:
+                sb = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "input.input_search")))
+            except TimeoutException:
+                sb = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "input[placeholder*='장소']")))
+            # 가끔 떠 있는 모달/오버레이 제거
+            driver.execute_script(
+                "document.querySelectorAll('div.modal_layer, div.dimmedLayer').forEach(el => el.style.display='none');"
+            )
+            sb.clear()
+            sb.send_keys(restaurant_name, Keys.ENTER)
+            log.info("[Naver] 검색어 전송 완료")
+
+            # 검색 결과 iframe 전환
+            wait.until(EC.frame_to_be_available_and_switch_to_it((By.CSS_SELECTOR, "iframe#searchIframe")))
+            # 첫 번째 결과 클릭
+            first_li = wait.until(
+                EC.presence_of_element_located((
+                    By.CSS_SELECTOR,
+                    "#_pcmap_list_scroll_container > ul > li:nth-child(1)"
+                ))
+            )
+            driver.execute_script("arguments[0].scrollIntoView({block:'center'});", first_li)
+            # JS 클릭으로 가려짐 이슈 해결
+            driver.execute_script("arguments[0].click();", first_li.find_element(By.TAG_NAME, "a"))
+            log.info("[Naver] 첫 번째 결과 클릭 완료")
+
+            # 상세 페이지 iframe 진입
+            driver.switch_to.default_content()
+            wait.until(EC.frame_to_be_available_and_switch_to_it((By.CSS_SELECTOR, "iframe#entryIframe")))
+            # 리뷰 탭 클릭 (JS 클릭)
+            review_tab = wait.until(
+                EC.element_to_be_clickable((By.XPATH, "//a[.//span[text()='리뷰']]") )
+            )
+            driver.execute_script("arguments[0].click();", review_tab)
+            log.info("[Naver] 리뷰 탭 클릭 완료")
+            # 리뷰 목록 XHR이 끝날 때까지 (최대 3초) 대기
+            waiter.network_idle(idle_ms=300, timeout=3)
+
+            # 리뷰 섹션 로딩 및 수집
+            section = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, SELECTORS['Naver']['section'])))
+            reviews = crawl_reviews(driver, section, waiter=waiter, known=known, on_reviews=on_reviews,
+                                    capture=capture)
+            if not reviews and not waiter.count(SELECTORS['Naver']['item'], root=section):
+                _confirm_empty(stats, 'Naver', "리뷰 섹션에 항목이 없음")
+            return reviews
+
+        except Exception as e:
+            log.warning(f"[Naver] 오류 발생: {e}")
+            raise
+        finally:
+            _record_wait(stats, waiter)
 
-        # 리뷰 섹션 로딩 및 수집
-        section = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.place_section.k1QQ5")))
-        return crawl_reviews(driver, section)
 
+# --- 병렬 크롤링 오케스트레이터 ---
+PLATFORM_CRAWLERS = {
+    'Kakao': crawl_kakao_reviews,
+    'Google': crawl_google_reviews,
+    'Naver': crawl_naver_reviews,
+}
+
+
+def _timed_crawl(platform, crawl_fn, restaurant_name, store=None, incremental=True, on_reviews=None,
+                 cache=None):
+    """
+    크롤러 하나를 실행하고 (리뷰, 소요 시간, 오류, 크롤러 통계)를 반환합니다.
+    platform은 캐시·저장소 조회 키이자 on_reviews 인자, 지표·span 레이블로 쓰입니다.
+    store가 주어지면 수집한 리뷰를 저장하고, 저장소의 (기존 + 신규) 리뷰 전체를 반환합니다.
+    on_reviews(platform, reviews)가 주어지면 저장소에 이미 있던 리뷰를 먼저 넘기고,
+    이후 크롤러가 추출하는 대로 (저장소에 없던) 리뷰 묶음을 넘깁니다.
+    cache(CrawlCache)에 유효한 결과가 있으면 브라우저를 띄우지 않고 그 결과(또는 최근 실패)를 돌려줍니다.
+    """
+    start = time.perf_counter()
+    stats = {}
+    if cache is not None:
+        tier, cached = cache.get(platform, restaurant_name)
+        if tier == 'negative':
+            stats['cached'] = tier
+            # 실패 캐시의 빈 오류 문자열은 "리뷰 없음"을 확인하고 기록한 결과입니다.
+            stats['empty'] = not cached
+            try:
+                reviews = store.get_reviews(platform, restaurant_name, limit=MAX_REVIEWS) if store is not None else []
+            except sqlite3.Error as e:
+                log.warning(f"[{platform}] 리뷰 저장소 조회 실패: {type(e).__name__} {e}")
+                reviews = []
+            if on_reviews is not None and reviews:
+                on_reviews(platform, reviews)
+            error = f"최근 실패 (재시도 대기 중): {cached}" if cached else None
+            return reviews, time.perf_counter() - start, error, stats
+        if tier is not None:
+            stats['cached'] = tier
+            if on_reviews is not None:
+                on_reviews(platform, cached)
+            return cached, time.perf_counter() - start, None, stats
+    known = None
+    emit = None
+    try:
+        # 저장소 조회 오류(SQLite)도 크롤링 오류와 같이 이 플랫폼의 error로 보고합니다.
+        known = store.known_keys(platform, restaurant_name) if (store and incremental) else None
+        if on_reviews is not None:
+            if known:
+                on_reviews(platform, store.get_reviews(platform, restaurant_name, limit=MAX_REVIEWS))
+            emit = lambda batch: on_reviews(
+                platform, [r for r in batch if not known or review_key(r) not in known]
+            )
+        with span('crawl', platform=platform):
+            reviews = crawl_fn(restaurant_name, stats=stats, known=known, on_reviews=emit) or []
+        error = None
     except Exception as e:
-        print(f"[Naver] 오류 발생: {e}")
-        return []
-    finally:
-        driver.quit()
+        reviews = []
+        error = f"{type(e).__name__}: {e}"
+        incr('crawl_errors_total', platform=platform)
+    crawl_elapsed = time.perf_counter() - start
+    _record_throughput(platform, len(reviews), crawl_elapsed)
+    if store is not None:
+        stats['crawled'] = len(reviews)
+        try:
+            stats['new'] = store.add_reviews(platform, restaurant_name, reviews)
+            reviews = store.get_reviews(platform, restaurant_name, limit=MAX_REVIEWS)
+        except sqlite3.Error as e:
+            log.warning(f"[{platform}] 리뷰 저장 실패: {type(e).__name__} {e}")
+            error = error or f"{type(e).__name__}: {e}"
+    if cache is not None:
+        cache.put(platform, restaurant_name, reviews, error, empty=bool(stats.get('empty')))
+    return reviews, time.perf_counter() - start, error, stats
+
+
+def _record_throughput(platform, n_reviews, elapsed):
+    """플랫폼별 수집 리뷰 수 / 소요 시간 / 처리량(reviews/sec) 지표를 갱신합니다."""
+    incr('crawl_reviews_total', n_reviews, platform=platform)
+    incr('crawl_seconds_total', elapsed, platform=platform)
+    if elapsed > 0:
+        set_gauge('crawl_reviews_per_second', round(n_reviews / elapsed, 3), platform=platform)
+
+
+def crawl_all_reviews(restaurant_name, platforms=None, max_workers=None, store=None, incremental=True,
+                      on_reviews=None, use_cache=True):
+    """
+    여러 플랫폼 크롤러를 병렬로 실행하고 결과를 하나의 리스트로 합칩니다.
+    전체 대기 시간은 세 플랫폼의 합이 아니라 가장 느린 플랫폼 수준이 됩니다.
+    store(ReviewStore)를 넘기면 결과를 저장하고, incremental=True이면 이미 저장된
+    리뷰에 도달하는 즉시 페이지 넘기기를 멈춰 신규분만 수집합니다.
+    on_reviews(platform, reviews)를 넘기면 리뷰가 추출되는 즉시 (크롤링 스레드에서) 호출됩니다.
+    use_cache=True이면 플랫폼별 크롤링 캐시(CRAWL_CACHE)를 먼저 조회하고 성공 결과를 기록합니다.
+
+    반환값: (reviews, report)
+      - reviews: 기존과 동일한 리뷰 dict 리스트 (플랫폼 순서: Kakao → Google → Naver)
+      - report: {platform: {'count': int, 'elapsed': float, 'waited': float, 'error': str | None,
+                            'new': int (store 사용 시 신규 저장 개수),
+                            'cached': 'memory' | 'disk' | 'negative' | None (캐시에서 가져온 경우),
+                            'empty': bool (페이지 상태로 리뷰 없음을 확인한 경우 True)}}
+    """
+    platforms = list(platforms or PLATFORM_CRAWLERS)
+    cache = CRAWL_CACHE if use_cache else None
+    max_workers = max(1, min(max_workers or CRAWL_CONCURRENCY, len(platforms)))
+
+    results = {}
+    report = {}
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="crawl") as pool:
+        futures = {
+            # 호출한 쪽의 metrics.trace()가 작업 스레드의 span도 모을 수 있게 컨텍스트를 복사해 넘깁니다.
+            pool.submit(contextvars.copy_context().run,
+                        _timed_crawl, p, PLATFORM_CRAWLERS[p], restaurant_name, store, incremental,
+                        on_reviews, cache): p
+            for p in platforms
+        }
+        for fut in as_completed(futures):
+            p = futures[fut]
+            reviews, elapsed, error, stats = fut.result()
+            results[p] = reviews
+            report[p] = {
+                'count': len(reviews),
+                'elapsed': round(elapsed, 2),
+                'waited': stats.get('waited', 0.0),
+                'error': error,
+                'new': stats.get('new'),
+                'cached': stats.get('cached'),
+                'empty': bool(stats.get('empty')),
+            }
+            status = f"오류 - {error}" if error else f"{len(reviews)}개"
+            if stats.get('cached'):
+                status += f" (캐시: {stats['cached']})"
+            log.info(f"[Crawl] {p} 완료: {status} ({elapsed:.1f}s)")
+
+    log.info(f"[Crawl] 전체 소요 시간: {time.perf_counter() - start:.1f}s (동시 실행 {max_workers})")
+    if cache is not None:
+        log.info(f"[Crawl] 크롤링 캐시 적중률 {cache.hit_rate():.0%} {cache.stats}")
+    merged = [r for p in platforms for r in results.get(p, [])]
+    return merged, report
+
+
 # --- 크롤링 함수들 정의 끝 ---
@@ -0,0 +1,212 @@
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+from metrics import get_logger, observe
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    # psutil이 없으면 메모리 워터마크 기반 재활용만 비활성화됩니다.
+    psutil = None
+    PSUTIL_AVAILABLE = False
+
+log = get_logger("driver_pool")
+
+
+class DriverPool:
+    """
+    미리 띄워둔(warm) Chromium 세션을 빌려주고 돌려받는 WebDriver 풀입니다.
+
+    - 동시에 살아있는 브라우저 수는 max_size를 넘지 않습니다.
+    - 반납 시 상태를 초기화합니다 (추가 창 닫기, 모든 도메인의 쿠키 삭제, default_content 전환).
+    - max_uses 회 사용했거나 브라우저 RSS가 max_rss_mb를 넘으면 세션을 폐기하고 새로 띄웁니다.
+    """
+
+    def __init__(self, factory, max_size=3, max_uses=20, max_rss_mb=1024, acquire_timeout=120):
+        self.factory = factory
+        self.max_size = max(1, max_size)
+        self.max_uses = max_uses
+        self.max_rss_mb = max_rss_mb
+        self.acquire_timeout = acquire_timeout
+
+        self._cond = threading.Condition()
+        self._idle = deque()
+        self._live = 0       # idle + 사용 중 + 생성 중인 브라우저 수 (항상 max_size 이하)
+        self._uses = {}      # id(driver) -> 사용 횟수
+        self._closed = False
+        self.stats = {'created': 0, 'reused': 0, 'recycled': 0, 'unhealthy': 0}
+
+    # --- 체크아웃 / 반납 ---
+    def acquire(self, timeout=None):
+        """풀에서 드라이버를 하나 꺼냅니다. 여유가 없으면 timeout 초까지 대기합니다."""
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._cond:
+                while not self._idle and self._live >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(
+                            f"WebDriver 풀 대기 시간 초과 ({timeout}s, 최대 {self.max_size}개)"
+                        )
+                    self._cond.wait(remaining)
+                if self._idle:
+                    driver = self._idle.popleft()
+                else:
+                    self._live += 1
+                    driver = None
+            if driver is None:
+                return self._create()
+            healthy = self._is_healthy(driver)
+            with self._cond:
+                self.stats['reused' if healthy else 'unhealthy'] += 1
+            if healthy:
+                return driver
+            self._destroy(driver)
+
+    def release(self, driver, discard=False):
+        """드라이버를 풀에 반납합니다. 상태 초기화에 실패하거나 재활용 조건에 걸리면 폐기합니다."""
+        with self._cond:
+            self._uses[id(driver)] = self._uses.get(id(driver), 0) + 1
+        if discard or self._closed or self._should_recycle(driver) or not self._reset(driver):
+            with self._cond:
+                self.stats['recycled'] += 1
+            self._destroy(driver)
+            return
+        with self._cond:
+            self._idle.append(driver)
+            self._cond.notify()
+
+    @contextmanager
+    def session(self, timeout=None):
+        """with DRIVER_POOL.session() as driver: ... 형태로 사용합니다."""
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    # --- 예열 / 종료 ---
+    def warm_up(self, n=None):
+        """살아있는 세션이 n개(기본: max_size)가 될 때까지 미리 띄워 idle 상태로 둡니다."""
+        n = min(self.max_size, n or self.max_size)
+        created = 0
+        while True:
+            with self._cond:
+                if self._closed or self._live >= n:
+                    break
+                self._live += 1
+            try:
+                driver = self._create()
+            except Exception as e:
+                log.warning(f"[DriverPool] 예열 실패: {e}")
+                break
+            with self._cond:
+                self._idle.append(driver)
+                self._cond.notify()
+            created += 1
+        return created
+
+    def warm_up_async(self, n=None):
+        t = threading.Thread(target=self.warm_up, args=(n,), name="driver-pool-warmup", daemon=True)
+        t.start()
+        return t
+
+    def close_all(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+        for d in idle:
+            self._destroy(d)
+
+    def snapshot(self):
+        with self._cond:
+            return {'idle': len(self._idle), 'live': self._live, 'max_size': self.max_size, **self.stats}
+
+    # --- 내부 헬퍼 ---
+    def _create(self):
+        """호출 전에 _live 자리를 예약해 두어야 합니다. 실패하면 예약을 되돌립니다."""
+        start = time.perf_counter()
+        try:
+            driver = self.factory()
+        except Exception:
+            with self._cond:
+                self._live -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._uses[id(driver)] = 0
+            self.stats['created'] += 1
+        elapsed = time.perf_counter() - start
+        observe('driver_startup', elapsed)
+        log.info(f"[DriverPool] 새 브라우저 시작 ({elapsed:.1f}s)")
+        return driver
+
+    def _destroy(self, driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        with self._cond:
+            self._uses.pop(id(driver), None)
+            self._live -= 1
+            self._cond.notify()
+
+    def _is_healthy(self, driver):
+        try:
+            driver.execute_script("return 1;")
+            return bool(driver.window_handles)
+        except Exception:
+            return False
+
+    def _reset(self, driver):
+        try:
+            handles = driver.window_handles
+            for h in handles[1:]:
+                driver.switch_to.window(h)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            driver.switch_to.default_content()
+            # delete_all_cookies()는 현재 페이지 도메인의 쿠키만 지우므로 CDP로 브라우저 전체 쿠키를 지웁니다.
+            try:
+                driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            except AttributeError:
+                driver.delete_all_cookies()
+            driver.get("about:blank")
+            return True
+        except Exception as e:
+            log.warning(f"[DriverPool] 세션 초기화 실패 → 폐기: {e}")
+            return False
+
+    def _should_recycle(self, driver):
+        with self._cond:
+            uses = self._uses.get(id(driver), 0)
+        if self.max_uses and uses >= self.max_uses:
+            return True
+        if self.max_rss_mb and PSUTIL_AVAILABLE:
+            rss_mb = browser_rss_mb(driver)
+            if rss_mb is not None and rss_mb > self.max_rss_mb:
+                log.warning(f"[DriverPool] 메모리 워터마크 초과 ({rss_mb:.0f}MB) → 재시작")
+                return True
+        return False
+
+
+def browser_rss_mb(driver):
+    """chromedriver 프로세스와 그 하위(Chromium) 프로세스들의 RSS 합계(MB). 측정 불가 시 None."""
+    if not PSUTIL_AVAILABLE:
+        return None
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        procs = [root] + root.children(recursive=True)
+        total = 0
+        for p in procs:
+            try:
+                total += p.memory_info().rss
+            except psutil.Error:
+                continue
+        return total / (1024 * 1024)
+    except Exception:
+        return None
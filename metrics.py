@@ -0,0 +1,257 @@
+"""
+가벼운 계측 모듈: 단계별 span(소요 시간), 카운터/게이지, 구조화 로그, Prometheus 텍스트 출력.
+
+    from metrics import span, incr, set_gauge, get_logger
+    log = get_logger("crawler")
+    with span("page_load", platform="Kakao"):
+        driver.get(url)
+
+- span 시간은 단계별 최근 값으로 p50/p95를 계산해 Prometheus summary로 내보냅니다.
+- trace() 안에서 실행된 span은 요청 단위 타이밍 분해(사이드바 패널)에도 기록됩니다.
+- METRICS_FILE 경로로 텍스트 파일을 쓰거나, METRICS_PORT로 /metrics HTTP 엔드포인트를 띄울 수 있습니다
+  (둘 다 기본값은 꺼짐).
+"""
+import os
+import sys
+import time
+import logging
+import functools
+import tempfile
+import threading
+import contextvars
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from pathlib import Path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# 지표 텍스트 파일 경로 (비어 있으면 쓰지 않음 — METRICS_PORT처럼 설정한 경우에만 내보냅니다)
+METRICS_FILE = os.getenv("METRICS_FILE", "")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+# 분위수 계산에 쓸 단계별 최근 샘플 수
+SAMPLE_WINDOW = 1000
+PREFIX = "review_app"
+
+_lock = threading.Lock()
+_counters = defaultdict(float)           # (name, labels) -> 값
+_gauges = {}                             # (name, labels) -> 값
+_samples = defaultdict(lambda: deque(maxlen=SAMPLE_WINDOW))   # (stage, labels) -> 최근 소요 시간
+_totals = defaultdict(lambda: [0, 0.0])  # (stage, labels) -> [count, sum]
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+
+
+# --- 구조화 로그 ---
+class _KeyValueFormatter(logging.Formatter):
+    """ts=... level=... logger=... msg="..." key=value 형식의 한 줄 로그."""
+
+    def format(self, record):
+        fields = {
+            'ts': time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.created)),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        fields.update(getattr(record, 'fields', {}))
+        return " ".join(f"{k}={_quote(v)}" for k, v in fields.items())
+
+
+def _quote(value):
+    text = str(value)
+    return f'"{text}"' if (" " in text or "=" in text or not text) else text
+
+
+_root = logging.getLogger(PREFIX)
+if not _root.handlers:
+    _handler = logging.StreamHandler(sys.stdout)
+    _handler.setFormatter(_KeyValueFormatter())
+    _root.addHandler(_handler)
+    _root.setLevel(LOG_LEVEL)
+    _root.propagate = False
+
+
+def get_logger(name):
+    """review_app.<name> 로거. log.info("메시지", extra={'fields': {...}})로 필드를 덧붙일 수 있습니다."""
+    return logging.getLogger(f"{PREFIX}.{name}")
+
+
+_log = get_logger("metrics")
+
+
+# --- 카운터 / 게이지 / span ---
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def incr(name, value=1, **labels):
+    with _lock:
+        _counters[_key(name, labels)] += value
+
+
+def set_gauge(name, value, **labels):
+    with _lock:
+        _gauges[_key(name, labels)] = value
+
+
+def observe(stage, seconds, **labels):
+    """단계 소요 시간을 기록합니다 (span을 쓰지 않는 곳에서 직접 호출)."""
+    key = _key(stage, labels)
+    with _lock:
+        _samples[key].append(seconds)
+        total = _totals[key]
+        total[0] += 1
+        total[1] += seconds
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.append((stage, dict(labels), seconds))
+
+
+@contextmanager
+def span(stage, **labels):
+    """with span("stage", platform=...): 블록의 소요 시간을 기록하고 debug 로그를 남깁니다."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        observe(stage, elapsed, **labels)
+        _log.debug("span", extra={'fields': {'stage': stage, 'seconds': round(elapsed, 4), **labels}})
+
+
+def timed(stage, **labels):
+    """함수 전체를 span으로 감싸는 데코레이터: @timed("prompt_build", mode="owner")."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage, **labels):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def trace():
+    """
+    요청 하나의 span들을 모읍니다. 반환된 리스트에 (stage, labels, seconds)가 쌓이며,
+    contextvars.copy_context()로 넘긴 작업 스레드의 span도 같은 리스트에 기록됩니다.
+    """
+    records = []
+    token = _current_trace.set(records)
+    try:
+        yield records
+    finally:
+        _current_trace.reset(token)
+
+
+def start_trace():
+    """현재 컨텍스트에서 새 trace를 시작하고 기록 리스트를 반환합니다 (with 블록으로 감싸기 어려운 Streamlit 스크립트용)."""
+    records = []
+    _current_trace.set(records)
+    return records
+
+
+def breakdown(records):
+    """trace 기록을 단계(+플랫폼)별 합계로 묶어 [(이름, 횟수, 합계초)]로 반환합니다 (큰 순)."""
+    agg = defaultdict(lambda: [0, 0.0])
+    for stage, labels, seconds in records:
+        name = stage + (f"[{labels['platform']}]" if 'platform' in labels else "")
+        agg[name][0] += 1
+        agg[name][1] += seconds
+    return sorted(((n, c, round(s, 3)) for n, (c, s) in agg.items()), key=lambda x: -x[2])
+
+
+def stage_total(stage, **labels):
+    """지금까지 기록된 단계의 (횟수, 합계초). 벤치마크에서 구간 전후 차이를 잴 때 씁니다."""
+    with _lock:
+        count, total = _totals.get(_key(stage, labels), (0, 0.0))
+    return count, total
+
+
+# --- Prometheus 텍스트 ---
+def _labels_text(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+
+def _quantile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def render_prometheus():
+    """현재 지표를 Prometheus text exposition 형식 문자열로 반환합니다."""
+    with _lock:
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+        samples = {k: sorted(v) for k, v in _samples.items()}
+        totals = {k: tuple(v) for k, v in _totals.items()}
+
+    lines = []
+    for name in sorted({n for n, _ in counters}):
+        lines.append(f"# TYPE {PREFIX}_{name} counter")
+        for (n, labels), value in counters.items():
+            if n == name:
+                lines.append(f"{PREFIX}_{name}{_labels_text(labels)} {value}")
+    for name in sorted({n for n, _ in gauges}):
+        lines.append(f"# TYPE {PREFIX}_{name} gauge")
+        for (n, labels), value in gauges.items():
+            if n == name:
+                lines.append(f"{PREFIX}_{name}{_labels_text(labels)} {value}")
+    metric = f"{PREFIX}_stage_seconds"
+    lines.append(f"# TYPE {metric} summary")
+    for (stage, labels), values in sorted(samples.items()):
+        base = (('stage', stage),) + labels
+        for q in (0.5, 0.95):
+            lines.append(f"{metric}{_labels_text(base, [('quantile', q)])} {_quantile(values, q):.6f}")
+        count, total = totals[(stage, labels)]
+        lines.append(f"{metric}_count{_labels_text(base)} {count}")
+        lines.append(f"{metric}_sum{_labels_text(base)} {total:.6f}")
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path=METRICS_FILE):
+    """지표를 텍스트 파일로 씁니다 (node_exporter textfile collector 등에서 수집). path가 비어 있으면 쓰지 않습니다."""
+    if not path:
+        return None
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    # 여러 세션·프로세스가 동시에 써도 임시 파일이 겹치지 않도록 같은 디렉터리에 고유한 이름으로 만듭니다.
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=Path(path).parent,
+                                     prefix=f".{Path(path).name}.", suffix=".tmp", delete=False) as f:
+        f.write(render_prometheus())
+    try:
+        os.chmod(f.name, 0o644)
+        os.replace(f.name, path)
+    except OSError:
+        Path(f.name).unlink(missing_ok=True)
+        raise
+    return path
+
+
+_server = None
+
+
+def start_http_server(port=METRICS_PORT, host="0.0.0.0"):
+    """/metrics 엔드포인트를 백그라운드 스레드로 띄웁니다. port가 0이면 아무것도 하지 않습니다."""
+    global _server
+    if not port or _server is not None:
+        return _server
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = render_prometheus().encode('utf-8')
+            self.send_response(200 if self.path.startswith("/metrics") else 404)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    _server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+    _log.info(f"metrics 엔드포인트 시작: http://{host}:{port}/metrics")
+    return _server
@@ -0,0 +1,287 @@
+"""
+리뷰 정제용 형태소 분석 모듈입니다 (analysis.clean_and_tokenize의 본체).
+
+- 백엔드: okt(KoNLPy Okt), mecab(설치된 경우, MORPH_BACKEND=mecab으로 선택), regex(기존 기본 클리닝).
+  MORPH_BACKEND=auto(기본)는 Okt를 쓰고, Okt를 불러올 수 없으면 regex로 대체합니다.
+- 배치: Okt는 리뷰 여러 개를 구분 토큰(SENTINEL)으로 이어 붙여 okt.pos를 MORPH_BATCH_SIZE 개당 한 번만 부릅니다
+  (JVM 경계를 리뷰마다 넘지 않음). 구분 토큰 수가 맞지 않으면 그 배치만 리뷰별 호출로 다시 처리합니다.
+  백엔드를 만들 때 예시 리뷰(BATCH_CHECK_SAMPLE)로 배치 결과와 리뷰별 결과를 비교해, 다르면 배치를 끕니다
+  (MORPH_BATCH_CHECK=0이면 생략).
+- 병렬: MORPH_WORKERS > 0 이고 리뷰가 MORPH_PARALLEL_MIN 개 이상이면 프로세스 풀로 나눠 처리합니다.
+  워커는 spawn으로 시작해 각자 자기 분석기(JVM 포함)를 만듭니다.
+- 메모: 같은 원문은 MORPH_MEMO_ENTRIES 개까지 메모리에 보관해 다시 분석하지 않습니다 (LRU).
+
+품사(Noun/Verb/Adjective)·STOPWORDS·두 글자 이상 필터는 기존 clean_and_tokenize와 같습니다.
+mecab은 품사 체계와 어간 처리가 달라 Okt와 결과가 완전히 같지는 않습니다 (명사·동사·형용사만 남기고 용언에 '다'를 붙임).
+"""
+import os
+import re
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from metrics import get_logger, incr
+
+log = get_logger("morph")
+
+MORPH_BACKEND = os.getenv("MORPH_BACKEND", "auto")
+MORPH_BATCH_SIZE = int(os.getenv("MORPH_BATCH_SIZE", "200"))
+MORPH_WORKERS = int(os.getenv("MORPH_WORKERS", "0"))
+MORPH_PARALLEL_MIN = int(os.getenv("MORPH_PARALLEL_MIN", "2000"))
+MORPH_MEMO_ENTRIES = int(os.getenv("MORPH_MEMO_ENTRIES", "50000"))
+MORPH_BATCH_CHECK = os.getenv("MORPH_BATCH_CHECK", "1") == "1"
+
+KEEP_TAGS = ('Noun', 'Verb', 'Adjective')
+# 배치 구분 토큰: Okt가 한 덩어리의 Alpha 토큰으로 돌려주는 영문 대문자열
+SENTINEL = "QXMORPHSEPQX"
+
+# 배치 검사용 예시 리뷰: 문장부호·반복 자모·이모티콘·영문·숫자·줄바꿈처럼 경계에서 어긋나기 쉬운 경우
+BATCH_CHECK_SAMPLE = (
+    "음식이 정말 맛있어요!!",
+    "ㅋㅋㅋㅋ 사장님이 친절하셨어요ㅎㅎ",
+    "가격은 좀 비싸지만 양이 많아요...",
+    "주차가 불편했어요 😢",
+    "BEST 메뉴는 김치찌개 2인분 10000원",
+    "직원 응대가\n별로였고 다시는 안 갈래요",
+    "분위기 좋고 깔끔함",
+    "기다림",
+)
+
+
+def normalize(text) -> str:
+    return re.sub(r'\s+', ' ', str(text).strip())
+
+
+def regex_clean(text: str) -> str:
+    text = re.sub(r"[^가-힣a-zA-Z0-9 ]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def filter_tokens(pairs, stopwords) -> str:
+    return ' '.join(w for w, t in pairs if t in KEEP_TAGS and w not in stopwords and len(w) > 1)
+
+
+# --- 백엔드 ---
+class RegexBackend:
+    name = 'regex'
+
+    def __init__(self, stopwords):
+        self.stopwords = frozenset(stopwords)
+
+    def clean_many(self, texts):
+        return [regex_clean(t) for t in texts]
+
+
+class OktBackend:
+    """okt.pos(norm=True, stem=True)를 배치로 부릅니다. 실패한 리뷰는 regex 클리닝으로 대체합니다."""
+    name = 'okt'
+
+    def __init__(self, stopwords, okt=None, batch_size=MORPH_BATCH_SIZE):
+        if okt is None:
+            from konlpy.tag import Okt
+            okt = Okt()
+        self.okt = okt
+        self.stopwords = frozenset(stopwords)
+        self.batch_size = max(1, batch_size)
+
+    def _clean_one(self, text):
+        try:
+            return filter_tokens(self.okt.pos(text, norm=True, stem=True), self.stopwords)
+        except Exception:
+            return regex_clean(text)
+
+    def _clean_batch(self, texts):
+        if len(texts) == 1 or any(SENTINEL in t for t in texts):
+            return [self._clean_one(t) for t in texts]
+        try:
+            pairs = self.okt.pos(f"\n{SENTINEL}\n".join(texts), norm=True, stem=True)
+        except Exception:
+            return [self._clean_one(t) for t in texts]
+        groups = [[]]
+        for w, t in pairs:
+            if w == SENTINEL:
+                groups.append([])
+            else:
+                groups[-1].append((w, t))
+        if len(groups) != len(texts):
+            # 구분 토큰이 정규화 등으로 사라지거나 합쳐졌으면 이 배치만 리뷰별로 다시 분석합니다.
+            incr('morph_batch_fallbacks_total', backend=self.name)
+            return [self._clean_one(t) for t in texts]
+        return [filter_tokens(g, self.stopwords) for g in groups]
+
+    def clean_many(self, texts):
+        out = []
+        for b in range(0, len(texts), self.batch_size):
+            out.extend(self._clean_batch(texts[b:b + self.batch_size]))
+        return out
+
+    def check_batching(self, sample=BATCH_CHECK_SAMPLE):
+        """
+        sample을 배치로 한 번, 리뷰별로 한 번 분석해 결과가 같은지 확인합니다.
+        다르면(구분 토큰 앞뒤 문맥이 품사·어간에 영향을 주는 경우) batch_size를 1로 낮춥니다.
+        """
+        if self.batch_size == 1:
+            return True
+        texts = [normalize(t) for t in sample]
+        batched = self._clean_batch(texts)
+        single = [self._clean_one(t) for t in texts]
+        if batched == single:
+            return True
+        diffs = sum(a != b for a, b in zip(batched, single))
+        log.warning(f"Okt 배치 결과가 리뷰별 결과와 다름 ({diffs}/{len(texts)}건) → 배치 비활성화")
+        incr('morph_batch_disabled_total', backend=self.name)
+        self.batch_size = 1
+        return False
+
+
+class MecabBackend:
+    """python-mecab-ko 또는 KoNLPy Mecab. 품사를 Okt 체계로 옮기고 용언 어간에 '다'를 붙입니다."""
+    name = 'mecab'
+    TAG_MAP = {'NNG': 'Noun', 'NNP': 'Noun', 'VV': 'Verb', 'VA': 'Adjective'}
+
+    def __init__(self, stopwords):
+        try:
+            from mecab import MeCab
+        except ImportError:
+            from konlpy.tag import Mecab as MeCab
+        self.mecab = MeCab()
+        self.stopwords = frozenset(stopwords)
+
+    def _okt_like(self, pairs):
+        for w, tag in pairs:
+            tag = self.TAG_MAP.get(tag.split('+')[0])
+            if tag:
+                yield (w + '다' if tag != 'Noun' else w), tag
+
+    def clean_many(self, texts):
+        out = []
+        for t in texts:
+            try:
+                out.append(filter_tokens(self._okt_like(self.mecab.pos(t)), self.stopwords))
+            except Exception:
+                out.append(regex_clean(t))
+        return out
+
+
+def make_backend(name, stopwords, okt_factory=None, check_batching=MORPH_BATCH_CHECK):
+    """
+    name('auto' | 'okt' | 'mecab' | 'regex')의 백엔드를 만듭니다. 불러올 수 없으면 다음 후보로 대체합니다.
+    okt_factory()는 okt 후보를 시도할 때에만 불러 공유 Okt 인스턴스(실패 시 None)를 받습니다.
+    생략하면 OktBackend가 자기 Okt를 만듭니다.
+    """
+    order = {'auto': ['okt', 'regex'], 'okt': ['okt', 'regex'],
+             'mecab': ['mecab', 'okt', 'regex'], 'regex': ['regex']}.get(name, ['okt', 'regex'])
+    for candidate in order:
+        try:
+            if candidate == 'okt':
+                okt = okt_factory() if okt_factory is not None else None
+                if okt_factory is not None and okt is None:
+                    continue
+                backend = OktBackend(stopwords, okt=okt)
+                if check_batching:
+                    backend.check_batching()
+                return backend
+            if candidate == 'mecab':
+                return MecabBackend(stopwords)
+            return RegexBackend(stopwords)
+        except Exception as e:
+            log.warning(f"형태소 분석 백엔드 '{candidate}' 사용 불가: {type(e).__name__} {e}")
+    return RegexBackend(stopwords)
+
+
+# --- 프로세스 풀 워커 (워커마다 자기 분석기를 가짐) ---
+_worker_backend = None
+
+
+def _worker_init(name, stopwords, batch_size=None):
+    # 배치 검사는 부모 프로세스에서 한 번만 하고, 그 결과(batch_size)를 그대로 씁니다.
+    global _worker_backend
+    _worker_backend = make_backend(name, stopwords, check_batching=False)
+    if batch_size is not None and hasattr(_worker_backend, 'batch_size'):
+        _worker_backend.batch_size = batch_size
+
+
+def _worker_clean(texts):
+    return _worker_backend.clean_many(texts)
+
+
+class MorphTokenizer:
+    """
+    clean_and_tokenize와 같은 결과를 내는 배치·메모 토크나이저입니다.
+    tokenize_many(texts)는 입력 순서대로 정제 문자열 리스트를 반환합니다.
+    """
+
+    def __init__(self, backend, workers=MORPH_WORKERS, memo_entries=MORPH_MEMO_ENTRIES,
+                 parallel_min=MORPH_PARALLEL_MIN):
+        self.backend = backend
+        self.workers = workers
+        self.memo_entries = memo_entries
+        self.parallel_min = parallel_min
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def name(self):
+        return self.backend.name
+
+    def tokenize(self, text) -> str:
+        return self.tokenize_many([text])[0]
+
+    def tokenize_many(self, texts, memo=True) -> list:
+        texts = [normalize(t) for t in texts]
+        out = [""] * len(texts)
+        todo = {}   # 정규화 원문 -> 위치 목록
+        with self._lock:
+            for i, t in enumerate(texts):
+                if not t:
+                    continue
+                if memo and t in self._memo:
+                    self._memo.move_to_end(t)
+                    out[i] = self._memo[t]
+                    self.hits += 1
+                else:
+                    todo.setdefault(t, []).append(i)
+            self.misses += len(todo)
+        if not todo:
+            return out
+
+        unique = list(todo)
+        for t, cleaned in zip(unique, self._clean(unique)):
+            for i in todo[t]:
+                out[i] = cleaned
+            if memo and self.memo_entries > 0:
+                with self._lock:
+                    self._memo[t] = cleaned
+                    if len(self._memo) > self.memo_entries:
+                        self._memo.popitem(last=False)
+        return out
+
+    def _clean(self, texts):
+        if self.workers > 0 and len(texts) >= self.parallel_min:
+            try:
+                return self._clean_parallel(texts)
+            except Exception as e:
+                log.warning(f"형태소 분석 프로세스 풀 실패 → 현재 프로세스에서 처리: {type(e).__name__} {e}")
+                self.close()
+        return self.backend.clean_many(texts)
+
+    def _clean_parallel(self, texts):
+        if self._pool is None:
+            # JVM은 fork 후 재사용할 수 없으므로 spawn으로 새 인터프리터를 띄웁니다.
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                initializer=_worker_init, initargs=(self.backend.name, list(self.backend.stopwords),
+                          getattr(self.backend, 'batch_size', None)),
+            )
+        size = max(1, -(-len(texts) // (self.workers * 4)))
+        chunks = [texts[i:i + size] for i in range(0, len(texts), size)]
+        return [c for part in self._pool.map(_worker_clean, chunks) for c in part]
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
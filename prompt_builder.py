@@ -0,0 +1,195 @@
+"""
+식당주인용 / 고객용 LLM 프롬프트를 하나의 템플릿으로 만드는 프롬프트 엔진입니다.
+
+요약·키워드·측면·요청사항은 항상 넣고, 남은 예산 안에서 대표 리뷰를 고릅니다.
+- 공백 정규화 후 같은 리뷰는 한 번만, 긴 리뷰는 review_max_chars에서 자릅니다.
+- 긍정/부정을 번갈아 가며 "점수 - diversity × 이미 고른 리뷰와의 유사도"가 가장 큰 리뷰를 탐욕적으로 고릅니다 (MMR).
+- 예산은 문자 수 기준이며, 토큰 예산은 PROMPT_CHARS_PER_TOKEN으로 환산합니다.
+
+예산·유사도 가중치·리뷰 길이 제한을 하나도 주지 않으면(기본값) 상위 리뷰를 원문 그대로 점수순으로 모두 넣어
+기존 generate_prompt / generate_consumer_prompt와 같은 문자열을 만듭니다. 앱·배치는 PROMPT_LIMITS를 넘깁니다.
+"""
+import os
+import re
+import math
+
+from metrics import get_logger, set_gauge, timed
+
+log = get_logger("prompt")
+
+# 프롬프트 전체 문자 예산 (0이면 제한 없음) / 리뷰 한 건 최대 길이 / 토큰 환산 비율(한국어 기준 대략값)
+PROMPT_BUDGET_CHARS = int(os.getenv("PROMPT_BUDGET_CHARS", "6000"))
+PROMPT_REVIEW_MAX_CHARS = int(os.getenv("PROMPT_REVIEW_MAX_CHARS", "300"))
+PROMPT_CHARS_PER_TOKEN = float(os.getenv("PROMPT_CHARS_PER_TOKEN", "2.0"))
+# 유사도 패널티 가중치 (0이면 점수 순으로만 선택)
+PROMPT_DIVERSITY_WEIGHT = float(os.getenv("PROMPT_DIVERSITY_WEIGHT", "0.5"))
+
+# 앱·배치에서 쓰는 제한 (build_prompt(..., **PROMPT_LIMITS))
+PROMPT_LIMITS = dict(budget_chars=PROMPT_BUDGET_CHARS, diversity=PROMPT_DIVERSITY_WEIGHT,
+                     review_max_chars=PROMPT_REVIEW_MAX_CHARS)
+
+TEMPLATE = """### 리뷰 분석 요약: {name}
+
+- 리뷰 수 (감성 분석 성공): {classified_count}개
+- 긍정 비율: {pos_ratio:.1f}% | 부정 비율: {neg_ratio:.1f}%
+
+### 핵심 키워드
+- 전체: {kw_all}
+- 긍정: {kw_pos}
+- 부정: {kw_neg}
+
+### 측면별 키워드 (상위 5개)
+{aspects}
+
+### 상위 긍정 리뷰{positive}
+
+### 상위 부정 리뷰{negative}
+{instructions}"""
+
+INSTRUCTIONS = {
+    'owner': "\n".join([
+        "",
+        "### 요청사항",
+        "1. 긍정적으로 평가되는 부분 (강점): 분석된 핵심 포인트 요약",
+        "2. 개선이 필요한 부분 (약점): 주요 부정 키워드 및 원인 분석",
+        "3. 실행 가능한 개선 방안: 구체적 제안 (측면별)",
+    ]),
+    'consumer': "\n".join([
+        "",
+        "위 리뷰를 참고하여, 소비자 관점에서 아래 내용을 응답해 주세요:",
+        "1. **추천 메뉴**",
+        "2. **낮은 평점에서 자주 언급된 식당의 문제점**",
+        "3. **해시태그**",
+    ]),
+}
+
+
+def estimate_tokens(text):
+    return math.ceil(len(text) / PROMPT_CHARS_PER_TOKEN)
+
+
+def _fmt(lst):
+    return ', '.join(f"{w}({s})" for w, s in lst) if lst else '없음'
+
+
+def _normalize(text):
+    return re.sub(r"\s+", " ", str(text)).strip()
+
+
+def _truncate(text, max_chars):
+    if max_chars and len(text) > max_chars:
+        return text[:max_chars - 1].rstrip() + "…", True
+    return text, False
+
+
+def _bigrams(text):
+    compact = text.replace(" ", "")
+    return {compact[i:i + 2] for i in range(len(compact) - 1)} or {compact}
+
+
+def _similarity(a, b):
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+def _candidates(frame, max_chars, seen):
+    """
+    (text, score) 프레임을 점수순 후보 리스트로. seen(정규화 원문 집합)이 None이면 원문 그대로 모두 넣고,
+    아니면 정규화해 seen에 있는 중복과 빈 리뷰를 건너뜁니다. 반환: (후보, 중복 수, 빈 리뷰 수)
+    """
+    out, dups, empty = [], 0, 0
+    if frame is None or len(frame) == 0:
+        return out, dups, empty
+    for row in frame.itertuples():
+        if seen is None:
+            out.append({'text': str(row.text), 'score': float(row.score), 'grams': set(), 'cut': False})
+            continue
+        norm = _normalize(row.text)
+        if not norm:
+            empty += 1
+            continue
+        if norm in seen:
+            dups += 1
+            continue
+        seen.add(norm)
+        text, cut = _truncate(norm, max_chars)
+        out.append({'text': text, 'score': float(row.score), 'grams': _bigrams(norm), 'cut': cut})
+    return out, dups, empty
+
+
+def _select(pools, budget, caps, diversity):
+    """
+    pools: {'pos': [...], 'neg': [...]} 후보. 풀을 번갈아 가며 예산 안에 들어가는 후보 중
+    score - diversity * (이미 고른 리뷰와의 최대 유사도)가 가장 큰 것을 고릅니다.
+    """
+    chosen = {k: [] for k in pools}
+    picked_grams = []
+    remaining = dict((k, list(v)) for k, v in pools.items())
+    active = [k for k in pools if remaining[k]]
+    while active and (budget is None or budget > 0):
+        for key in list(active):
+            line_cost = lambda c: len(f"{len(chosen[key]) + 1}. ({c['score']:.3f}) {c['text']}") + 1
+            fits = [c for c in remaining[key] if budget is None or line_cost(c) <= budget]
+            if not fits or len(chosen[key]) >= caps[key]:
+                active.remove(key)
+                continue
+            if diversity:
+                best = max(fits, key=lambda c: c['score'] - diversity * max(
+                    (_similarity(c['grams'], g) for g in picked_grams), default=0.0))
+            else:
+                best = fits[0]     # 후보는 이미 점수순
+            remaining[key].remove(best)
+            chosen[key].append(best)
+            picked_grams.append(best['grams'])
+            if budget is not None:
+                budget -= line_cost(best)
+    return chosen
+
+
+def _review_lines(chosen):
+    return "".join(f"\n{i}. ({c['score']:.3f}) {c['text']}" for i, c in enumerate(chosen, 1))
+
+
+@timed('prompt_build')
+def build_prompt(mode, name, keywords, pos_ratio, neg_ratio, aspects, top_pos, top_neg, classified_count,
+                 budget_chars=None, budget_tokens=None, diversity=0.0, review_max_chars=None):
+    """
+    mode('owner' | 'consumer')에 맞는 프롬프트와 크기 보고서를 반환합니다: (prompt, report).
+    budget_tokens가 주어지면 문자 예산으로 환산합니다. budget_chars·budget_tokens가 없거나 0이면 예산이 없고,
+    diversity가 0이면 점수순, review_max_chars가 없으면 자르지 않습니다. 셋 다 없으면 정규화·중복 제거도 하지 않습니다.
+    """
+    if budget_tokens:
+        budget_chars = int(budget_tokens * PROMPT_CHARS_PER_TOKEN)
+    compact = bool(budget_chars or diversity or review_max_chars)
+
+    fields = dict(
+        name=name, classified_count=classified_count, pos_ratio=pos_ratio, neg_ratio=neg_ratio,
+        kw_all=_fmt(keywords.get('전체', [])), kw_pos=_fmt(keywords.get('긍정', [])),
+        kw_neg=_fmt(keywords.get('부정', [])),
+        aspects="\n".join(f"- {asp}: {_fmt(kws)}" for asp, kws in aspects.items()),
+        instructions=INSTRUCTIONS[mode],
+    )
+    fixed = len(TEMPLATE.format(positive="", negative="", **fields))
+
+    seen = set() if compact else None
+    pos, pos_dups, pos_empty = _candidates(top_pos, review_max_chars, seen)
+    neg, neg_dups, neg_empty = _candidates(top_neg, review_max_chars, seen)
+    budget = max(0, budget_chars - fixed) if budget_chars else None
+    caps = {'pos': len(top_pos) if top_pos is not None else 0, 'neg': len(top_neg) if top_neg is not None else 0}
+    chosen = _select({'pos': pos, 'neg': neg}, budget, caps, diversity)
+
+    prompt = TEMPLATE.format(positive=_review_lines(chosen['pos']), negative=_review_lines(chosen['neg']), **fields)
+    report = {
+        'mode': mode,
+        'chars': len(prompt),
+        'est_tokens': estimate_tokens(prompt),
+        'budget_chars': budget_chars or None,
+        'reviews': {'pos': len(chosen['pos']), 'neg': len(chosen['neg'])},
+        'candidates': {'pos': caps['pos'], 'neg': caps['neg']},
+        'duplicates': pos_dups + neg_dups,
+        'empty': pos_empty + neg_empty,
+        'truncated': sum(c['cut'] for picked in chosen.values() for c in picked),
+    }
+    set_gauge('prompt_chars', report['chars'], mode=mode)
+    log.info(f"[Prompt] {mode}: {report['chars']}자 (약 {report['est_tokens']} 토큰, 예산 {budget_chars or '없음'}), "
+             f"리뷰 긍정 {report['reviews']['pos']}/{caps['pos']} · 부정 {report['reviews']['neg']}/{caps['neg']}")
+    return prompt, report
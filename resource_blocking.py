@@ -0,0 +1,85 @@
+"""
+크롤러 브라우저의 불필요한 리소스(이미지·웹폰트·지도 타일·광고·분석 스크립트) 차단 설정입니다.
+
+- 브라우저 전체: Chrome prefs로 이미지 로딩을 끕니다 (init_driver에서 적용, 세션 시작 시 고정).
+- 플랫폼별: 크롤러가 풀에서 세션을 빌릴 때 DevTools Network.setBlockedURLs로 URL 패턴을 차단합니다.
+  풀의 세션은 플랫폼 사이에서 재사용되므로 빌릴 때마다 해당 플랫폼 프로필로 덮어씁니다.
+  DevTools 차단은 현재 창(target) 단위라 새 창으로 전환하면 다시 적용해야 하며,
+  다른 사이트의 iframe(OOPIF)에는 적용되지 않습니다 (이미지 prefs는 적용됨).
+- 허용 목록: 리뷰 DOM·리뷰 API가 계속 로드되어야 하는 URL 예시입니다. 이 중 하나라도 막는 차단 패턴은
+  적용하지 않고 경고만 남깁니다 (CSS·문서·스크립트 자체는 레이아웃·스크롤 판정에 필요하므로 막지 않습니다).
+
+RESOURCE_BLOCKING=0 으로 끌 수 있고, RESOURCE_BLOCK_EXTRA(쉼표 구분)로 패턴을 더할 수 있습니다.
+"""
+import os
+import re
+
+from metrics import get_logger
+
+log = get_logger("blocking")
+
+BLOCKING_ENABLED = os.getenv("RESOURCE_BLOCKING", "1") != "0"
+EXTRA_PATTERNS = [p.strip() for p in os.getenv("RESOURCE_BLOCK_EXTRA", "").split(",") if p.strip()]
+
+# 모든 플랫폼 공통: 이미지·폰트·미디어 확장자, 광고·분석 도메인과 비콘
+COMMON_BLOCK_PATTERNS = [
+    "*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.svg*", "*.ico*",
+    "*.woff*", "*.woff2*", "*.ttf*", "*.otf*", "*.mp4*", "*.webm*",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*googlesyndication.com*", "*/analytics.js*", "*/collect?*", "*/collect",
+]
+# 플랫폼별: 지도 타일·광고
+PLATFORM_BLOCK_PATTERNS = {
+    'Kakao': ["*map.daumcdn.net/map_*", "*display.ad.daum.net*", "*stat.tiara.kakao.com*"],
+    'Google': ["*/maps/vt*", "*khms*.google.com/kh*", "*streetviewpixels*", "*/gen_204*", "*/log?*"],
+    'Naver': ["*map.pstatic.net/nrb/*", "*nrbe.map.naver.net*", "*/tivan/*", "*lcs.naver.com*", "*siape.veta.naver.com*"],
+}
+# 반드시 로드되어야 하는 URL 예시 (리뷰 목록 문서/API, 픽스처 서버 API 포함)
+PLATFORM_ALLOWLIST = {
+    'Kakao': ["https://place.map.kakao.com/main/v/12345", "https://place.map.kakao.com/commentlist/v/12345/2",
+              "http://127.0.0.1/api/kakao/reviews?offset=0&limit=5"],
+    'Google': ["https://www.google.com/maps/preview/review/listentitiesreviews?authuser=0",
+               "https://www.google.com/maps/place/data=abc", "http://127.0.0.1/api/google/reviews?offset=0&limit=10"],
+    'Naver': ["https://pcmap-api.place.naver.com/graphql", "https://pcmap.place.naver.com/restaurant/1/review/visitor",
+              "http://127.0.0.1/api/naver/reviews?offset=0&limit=10"],
+}
+
+
+def chrome_prefs():
+    """init_driver의 options.add_experimental_option("prefs", ...)에 넣을 값."""
+    if not BLOCKING_ENABLED:
+        return {}
+    return {"profile.managed_default_content_settings.images": 2}
+
+
+def _matches(url, pattern):
+    """DevTools 차단 패턴과 같은 규칙('*'만 와일드카드)으로 url이 걸리는지 판정합니다."""
+    regex = ".*".join(re.escape(part) for part in pattern.split("*"))
+    return re.fullmatch(regex, url) is not None
+
+
+def blocked_patterns(platform):
+    """platform에 적용할 차단 패턴. 허용 목록 URL을 막는 패턴은 제외합니다."""
+    if not BLOCKING_ENABLED:
+        return []
+    allow = PLATFORM_ALLOWLIST.get(platform, [])
+    patterns = []
+    for pattern in COMMON_BLOCK_PATTERNS + PLATFORM_BLOCK_PATTERNS.get(platform, []) + EXTRA_PATTERNS:
+        hit = next((url for url in allow if _matches(url, pattern)), None)
+        if hit:
+            log.warning(f"[{platform}] 차단 패턴 '{pattern}'이 허용 URL({hit})과 겹쳐 적용하지 않습니다.")
+            continue
+        patterns.append(pattern)
+    return patterns
+
+
+def apply_blocking(driver, platform):
+    """빌린 세션에 platform 차단 프로필을 적용합니다. DevTools를 쓸 수 없는 드라이버면 건너뜁니다."""
+    patterns = blocked_patterns(platform)
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    except Exception as e:
+        log.warning(f"[{platform}] 리소스 차단 적용 실패: {type(e).__name__} {e}")
+        return 0
+    return len(patterns)
@@ -0,0 +1,116 @@
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+
+# 크롤링한 리뷰를 영구 저장하는 로컬 SQLite 파일 (Streamlit 재시작 후에도 유지)
+REVIEW_DB_PATH = os.getenv("REVIEW_DB_PATH", os.path.join(".cache", "reviews.db"))
+# get_reviews가 기본으로 돌려주는 최대 리뷰 수 (크롤러의 플랫폼당 MAX_REVIEWS와 같음)
+REVIEW_STORE_LIMIT = int(os.getenv("REVIEW_STORE_LIMIT", "100"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reviews (
+    platform   TEXT NOT NULL,
+    place      TEXT NOT NULL,
+    review_key TEXT NOT NULL,
+    review_id  TEXT,
+    reviewer   TEXT,
+    text       TEXT,
+    rating     TEXT,
+    date       TEXT,
+    first_seen REAL NOT NULL,
+    PRIMARY KEY (platform, place, review_key)
+);
+"""
+
+
+def normalize_place(name):
+    """식당 이름을 저장 키로 정규화합니다 (앞뒤 공백 제거, 연속 공백 축약, 소문자)."""
+    return re.sub(r"\s+", " ", str(name)).strip().lower()
+
+
+def review_key(review):
+    """
+    리뷰의 고유 키: 플랫폼이 준 리뷰 id가 있으면 그대로, 없으면 (작성자, 날짜, 본문 앞부분) 해시.
+    본문은 '더보기' 펼침 여부에 따라 잘릴 수 있으므로 앞 20자만 사용합니다.
+    """
+    if review.get('id'):
+        return f"id:{review['id']}"
+    text = re.sub(r"\s+", " ", str(review.get('text') or "")).strip()[:20]
+    raw = "|".join([str(review.get('reviewer') or ""), str(review.get('date') or ""), text])
+    return "h:" + hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+class ReviewStore:
+    """(platform, place, review_key) 단위로 리뷰를 쌓아두는 SQLite 저장소입니다."""
+
+    def __init__(self, path=REVIEW_DB_PATH):
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # 호출마다 짧게 열고 닫아 여러 크롤러 스레드/프로세스가 동시에 써도 안전하게 합니다.
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def known_keys(self, platform, place):
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT review_key FROM reviews WHERE platform = ? AND place = ?",
+                (platform, normalize_place(place)),
+            ).fetchall()
+        return {r[0] for r in rows}
+
+    def add_reviews(self, platform, place, reviews):
+        """새 리뷰만 추가하고 추가된 개수를 반환합니다. 이미 있는 키는 무시합니다."""
+        place = normalize_place(place)
+        now = time.time()
+        rows = [
+            (platform, place, review_key(r), r.get('id'), r.get('reviewer'),
+             r.get('text'), r.get('rating'), r.get('date'), now)
+            for r in reviews
+        ]
+        with self._lock, self._connect() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO reviews "
+                "(platform, place, review_key, review_id, reviewer, text, rating, date, first_seen) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            added = conn.total_changes - before
+        return added
+
+    def get_reviews(self, platform, place, limit=REVIEW_STORE_LIMIT):
+        """
+        저장된 리뷰를 최근 수집 순(새 리뷰 먼저)으로 최대 limit개, 기존 리뷰 dict 형태로 반환합니다.
+        limit이 None이나 0이면 저장된 이력 전체를 반환합니다.
+        """
+        sql = (
+            "SELECT review_id, reviewer, text, rating, date FROM reviews "
+            "WHERE platform = ? AND place = ? ORDER BY first_seen DESC, rowid"
+        )
+        params = [platform, normalize_place(place)]
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        with self._connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [
+            {'platform': platform, 'reviewer': reviewer, 'text': text,
+             'rating': rating, 'date': date, 'id': rid}
+            for rid, reviewer, text, rating, date in rows
+        ]
@@ -1,5 +1,31 @@
+"""
+Gemini 프롬프트 전송기.
+
+브라우저 하나를 계속 띄워 두는 상주 프로세스(데몬)로 실행하고, 앱은 로컬 소켓으로 프롬프트를 보냅니다.
+전송할 때마다 파이썬 인터프리터·Chrome을 새로 띄우지 않으며, 로그인 세션도 유지됩니다.
+
+    python send_prompt.py --serve            # 데몬 실행 (127.0.0.1:GEMINI_SENDER_PORT)
+    python send_prompt.py "<your prompt>"    # 데몬이 있으면 데몬으로, 없으면 기존처럼 1회 실행
+
+프로토콜: 한 줄짜리 JSON 요청/응답 (줄바꿈은 JSON 문자열 안에서 이스케이프되므로 프롬프트 길이 제한 없음)
+    → {"cmd": "send", "prompt": "...", "token": "..."}   ← {"ok": true, "status": "typed", "latency": 1.23, ...}
+    → {"cmd": "ping", "token": "..."}                    ← {"ok": true, "status": "alive", "sends": 3, ...}
+
+인증: 로그인된 브라우저를 다른 로컬 프로세스가 조작하지 못하도록, 모든 요청은 GEMINI_SENDER_TOKEN_PATH
+파일(권한 0600, 없으면 처음 쓰는 쪽이 만듦)의 토큰을 함께 보내야 합니다. 다른 사용자가 읽을 수 있는 토큰 파일은 거부합니다.
+자동 시작: 여러 세션이 동시에 데몬을 띄우지 않도록 잠금 파일을 잡은 상태에서 확인·실행합니다.
+"""
+import os
 import sys
+import json
+import hmac
 import time
+import socket
+import secrets
+import argparse
+import threading
+import subprocess
+import socketserver
 from selenium import webdriver
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.service import Service
@@ -8,45 +34,289 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver import ActionChains
 
-def send_to_gemini(prompt: str):
-    driver = None
+from metrics import get_logger, observe, incr
+
+log = get_logger("gemini")
+
+GEMINI_URL = "https://gemini.google.com/app"
+GEMINI_SENDER_HOST = os.getenv("GEMINI_SENDER_HOST", "127.0.0.1")
+GEMINI_SENDER_PORT = int(os.getenv("GEMINI_SENDER_PORT", "8770"))
+# 데몬을 자동으로 띄웠을 때 응답을 기다릴 최대 시간(초) / 전송 한 건의 응답 대기 시간(초)
+DAEMON_START_TIMEOUT = 15
+SEND_TIMEOUT = 60
+DAEMON_LOG_PATH = os.path.join(".cache", "gemini_sender.log")
+DAEMON_LOCK_PATH = os.path.join(".cache", "gemini_sender.lock")
+GEMINI_SENDER_TOKEN_PATH = os.getenv("GEMINI_SENDER_TOKEN_PATH", os.path.join(".cache", "gemini_sender.token"))
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: 잠금 파일에 msvcrt 바이트 잠금을 씁니다.
+    fcntl = None
+    import msvcrt
+
+
+def load_token(path=GEMINI_SENDER_TOKEN_PATH):
+    """데몬 인증 토큰을 읽습니다. 파일이 없으면 권한 0600으로 새로 만들고, 다른 사용자가 읽을 수 있으면 거부합니다."""
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # 임시 파일에 쓴 뒤 link로 옮겨, 동시에 만들어도 한쪽만 성공하고 반쯤 쓰인 파일을 읽지 않게 합니다.
+        tmp = f"{path}.{os.getpid()}.{secrets.token_hex(4)}"
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(secrets.token_urlsafe(32))
+            os.link(tmp, path)
+        except FileExistsError:
+            pass
+        finally:
+            os.unlink(tmp)
+    if os.name == 'posix' and os.stat(path).st_mode & 0o077:
+        raise PermissionError(f"토큰 파일 {path}의 권한이 너무 넓습니다 (0600이어야 함).")
+    with open(path, 'r', encoding='utf-8') as f:
+        token = f.read().strip()
+    if not token:
+        raise PermissionError(f"토큰 파일 {path}이 비어 있습니다.")
+    return token
+
+
+class _FileLock:
+    """프로세스 사이의 배타 잠금 (with _FileLock(path): ...)."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._f = open(self.path, 'a+')
+        if fcntl is not None:
+            fcntl.flock(self._f.fileno(), fcntl.LOCK_EX)
+        else:
+            self._f.seek(0)
+            msvcrt.locking(self._f.fileno(), msvcrt.LK_LOCK, 1)
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._f.fileno(), fcntl.LOCK_UN)
+            else:
+                self._f.seek(0)
+                msvcrt.locking(self._f.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._f.close()
+
+
+class GeminiSender:
+    """Chrome 세션 하나를 재사용해 Gemini 입력창에 프롬프트를 넣습니다. 세션이 죽으면 다시 띄웁니다."""
+
+    def __init__(self):
+        self.driver = None
+        self.sends = 0
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+
+    def _ensure_driver(self):
+        if self.driver is not None:
+            try:
+                if self.driver.window_handles:
+                    return self.driver
+            except Exception:
+                pass
+            log.warning("→ 브라우저 세션이 종료되어 다시 시작합니다.")
+            self.close()
+        start = time.perf_counter()
+        # ChromeDriver 자동 설치 + 실행 (데몬 수명 동안 한 번)
+        self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()))
+        observe('gemini_browser_startup', time.perf_counter() - start)
+        return self.driver
+
+    def send(self, prompt: str) -> dict:
+        """프롬프트를 입력하고 {'ok', 'status', 'latency', 'error'}를 반환합니다. 동시에 한 건씩 처리합니다."""
+        with self._lock:
+            start = time.perf_counter()
+            try:
+                driver = self._ensure_driver()
+                # Gemini 앱 접속 (새 대화)
+                driver.get(GEMINI_URL)
+
+                # 에디터 로드 대기 (로그인 전이면 여기서 시간 초과)
+                wait = WebDriverWait(driver, 15)
+                editor = wait.until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, "div.ql-editor"))
+                )
+
+                # 더블클릭으로 포커스 후 JS로 한 번에 텍스트 입력 (send_keys 대신)
+                ActionChains(driver).double_click(editor).perform()
+                driver.execute_script(
+                    "arguments[0].innerText = arguments[1];",
+                    editor,
+                    prompt
+                )
+                self.sends += 1
+                result = {'ok': True, 'status': 'typed', 'error': None}
+                log.info("✅ 프롬프트 입력 완료. 결과를 확인하세요.")
+            except Exception as e:
+                result = {'ok': False, 'status': 'error', 'error': f"{type(e).__name__}: {e}"}
+                log.warning(f"❌ 자동화 오류: {e}")
+            result['latency'] = round(time.perf_counter() - start, 3)
+            result['chars'] = len(prompt)
+            observe('gemini_send', result['latency'], status=result['status'])
+            incr('gemini_sends_total', status=result['status'])
+            return result
+
+    def status(self) -> dict:
+        return {'ok': True, 'status': 'alive', 'sends': self.sends,
+                'browser': self.driver is not None, 'uptime': round(time.time() - self.started_at, 1)}
+
+    def close(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
+
+
+# --- 데몬 (로컬 TCP 소켓, 한 줄 JSON) ---
+def serve(host=GEMINI_SENDER_HOST, port=GEMINI_SENDER_PORT):
+    token = load_token()
+    sender = GeminiSender()
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            try:
+                request = json.loads(self.rfile.readline().decode('utf-8'))
+                cmd = request.get('cmd', 'send')
+                if not hmac.compare_digest(str(request.get('token', '')), token):
+                    incr('gemini_sender_unauthorized_total')
+                    response = {'ok': False, 'status': 'unauthorized', 'error': "인증 토큰이 맞지 않습니다."}
+                elif cmd == 'ping':
+                    response = sender.status()
+                elif cmd == 'send':
+                    response = sender.send(str(request.get('prompt', '')))
+                else:
+                    response = {'ok': False, 'status': 'error', 'error': f"알 수 없는 명령: {cmd}"}
+            except (ValueError, AttributeError) as e:
+                response = {'ok': False, 'status': 'error', 'error': f"잘못된 요청: {e}"}
+            self.wfile.write((json.dumps(response, ensure_ascii=False) + "\n").encode('utf-8'))
+
+    socketserver.ThreadingTCPServer.allow_reuse_address = True
+    with socketserver.ThreadingTCPServer((host, port), Handler) as server:
+        log.info(f"→ Gemini 전송 데몬 시작: {host}:{port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            sender.close()
+
+
+# --- 클라이언트 ---
+def _request(payload, host=GEMINI_SENDER_HOST, port=GEMINI_SENDER_PORT, timeout=SEND_TIMEOUT):
+    payload = {**payload, 'token': load_token()}
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        sock.sendall((json.dumps(payload, ensure_ascii=False) + "\n").encode('utf-8'))
+        with sock.makefile('r', encoding='utf-8') as f:
+            line = f.readline()
+    if not line:
+        raise ConnectionError("Gemini 전송 데몬이 응답 없이 연결을 닫았습니다.")
+    return json.loads(line)
+
+
+def ping(host=GEMINI_SENDER_HOST, port=GEMINI_SENDER_PORT):
+    """데몬 상태 dict, 실행 중이 아니거나 인증에 실패하면 None."""
     try:
-        # 1) ChromeDriver 자동 설치 + 실행
-        driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install())
-        )
-        # 2) Gemini 앱 접속
-        driver.get("https://gemini.google.com/app")
-        print("→ Gemini 페이지 열림, 로그인 완료 후 기다려 주세요.")
-
-        # 3) 에디터 로드 대기
-        wait = WebDriverWait(driver, 15)
-        editor = wait.until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "div.ql-editor"))
-        )
-
-        # 4) 더블클릭으로 포커스
-        ActionChains(driver).double_click(editor).perform()
-
-        # 5) JS로 한 번에 텍스트 입력 (send_keys 대신)
-        driver.execute_script(
-            "arguments[0].innerText = arguments[1];",
-            editor,
-            prompt
-        )
-        print("✅ 프롬프트 입력 완료. 결과를 확인하세요.")
-        
-        # 6) 잠시 대기
+        status = _request({'cmd': 'ping'}, host, port, timeout=2)
+    except (OSError, ValueError):
+        return None
+    return status if status.get('ok') else None
+
+
+def ensure_daemon(host=GEMINI_SENDER_HOST, port=GEMINI_SENDER_PORT, timeout=DAEMON_START_TIMEOUT):
+    """
+    데몬이 없으면 백그라운드 프로세스로 띄우고 응답할 때까지 기다립니다.
+    잠금 파일을 잡은 채로 다시 확인하고 띄우므로, 여러 세션이 동시에 불러도 데몬은 하나만 시작됩니다.
+    """
+    if ping(host, port):
+        return True
+    with _FileLock(DAEMON_LOCK_PATH):
+        if ping(host, port):
+            return True
+        if _port_in_use(host, port):
+            log.warning(f"{host}:{port}를 다른 프로세스가 쓰고 있어 Gemini 전송 데몬을 시작하지 않습니다.")
+            return False
+        os.makedirs(os.path.dirname(DAEMON_LOG_PATH), exist_ok=True)
+        with open(DAEMON_LOG_PATH, 'a', encoding='utf-8') as out:
+            subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), "--serve", "--host", host, "--port", str(port)],
+                stdout=out, stderr=subprocess.STDOUT, start_new_session=True,
+            )
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if ping(host, port):
+                return True
+            time.sleep(0.2)
+    return False
+
+
+def _port_in_use(host, port):
+    """host:port에 이미 무언가가 listen 중인지 (응답이 없거나 인증에 실패한 다른 프로세스 포함)."""
+    try:
+        with socket.create_connection((host, port), timeout=1):
+            return True
+    except OSError:
+        return False
+
+
+def submit(prompt: str, host=GEMINI_SENDER_HOST, port=GEMINI_SENDER_PORT, autostart=True) -> dict:
+    """
+    데몬에 프롬프트를 보내고 결과({'ok', 'status', 'latency', 'error', 'roundtrip'})를 반환합니다.
+    autostart=True면 데몬이 없을 때 먼저 띄웁니다.
+    """
+    if autostart and not ensure_daemon(host, port):
+        return {'ok': False, 'status': 'unavailable', 'error': "Gemini 전송 데몬을 시작하지 못했습니다.",
+                'latency': None}
+    start = time.perf_counter()
+    try:
+        result = _request({'cmd': 'send', 'prompt': prompt}, host, port)
+    except (OSError, ValueError) as e:
+        return {'ok': False, 'status': 'unavailable', 'error': f"{type(e).__name__}: {e}", 'latency': None}
+    result['roundtrip'] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def send_to_gemini(prompt: str):
+    """데몬 없이 1회 실행 (기존 동작): 브라우저를 띄워 입력한 뒤 잠시 열어 둡니다."""
+    sender = GeminiSender()
+    result = sender.send(prompt)
+    if result['ok']:
+        # 브라우저는 닫지 않고 그대로 남겨둡니다.
         time.sleep(60)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gemini 프롬프트 전송기")
+    parser.add_argument("prompt", nargs="?", help="전송할 프롬프트")
+    parser.add_argument("--serve", action="store_true", help="상주 데몬으로 실행")
+    parser.add_argument("--host", default=GEMINI_SENDER_HOST)
+    parser.add_argument("--port", type=int, default=GEMINI_SENDER_PORT)
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        serve(args.host, args.port)
+        return 0
+    if not args.prompt:
+        print("Usage: python send_prompt.py \"<your prompt here>\"  |  python send_prompt.py --serve")
+        return 1
+    if ping(args.host, args.port):
+        result = submit(args.prompt, args.host, args.port, autostart=False)
+    else:
+        result = send_to_gemini(args.prompt)
+    print(json.dumps(result, ensure_ascii=False))
+    return 0 if result['ok'] else 1
 
-    except Exception as e:
-        print(f"❌ 자동화 오류: {e}")
-    # 브라우저는 닫지 않고 그대로 남겨둡니다.
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python send_prompt.py \"<your prompt here>\"")
-        sys.exit(1)
-    # 따옴표 처리된 prompt를 받아옵니다.
-    prompt_text = sys.argv[1]
-    send_to_gemini(prompt_text)
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""
+어휘 사전 + 별점으로 확실한 리뷰를 먼저 분류하고, 애매한 리뷰만 감성 모델로 보내는 2단계 캐스케이드입니다.
+
+1단계(LexiconScorer)는 리뷰 전체에 대해 pandas 문자열 연산으로 한 번에 계산합니다.
+- 긍정/부정 어휘: ASPECT_KEYWORDS 중 평가가 들어 있는 형용사(맛있다, 비싸다, 친절하다 …)와
+  리뷰에 흔한 평가 표현(최고, 실망 …). 어간('맛있다' → '맛있')으로 원문에서 찾습니다.
+- 부정어·역접: STOPWORDS의 '않-', '아니-' 형태, 어절 앞의 '안'·'못'(띄어 쓰거나 붙여 쓴 '안좋다', '못먹다'),
+  '없-'('재방문 의사 없음'), '하지만', '근데'가 있으면 판단하지 않습니다.
+- 별점: Kakao·Google 리뷰의 rating 문자열에서 마지막 숫자(1~5)를 읽습니다.
+긍정(부정) 어휘만 있고 근거가 충분하면(어휘 2개 이상, 또는 어휘 1개 + 같은 방향 별점, 또는 짧은 리뷰의 극단 별점)
+모델과 같은 {'label', 'score'} 형식에 'source': 'lexicon'을 붙여 결정하고, 나머지는 None으로 남겨 2단계(모델)로 넘깁니다.
+어휘로 결정한 리뷰의 score는 모델 확신도가 아니므로 감성 임계값과 관계없이 그 레이블로 분류합니다 (analysis._summarize).
+
+기본은 꺼져 있습니다 (모든 리뷰를 모델로 보냄). analysis.compare_cascade로 실제 모델과의 일치율을 확인한 뒤
+SENTIMENT_CASCADE=1 로 켭니다.
+"""
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from metrics import get_logger, incr, set_gauge
+
+log = get_logger("cascade")
+
+CASCADE_ENABLED = os.getenv("SENTIMENT_CASCADE", "0") != "0"
+# 어휘로 결정한 리뷰의 기본 점수 (근거 하나마다 0.02씩, 최대 0.99, 상위 리뷰 정렬용) / 별점만으로 판단할 짧은 리뷰 길이
+CASCADE_BASE_SCORE = float(os.getenv("SENTIMENT_CASCADE_BASE_SCORE", "0.92"))
+CASCADE_SHORT_CHARS = int(os.getenv("SENTIMENT_CASCADE_SHORT_CHARS", "15"))
+
+POSITIVE_LABEL = 'LABEL_1'
+NEGATIVE_LABEL = 'LABEL_0'
+
+# ASPECT_KEYWORDS 어휘 중 극성이 있는 단어 (+1 긍정, -1 부정). 나머지 측면 어휘는 중립으로 봅니다.
+ASPECT_POLARITY = {
+    '싸다': 1, '가성비': 1, '저렴하다': 1, '합리적이다': 1, '비싸다': -1, '아깝다': -1, '부담되다': -1,
+    '친절하다': 1, '빠르다': 1, '느리다': -1, '불편하다': -1,
+    '맛있다': 1, '고소하다': 1, '담백하다': 1, '부드럽다': 1, '바삭하다': 1, '싱겁다': -1,
+    '깔끔하다': 1, '아늑하다': 1, '편안하다': 1, '시끄럽다': -1,
+    '추천': 1,
+    '가깝다': 1,
+    '푸짐하다': 1, '모자라다': -1,
+}
+# 측면 사전에 없는 일반 평가 표현 (어간)
+GENERAL_POSITIVE = ['최고', '만족', '훌륭', '재방문', '좋았', '좋아요', '좋습니다', '강추', '존맛']
+GENERAL_NEGATIVE = ['별로', '실망', '최악', '아쉬', '불친절', '맛없', '비추', '불만', '다시는', '불편']
+# STOPWORDS 중 부정어 어간 + 어절 앞의 부정 부사('안', '못') + '없-' / 역접
+NEGATOR_PREFIXES = ('않', '아니')
+ABSENCE_STEMS = ('없',)
+CONTRAST_WORDS = ('하지만', '근데')
+
+
+def _stem(word):
+    """'맛있다' → '맛있'. 한 글자 어간('싸', '짜')은 다른 단어 안에서 잘못 걸리므로 쓰지 않습니다."""
+    stem = word[:-1] if word.endswith('다') else word
+    return stem if len(stem) >= 2 else None
+
+
+def _alternation(words):
+    words = sorted({w for w in words if w}, key=len, reverse=True)
+    return re.compile("|".join(map(re.escape, words))) if words else None
+
+
+def parse_rating(series):
+    """rating 문자열 Series → float Series (마지막 숫자, 0~5 범위 밖이거나 없으면 NaN)."""
+    nums = pd.to_numeric(series.astype(str).str.extract(r"(\d+(?:\.\d+)?)(?!.*\d)", expand=False),
+                         errors='coerce')
+    return nums.where((nums >= 0) & (nums <= 5))
+
+
+class LexiconScorer:
+    """aspect_keywords·stopwords 어휘로 만든 극성 사전으로 리뷰를 벡터 연산으로 1차 분류합니다."""
+
+    def __init__(self, aspect_keywords, stopwords, base_score=CASCADE_BASE_SCORE, short_chars=CASCADE_SHORT_CHARS):
+        vocab = {w for words in aspect_keywords.values() for w in words}
+        pos = [_stem(w) for w in vocab if ASPECT_POLARITY.get(w) == 1] + GENERAL_POSITIVE
+        neg = [_stem(w) for w in vocab if ASPECT_POLARITY.get(w) == -1] + GENERAL_NEGATIVE
+        negators = {w[:2] if w.startswith('아니') else w[:1] for w in stopwords if w.startswith(NEGATOR_PREFIXES)}
+        self.positive = _alternation(pos)
+        self.negative = _alternation(neg)
+        # 어절 앞의 부정 부사('안 좋다', '안좋다', '못먹다'), STOPWORDS의 '않-', '아니-' 활용형, '없-', 역접 접속사.
+        # '안내'·'안주'처럼 부정이 아닌 어절도 모델로 보내지만, 잘못 확정하는 것보다 안전합니다.
+        self.ambiguous = re.compile(
+            r"(?:^|\s)(?:안|못)|"
+            + "|".join(map(re.escape, sorted(negators) + list(ABSENCE_STEMS) + list(CONTRAST_WORDS)))
+        )
+        self.base_score = base_score
+        self.short_chars = short_chars
+        self.last_report = {}
+
+    def score(self, texts, ratings=None):
+        """
+        texts(와 같은 길이의 ratings)를 1차 분류해 [{'label', 'score'} 또는 None]을 반환합니다.
+        None은 확신할 수 없어 모델로 보내야 하는 리뷰입니다.
+        """
+        s = pd.Series([re.sub(r"\s+", " ", str(t)).strip() for t in texts], dtype=object)
+        if s.empty:
+            self.last_report = {'reviews': 0, 'decided': 0, 'cascade_rate': 0.0}
+            return []
+        rating = parse_rating(pd.Series(ratings, dtype=object)) if ratings is not None \
+            else pd.Series(np.nan, index=s.index)
+
+        # 부정 어휘를 먼저 세고 지운 뒤 긍정 어휘를 셉니다 ('불친절' 안의 '친절'이 긍정으로 잡히지 않게).
+        n_neg = s.str.count(self.negative.pattern)
+        n_pos = s.str.replace(self.negative.pattern, " ", regex=True).str.count(self.positive.pattern)
+        ambiguous = s.str.contains(self.ambiguous.pattern, regex=True)
+        short = s.str.len() <= self.short_chars
+        high, low = rating >= 4, rating <= 2
+
+        pos = ~ambiguous & (n_neg == 0) & ~low & (
+            (n_pos >= 2) | ((n_pos >= 1) & high) | (short & (rating >= 5))
+        )
+        neg = ~ambiguous & (n_pos == 0) & ~high & (
+            (n_neg >= 2) | ((n_neg >= 1) & low) | (short & (rating <= 1))
+        )
+        evidence = np.where(pos, n_pos + high, n_neg + low).astype(float)
+        scores = np.minimum(0.99, self.base_score + 0.02 * np.maximum(evidence - 1, 0))
+
+        out = [None] * len(s)
+        for i in np.flatnonzero(pos.to_numpy()):
+            out[i] = {'label': POSITIVE_LABEL, 'score': round(float(scores[i]), 3), 'source': 'lexicon'}
+        for i in np.flatnonzero(neg.to_numpy()):
+            out[i] = {'label': NEGATIVE_LABEL, 'score': round(float(scores[i]), 3), 'source': 'lexicon'}
+
+        decided = int(pos.sum() + neg.sum())
+        self.last_report = {'reviews': len(s), 'decided': decided, 'positive': int(pos.sum()),
+                            'negative': int(neg.sum()), 'cascade_rate': round(decided / len(s), 4)}
+        incr('cascade_reviews_total', decided, stage='lexicon')
+        incr('cascade_reviews_total', len(s) - decided, stage='model')
+        set_gauge('cascade_rate', self.last_report['cascade_rate'])
+        return out
+
+
+def agreement(lexicon_preds, model_preds, pos_thresh=0.9, neg_thresh=0.9):
+    """
+    어휘로 결정한 리뷰만 골라, 같은 리뷰의 모델 결과를 임계값으로 레이블링한 것과 비교합니다.
+    어휘 결과는 분석 때와 같이 임계값과 관계없이 그 레이블로 봅니다.
+    반환: {'decided', 'agreement' (레이블 일치율), 'model_neutral' (모델은 임계값 미만이라 중립인 비율)}
+    """
+    def label(p):
+        lexicon = p.get('source') == 'lexicon'
+        if p['label'] == POSITIVE_LABEL and (lexicon or p['score'] >= pos_thresh):
+            return '긍정'
+        if p['label'] == NEGATIVE_LABEL and (lexicon or p['score'] >= neg_thresh):
+            return '부정'
+        return '중립'
+
+    pairs = [(label(lp), label(mp)) for lp, mp in zip(lexicon_preds, model_preds) if lp is not None]
+    if not pairs:
+        return {'decided': 0, 'agreement': None, 'model_neutral': None}
+    return {
+        'decided': len(pairs),
+        'agreement': round(sum(a == b for a, b in pairs) / len(pairs), 4),
+        'model_neutral': round(sum(b == '중립' for _, b in pairs) / len(pairs), 4),
+    }
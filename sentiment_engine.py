@@ -0,0 +1,233 @@
+import os
+import copy
+import time
+import inspect
+import hashlib
+from pathlib import Path
+
+import numpy as np
+import torch
+
+from metrics import get_logger, observe, incr, set_gauge
+
+log = get_logger("sentiment")
+
+# 배치 크기 / 최대 토큰 길이 (0이면 모델이 지원하는 최대 길이) / torch intra-op 스레드 수 (0이면 torch 기본값 유지)
+SENTIMENT_BATCH_SIZE = int(os.getenv("SENTIMENT_BATCH_SIZE", "32"))
+SENTIMENT_MAX_LENGTH = int(os.getenv("SENTIMENT_MAX_LENGTH", "0"))
+SENTIMENT_THREADS = int(os.getenv("SENTIMENT_THREADS", "0"))
+# 추론 백엔드: torch(fp32) | int8(동적 양자화) | onnx(ONNX Runtime)
+SENTIMENT_BACKEND = os.getenv("SENTIMENT_BACKEND", "torch")
+# ONNX 내보내기 결과를 보관할 디렉터리 (최초 1회만 export)
+ONNX_CACHE_DIR = os.getenv("ONNX_CACHE_DIR", os.path.join(".cache", "onnx"))
+
+
+# --- 추론 백엔드 ---
+class TorchBackend:
+    """기존 transformers 모델(fp32)을 그대로 사용합니다."""
+    name = 'torch'
+
+    def __init__(self, model, tokenizer=None):
+        self.model = model.eval()
+
+    def logits(self, batch):
+        with torch.inference_mode():
+            return self.model(**batch).logits.float().numpy()
+
+
+class QuantizedTorchBackend(TorchBackend):
+    """nn.Linear 가중치를 int8로 동적 양자화한 복사본을 사용합니다 (원본 fp32 모델은 그대로 둠)."""
+    name = 'int8'
+
+    def __init__(self, model, tokenizer=None):
+        quantized = torch.ao.quantization.quantize_dynamic(
+            copy.deepcopy(model).eval(), {torch.nn.Linear}, dtype=torch.qint8
+        )
+        super().__init__(quantized)
+
+
+class OnnxBackend:
+    """
+    모델을 ONNX로 한 번 내보내 로컬 디스크에 캐시해 두고 ONNX Runtime(CPU)으로 추론합니다.
+    캐시 파일명에 모델 이름과 revision이 들어가므로 모델이 바뀌면 다시 내보냅니다.
+    onnx / onnxruntime 패키지가 필요하며, 없으면 make_backend가 torch 백엔드로 대체합니다.
+    """
+    name = 'onnx'
+
+    def __init__(self, model, tokenizer, cache_dir=ONNX_CACHE_DIR):
+        import onnxruntime as ort
+
+        model = model.eval()
+        self.path = self._export(model, tokenizer, Path(cache_dir))
+        opts = ort.SessionOptions()
+        if SENTIMENT_THREADS:
+            opts.intra_op_num_threads = SENTIMENT_THREADS
+        self.session = ort.InferenceSession(str(self.path), opts, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    @staticmethod
+    def _export(model, tokenizer, cache_dir):
+        cfg = model.config
+        tag = f"{cfg._name_or_path}@{getattr(cfg, '_commit_hash', None) or 'local'}"
+        safe = "".join(c if c.isalnum() or c in "-_@" else "_" for c in tag).strip("_")
+        digest = hashlib.sha1(tag.encode('utf-8')).hexdigest()[:8]
+        path = cache_dir / f"{safe or 'model'}-{digest}.onnx"
+        if path.exists():
+            return path
+
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        sample = tokenizer(["샘플 문장입니다"], return_tensors='pt')
+        names = list(sample.keys())
+        dynamic = {n: {0: 'batch', 1: 'seq'} for n in names}
+        dynamic['logits'] = {0: 'batch'}
+        start = time.perf_counter()
+        tmp = path.with_suffix(".tmp")
+        # torch 2.5부터 dynamo 인자가 생겼고 이후 기본값이 바뀌므로, 지원할 때에만 TorchScript 내보내기로 고정합니다.
+        extra = {'dynamo': False} if 'dynamo' in inspect.signature(torch.onnx.export).parameters else {}
+        torch.onnx.export(
+            model, (dict(sample),), str(tmp),
+            input_names=names, output_names=['logits'],
+            dynamic_axes=dynamic, opset_version=17, **extra,
+        )
+        tmp.replace(path)
+        log.info(f"[Sentiment] ONNX 모델 내보내기 완료: {path} ({time.perf_counter() - start:.1f}s)")
+        return path
+
+    def logits(self, batch):
+        feeds = {k: v.numpy().astype(np.int64) for k, v in batch.items() if k in self.input_names}
+        return self.session.run(['logits'], feeds)[0]
+
+
+BACKENDS = {
+    'torch': TorchBackend,
+    'int8': QuantizedTorchBackend,
+    'onnx': OnnxBackend,
+}
+
+
+def make_backend(name, model, tokenizer):
+    """이름으로 백엔드를 만듭니다. 실패하면 fp32 torch 백엔드로 대체합니다."""
+    if name not in BACKENDS:
+        log.warning(f"[Sentiment] 알 수 없는 백엔드 '{name}' → torch 사용")
+        name = 'torch'
+    try:
+        return BACKENDS[name](model, tokenizer)
+    except Exception as e:
+        if name == 'torch':
+            raise
+        log.warning(f"[Sentiment] '{name}' 백엔드 준비 실패: {e} → torch 사용")
+        return TorchBackend(model, tokenizer)
+
+
+def model_max_length(model, tokenizer, default=512):
+    """
+    모델이 받을 수 있는 최대 토큰 길이: tokenizer.model_max_length와 config.max_position_embeddings 중 작은 값.
+    (model_max_length가 설정되지 않은 토크나이저는 아주 큰 값을 돌려주므로 무시합니다.)
+    """
+    candidates = [getattr(tokenizer, 'model_max_length', None),
+                  getattr(getattr(model, 'config', None), 'max_position_embeddings', None)]
+    valid = [int(n) for n in candidates if isinstance(n, (int, float)) and 0 < n <= 100_000]
+    return min(valid) if valid else default
+
+
+# --- 배치 추론 엔진 ---
+class SentimentEngine:
+    """
+    transformers pipeline("sentiment-analysis")를 대체하는 배치 추론 엔진입니다.
+
+    - 전체 텍스트를 한 번만 토크나이즈한 뒤 토큰 길이순으로 정렬해 배치를 만들어 패딩 낭비를 줄입니다.
+    - max_length(기본: 모델 최대 길이)에서 명시적으로 잘라내고, 선택한 백엔드(torch / int8 / onnx)로 추론합니다.
+    - 결과는 pipeline과 같은 [{'label': ..., 'score': ...}] 형식이며 입력 순서를 유지합니다.
+    - 마지막 호출의 처리량은 self.last_report에 남습니다.
+    """
+
+    def __init__(self, model, tokenizer, batch_size=SENTIMENT_BATCH_SIZE,
+                 max_length=SENTIMENT_MAX_LENGTH, num_threads=SENTIMENT_THREADS,
+                 backend=SENTIMENT_BACKEND):
+        self.tokenizer = tokenizer
+        self.batch_size = max(1, batch_size)
+        self.max_length = max_length or model_max_length(model, tokenizer)
+        self.id2label = model.config.id2label
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        self.backend = make_backend(backend, model, tokenizer) if isinstance(backend, str) else backend
+        self.last_report = {}
+
+    def __call__(self, texts):
+        texts = [str(t) for t in texts]
+        start = time.perf_counter()
+        if not texts:
+            self.last_report = {'reviews': 0, 'seconds': 0.0, 'reviews_per_sec': 0.0,
+                                'batches': 0, 'padding_ratio': 0.0, 'backend': self.backend.name}
+            return []
+
+        enc = self.tokenizer(texts, truncation=True, max_length=self.max_length)
+        lengths = [len(ids) for ids in enc['input_ids']]
+        order = sorted(range(len(texts)), key=lengths.__getitem__)
+        keys = list(enc.keys())
+
+        results = [None] * len(texts)
+        real_tokens = padded_tokens = batches = 0
+        for b in range(0, len(order), self.batch_size):
+            idx = order[b:b + self.batch_size]
+            batch = self.tokenizer.pad(
+                {k: [enc[k][i] for i in idx] for k in keys},
+                return_tensors='pt',
+            )
+            logits = self.backend.logits(batch)
+            probs = np.exp(logits - logits.max(axis=-1, keepdims=True))
+            probs /= probs.sum(axis=-1, keepdims=True)
+            labels = probs.argmax(axis=-1)
+            for i, lbl, row in zip(idx, labels.tolist(), probs):
+                results[i] = {'label': self.id2label[lbl], 'score': float(row[lbl])}
+            real_tokens += sum(lengths[i] for i in idx)
+            padded_tokens += batch['input_ids'].numel()
+            batches += 1
+
+        elapsed = time.perf_counter() - start
+        self.last_report = {
+            'reviews': len(texts),
+            'seconds': round(elapsed, 3),
+            'reviews_per_sec': round(len(texts) / elapsed, 1) if elapsed else 0.0,
+            'batches': batches,
+            'padding_ratio': round(1 - real_tokens / padded_tokens, 3) if padded_tokens else 0.0,
+            'backend': self.backend.name,
+        }
+        observe('inference', elapsed, backend=self.backend.name)
+        incr('inference_reviews_total', len(texts), backend=self.backend.name)
+        if elapsed:
+            set_gauge('inference_reviews_per_second', self.last_report['reviews_per_sec'],
+                      backend=self.backend.name)
+        return results
+
+
+def compare_backends(model, tokenizer, texts, names=('torch', 'int8', 'onnx'), tolerance=0.01):
+    """
+    fp32 torch 결과를 기준으로 각 백엔드의 레이블 일치율·점수 오차·지연/처리량을 비교합니다.
+    agreement >= 1 - tolerance 인 백엔드 중 가장 빠른 것을 'recommended'로 돌려줍니다.
+    """
+    report = {}
+    baseline = None
+    for name in ('torch',) + tuple(n for n in names if n != 'torch'):
+        try:
+            backend = BACKENDS[name](model, tokenizer)
+        except Exception as e:
+            report[name] = {'error': f"{type(e).__name__}: {e}"}
+            continue
+        engine = SentimentEngine(model, tokenizer, backend=backend)
+        engine(texts[:8])  # 워밍업 (첫 호출 초기화 비용 제외)
+        preds = engine(texts)
+        rep = dict(engine.last_report)
+        if baseline is None:
+            baseline = preds
+        same = sum(p['label'] == b['label'] for p, b in zip(preds, baseline))
+        rep['agreement'] = round(same / len(texts), 4) if texts else 1.0
+        rep['max_score_diff'] = round(max(
+            (abs(p['score'] - b['score']) for p, b in zip(preds, baseline)), default=0.0
+        ), 4)
+        rep['within_tolerance'] = rep['agreement'] >= 1 - tolerance
+        report[name] = rep
+
+    ok = [n for n, r in report.items() if r.get('within_tolerance')]
+    recommended = max(ok, key=lambda n: report[n]['reviews_per_sec']) if ok else 'torch'
+    return {'backends': report, 'recommended': recommended}
@@ -0,0 +1,176 @@
+import os
+import time
+from contextlib import contextmanager
+
+from selenium.webdriver.support.ui import WebDriverWait
+
+# 크롤러 한 번(플랫폼 하나)이 쓸 수 있는 전체 시간 한도(초)
+CRAWL_DEADLINE = float(os.getenv("CRAWL_DEADLINE", "90"))
+
+# 적응형 폴링 간격: 처음엔 촘촘히, 변화가 없으면 점점 느슨하게
+POLL_START = 0.05
+POLL_MAX = 0.5
+POLL_BACKOFF = 1.5
+
+_COUNT_JS = "return (arguments[0] || document).querySelectorAll(arguments[1]).length;"
+
+_RESOURCE_COUNT_JS = "return performance.getEntriesByType('resource').length;"
+
+# root 아래에 MutationObserver를 붙인 "뒤에" clickCss(있으면)에 맞는 요소를 모두 클릭하고,
+# DOM 변경이 생긴 뒤 quiet_ms 동안 조용해지면 [true, 클릭 수], timeout_ms 안에 변경이 없으면 [false, 클릭 수].
+# 클릭할 요소가 없으면 기다리지 않고 바로 [false, 0]을 돌려줍니다.
+_MUTATION_JS = """
+const root = arguments[0] || document.body;
+const quietMs = arguments[1], timeoutMs = arguments[2], clickCss = arguments[3];
+const done = arguments[arguments.length - 1];
+let changed = false, clicked = 0, quietTimer = null, hardTimer = null;
+const finish = (v) => { obs.disconnect(); clearTimeout(quietTimer); clearTimeout(hardTimer); done([v, clicked]); };
+const obs = new MutationObserver(() => {
+    changed = true;
+    clearTimeout(quietTimer);
+    quietTimer = setTimeout(() => finish(true), quietMs);
+});
+obs.observe(root, {childList: true, subtree: true, characterData: true, attributes: true});
+if (clickCss) {
+    const targets = root.querySelectorAll(clickCss);
+    targets.forEach(el => el.click());
+    clicked = targets.length;
+    if (!clicked) { finish(false); return; }
+}
+hardTimer = setTimeout(() => finish(changed), timeoutMs);
+"""
+
+# WebDriver 기본 스크립트 타임아웃(초). 현재 값을 읽을 수 없을 때 이 값으로 되돌립니다.
+DEFAULT_SCRIPT_TIMEOUT = 30
+
+
+class _TimedWait(WebDriverWait):
+    """until / until_not에서 실제로 기다린 시간을 Waiter.waited에 더하는 WebDriverWait."""
+
+    def __init__(self, waiter, timeout):
+        super().__init__(waiter.driver, timeout)
+        self._waiter = waiter
+
+    def until(self, method, message=""):
+        start = time.monotonic()
+        try:
+            return super().until(method, message)
+        finally:
+            self._waiter.waited += time.monotonic() - start
+
+    def until_not(self, method, message=""):
+        start = time.monotonic()
+        try:
+            return super().until_not(method, message)
+        finally:
+            self._waiter.waited += time.monotonic() - start
+
+
+class Waiter:
+    """
+    고정 time.sleep 대신 "조건이 만족되는 즉시" 진행하도록 돕는 대기 도우미입니다.
+
+    크롤러 실행마다 하나씩 만들며, 전체 deadline을 넘기지 않도록 각 대기 시간을 자르고,
+    실제로 기다린 시간을 self.waited(초)에 누적합니다.
+    """
+
+    def __init__(self, driver, platform, deadline=CRAWL_DEADLINE):
+        self.driver = driver
+        self.platform = platform
+        self.deadline = time.monotonic() + deadline
+        self.waited = 0.0
+
+    def remaining(self):
+        return max(0.0, self.deadline - time.monotonic())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def until(self, predicate, timeout=5):
+        """predicate()가 참 값을 돌려줄 때까지 적응형 간격으로 폴링합니다. 시간 초과 시 None."""
+        timeout = min(timeout, self.remaining())
+        start = time.monotonic()
+        end = start + timeout
+        poll = POLL_START
+        try:
+            while True:
+                try:
+                    value = predicate()
+                except Exception:
+                    value = None
+                if value:
+                    return value
+                now = time.monotonic()
+                if now >= end:
+                    return None
+                time.sleep(min(poll, end - now))
+                poll = min(poll * POLL_BACKOFF, POLL_MAX)
+        finally:
+            self.waited += time.monotonic() - start
+
+    def webdriver_wait(self, timeout):
+        """WebDriverWait(driver, timeout) 대신 씁니다. 기다린 시간이 self.waited에 합산됩니다."""
+        return _TimedWait(self, timeout)
+
+    def count(self, css, root=None):
+        return self.driver.execute_script(_COUNT_JS, root, css) or 0
+
+    def count_growth(self, css, prev, root=None, timeout=5):
+        """css로 찾은 항목 수가 prev보다 많아질 때까지 기다리고 현재 개수를 반환합니다."""
+        grown = self.until(lambda: (n := self.count(css, root)) > prev and n, timeout)
+        return grown if grown else self.count(css, root)
+
+    def network_idle(self, idle_ms=500, timeout=5):
+        """
+        새로 완료된 리소스 요청이 idle_ms 동안 없으면 네트워크가 잠잠해진 것으로 봅니다.
+        (Resource Timing 기준이라 진행 중인 요청은 보이지 않는 근사치입니다.)
+        """
+        state = {'n': -1, 'since': time.monotonic()}
+
+        def settled():
+            n = self.driver.execute_script(_RESOURCE_COUNT_JS)
+            now = time.monotonic()
+            if n != state['n']:
+                state['n'], state['since'] = n, now
+                return False
+            return (now - state['since']) * 1000 >= idle_ms
+
+        return bool(self.until(settled, timeout))
+
+    @contextmanager
+    def _script_timeout(self, seconds):
+        """풀에서 재사용하는 드라이버이므로 스크립트 타임아웃을 바꾼 뒤 원래 값으로 되돌립니다."""
+        try:
+            previous = self.driver.timeouts.script
+        except Exception:
+            previous = DEFAULT_SCRIPT_TIMEOUT
+        self.driver.set_script_timeout(seconds)
+        try:
+            yield
+        finally:
+            try:
+                self.driver.set_script_timeout(previous)
+            except Exception:
+                pass
+
+    def _observe(self, root, quiet_ms, timeout, click_css):
+        timeout = min(timeout, self.remaining())
+        start = time.monotonic()
+        try:
+            with self._script_timeout(timeout + 1):
+                changed, clicked = self.driver.execute_async_script(
+                    _MUTATION_JS, root, int(quiet_ms), int(timeout * 1000), click_css
+                )
+            return bool(changed), int(clicked or 0)
+        except Exception:
+            return False, 0
+        finally:
+            self.waited += time.monotonic() - start
+
+    def click_and_settle(self, css, root=None, quiet_ms=200, timeout=2):
+        """
+        관찰을 시작한 다음 css에 맞는 요소를 모두 클릭하고 DOM 변경이 잠잠해질 때까지 기다립니다.
+        클릭을 먼저 하면 동기적으로 바뀐 DOM을 관찰자가 놓쳐 timeout까지 기다리게 되므로 같은 스크립트 안에서 클릭합니다.
+        반환: 클릭한 요소 수
+        """
+        return self._observe(root, quiet_ms, timeout, css)[1]
@@ -0,0 +1,168 @@
+"""
+리뷰 API(XHR/fetch) 응답을 가로채 JSON에서 바로 리뷰를 읽는 캡처 모드입니다 (CRAWL_CAPTURE=1).
+
+크롬 성능 로그(goog:loggingPrefs performance)로 Network.responseReceived / loadingFinished 이벤트를 받고,
+리뷰 API URL과 맞는 응답 본문을 DevTools Network.getResponseBody로 읽어 파싱합니다.
+스크롤·더보기 같은 페이지 넘기기는 기존 크롤러가 그대로 하고, 추출 단계만 JSON으로 대체합니다.
+캡처한 리뷰 수가 화면에 로드된 항목 수보다 적으면(첫 페이지가 HTML에 포함된 경우 등)
+크롤러는 기존 DOM 추출로 돌아갑니다.
+
+반환 행은 crawler._EXTRACT_JS와 같은 {'reviewer', 'text', 'rating', 'date', 'id'} 형식이라
+crawler._to_review를 그대로 거칩니다.
+"""
+import os
+import re
+import json
+
+from metrics import get_logger, incr
+
+log = get_logger("capture")
+
+CAPTURE_ENABLED = os.getenv("CRAWL_CAPTURE", "0") == "1"
+
+# 플랫폼별 리뷰 API URL (픽스처 서버의 /api/<platform>/reviews 포함)
+API_PATTERNS = {
+    'Kakao': re.compile(r"place\.map\.kakao\.com/.*commentlist|/api/kakao/reviews"),
+    'Google': re.compile(r"/maps/(preview|rpc)/.*review|/api/google/reviews"),
+    'Naver': re.compile(r"pcmap-api\.place\.naver\.com/graphql|/api/naver/reviews"),
+}
+
+
+def capabilities():
+    """init_driver에서 options.set_capability로 넣을 성능 로그 설정 (캡처 모드일 때만)."""
+    if not CAPTURE_ENABLED:
+        return {}
+    return {"goog:loggingPrefs": {"performance": "ALL"}}
+
+
+# --- 응답 JSON → 리뷰 행 ---
+def _row(reviewer, text, rating, date, rid):
+    if not (reviewer and text and date):
+        return None
+    return {
+        'reviewer': str(reviewer).strip(),
+        'text': str(text).strip(),
+        'rating': None if rating is None else str(rating),
+        'date': str(date).strip(),
+        'id': None if rid is None else str(rid),
+    }
+
+
+def _generic_rows(payload):
+    """{'reviews': [{'reviewer', 'text', 'rating', 'date', 'id'}]} (픽스처 서버 / 녹화 페이로드 형식)."""
+    items = payload.get('reviews') if isinstance(payload, dict) else None
+    return [_row(r.get('reviewer'), r.get('text'), r.get('rating'), r.get('date'), r.get('id'))
+            for r in items or [] if isinstance(r, dict)]
+
+
+def _kakao_rows(payload):
+    """Kakao commentlist: {'comment': {'list': [{'username', 'contents', 'point', 'date', 'commentid'}]}}."""
+    comment = payload.get('comment') if isinstance(payload, dict) else None
+    if not isinstance(comment, dict):
+        return []
+    return [_row(c.get('username'), c.get('contents'), c.get('point'), c.get('date'), c.get('commentid'))
+            for c in comment.get('list') or [] if isinstance(c, dict)]
+
+
+def _naver_rows(payload):
+    """Naver place GraphQL: [{'data': {'visitorReviews': {'items': [{'author': {'nickname'}, 'body', ...}]}}}]."""
+    rows = []
+    for part in payload if isinstance(payload, list) else [payload]:
+        data = (part or {}).get('data') if isinstance(part, dict) else None
+        reviews = (data or {}).get('visitorReviews') if isinstance(data, dict) else None
+        for r in (reviews or {}).get('items') or []:
+            if isinstance(r, dict):
+                author = r.get('author') or {}
+                rows.append(_row(author.get('nickname'), r.get('body'), r.get('rating'),
+                                 r.get('created') or r.get('visited'), r.get('id')))
+    return rows
+
+
+# Google Maps 리뷰 RPC는 중첩 배열 형식이 자주 바뀌어 일반 형식만 인식하고, 나머지는 DOM 추출로 대체됩니다.
+PARSERS = {
+    'Kakao': (_kakao_rows, _generic_rows),
+    'Google': (_generic_rows,),
+    'Naver': (_naver_rows, _generic_rows),
+}
+
+
+def parse_payload(platform, body):
+    """응답 본문 문자열을 리뷰 행 리스트로. 인식할 수 없으면 빈 리스트."""
+    text = body.lstrip()
+    if text.startswith(")]}'"):  # Google XSSI 접두사
+        text = text.split("\n", 1)[-1]
+    try:
+        payload = json.loads(text)
+    except ValueError:
+        return []
+    for parser in PARSERS.get(platform, (_generic_rows,)):
+        rows = [r for r in parser(payload) if r]
+        if rows:
+            return rows
+    return []
+
+
+class ResponseCapture:
+    """
+    세션 하나의 성능 로그에서 platform 리뷰 API 응답을 모읍니다.
+    rows()를 부를 때마다 새 로그를 읽어 누적된 리뷰 행(id 기준 중복 제거, 도착 순서)을 반환합니다.
+    """
+
+    def __init__(self, driver, platform):
+        self.driver = driver
+        self.platform = platform
+        self.pattern = API_PATTERNS[platform]
+        self._pending = {}      # requestId -> url (응답 헤더는 왔고 본문 로딩이 끝나기 전)
+        self._rows = []
+        self._seen = set()
+        self.responses = 0
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.get_log("performance")  # 풀에서 재사용한 세션의 이전 로그는 버립니다.
+            self.available = True
+        except Exception as e:
+            log.warning(f"[{platform}] 응답 캡처 비활성화 (성능 로그 사용 불가): {type(e).__name__} {e}")
+            self.available = False
+
+    def _drain(self):
+        try:
+            entries = self.driver.get_log("performance")
+        except Exception:
+            return
+        for entry in entries:
+            try:
+                msg = json.loads(entry['message'])['message']
+            except (KeyError, ValueError, TypeError):
+                continue
+            method, params = msg.get('method'), msg.get('params', {})
+            if method == 'Network.responseReceived':
+                url = params.get('response', {}).get('url', '')
+                if self.pattern.search(url):
+                    self._pending[params.get('requestId')] = url
+            elif method == 'Network.loadingFinished' and params.get('requestId') in self._pending:
+                self._collect(params['requestId'], self._pending.pop(params['requestId']))
+
+    def _collect(self, request_id, url):
+        try:
+            body = self.driver.execute_cdp_cmd("Network.getResponseBody", {'requestId': request_id})
+        except Exception as e:
+            log.warning(f"[{self.platform}] 응답 본문 읽기 실패 ({url}): {type(e).__name__}")
+            return
+        self.responses += 1
+        for row in parse_payload(self.platform, body.get('body', '')):
+            key = row['id'] or (row['reviewer'], row['date'], row['text'][:20])
+            if key not in self._seen:
+                self._seen.add(key)
+                self._rows.append(row)
+        incr('capture_responses_total', platform=self.platform)
+
+    def rows(self, limit=None):
+        if not self.available:
+            return []
+        self._drain()
+        return self._rows[:limit] if limit else list(self._rows)
+
+
+def start_capture(driver, platform):
+    """캡처 모드면 ResponseCapture를, 아니면 None을 반환합니다."""
+    return ResponseCapture(driver, platform) if CAPTURE_ENABLED else None